@@ -50,6 +50,7 @@ from . import errors
 from .wrapper import jsonld
 from .database.lazy import lazy
 from .wrapper.h5attr import Attribute
+from .wrapper.bulkattrs import bulk_set_attrs
 import json
 from .wrapper.accessor import register_accessor
 
@@ -475,7 +476,7 @@ xr.set_options(display_expand_data=False)
 
 __all__ = ('__version__', '__author__', '__author_orcid__',
            'UserDir', 'use',
-           'File', 'Group', 'Dataset', 'Attribute',
+           'File', 'Group', 'Dataset', 'Attribute', 'bulk_set_attrs',
            'dump', 'dumps', 'cv_h5py', 'lower', 'Lower',
            'set_config', 'get_config', 'get_ureg',
            'Convention', 'jsonld', 'lazy', 'DownloadFileManager',
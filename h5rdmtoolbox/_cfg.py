@@ -18,10 +18,14 @@ def is_valid_logger_level(level: Union[str, int]):
 
 CONFIG = {
     'return_xarray': True,
+    # slicing a numeric dataset returns a lazily indexed (dask-backed if dask is installed) xr.DataArray:
+    'lazy_xarray': False,
     'advanced_shape_repr': True,
     'natural_naming': True,
     'hdf_compression': None,  # 'gzip',
     'hdf_compression_opts': None,  # 5,
+    # number of threads compressing the chunks of new datasets (gzip). 1 lets HDF5 compress the chunks:
+    'hdf_write_workers': 1,
     'adjusting_plotting_labels': True,
     'xarray_unit_repr_in_plots': 'in',
     'plotting_name_order': ('plot_name', 'long_name', 'standard_name'),
@@ -37,15 +41,25 @@ CONFIG = {
     # if a standard attribute is defined and cannot be retrieved because the value is invalid, ignore it:
     'ignore_get_std_attr_err': False,
     'allow_deleting_standard_attributes': False,
-    'ignore_none': False
+    'ignore_none': False,
+    # max. number of read-only file handles kept open for lazy objects and FilesDB. 0 disables pooling.
+    'file_handle_pool_size': 0,
+    # raw data chunk cache of opened files (None: HDF5 default, 1 MB). See `wrapper.chunkcache`:
+    'hdf_chunk_cache_mb': None,
+    'hdf_chunk_cache_nslots': None,
+    'hdf_chunk_cache_w0': None,
+    # chunk cache per dataset name (in MB), overriding the cache of the file:
+    'hdf_dataset_chunk_cache_mb': {},
 }
 
 _VALIDATORS = {
     'return_xarray': lambda x: isinstance(x, bool),
+    'lazy_xarray': lambda x: isinstance(x, bool),
     'advanced_shape_repr': lambda x: isinstance(x, bool),
     'natural_naming': lambda x: isinstance(x, bool),
     'hdf_compression': lambda x: isinstance(x, str),
     'hdf_compression_opts': lambda x: isinstance(x, int),
+    'hdf_write_workers': lambda x: isinstance(x, int) and x >= 1,
     'xarray_unit_repr_in_plots': lambda x: x in ('/', '()', '(', '[]', '[', '//', 'in'),
     'plotting_name_order': lambda x: isinstance(x, (tuple, list)) and [xx in ('plot_name', 'long_name', 'standard_name')
                                                                        for xx in x],
@@ -57,7 +71,13 @@ _VALIDATORS = {
     'add_provenance': lambda x: isinstance(x, bool),
     'ignore_set_std_attr_err': lambda x: isinstance(x, bool),
     'ignore_get_std_attr_err': lambda x: isinstance(x, bool),
-    'ignore_none': lambda x: isinstance(x, bool)
+    'ignore_none': lambda x: isinstance(x, bool),
+    'file_handle_pool_size': lambda x: isinstance(x, int) and x >= 0,
+    'hdf_chunk_cache_mb': lambda x: x is None or (isinstance(x, (int, float)) and x >= 0),
+    'hdf_chunk_cache_nslots': lambda x: x is None or (isinstance(x, int) and x > 0),
+    'hdf_chunk_cache_w0': lambda x: x is None or (isinstance(x, (int, float)) and 0 <= x <= 1),
+    'hdf_dataset_chunk_cache_mb': lambda x: isinstance(x, dict) and all(
+        isinstance(v, (int, float)) and v >= 0 for v in x.values()),
 }
 
 
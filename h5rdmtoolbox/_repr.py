@@ -353,8 +353,11 @@ class HDF5StructureHTMLRepr(_HDF5StructureRepr):
 
         self.collapsed = collapsed
 
+        # precomputed statistics are shown if available. The sidecar is read once per call:
+        from .database.hdfdb.stats import file_stats
         self._obj_cfg.update({'chunks': chunks,
-                              'maxshape': maxshape})
+                              'maxshape': maxshape,
+                              'stats': file_stats(h5group)})
 
         _id = h5group.name + perf_counter_ns().__str__()
 
@@ -473,6 +476,13 @@ class HDF5StructureHTMLRepr(_HDF5StructureRepr):
         else:
             maxshape_str = ''
 
+        # precomputed statistics are shown if available. The data is not read:
+        stats = (self._obj_cfg.get('stats', None) or {}).get(h5obj.name, None)
+        if stats is not None and '$mean' in stats:
+            stats_str = f' min={stats["$min"]:g} max={stats["$max"]:g} mean={stats["$mean"]:g}'
+        else:
+            stats_str = ''
+
         _id1 = f'ds-1-{h5obj.name}-{perf_counter_ns().__str__()}'
         _id2 = f'ds-2-{h5obj.name}-{perf_counter_ns().__str__()}'
 
@@ -480,7 +490,7 @@ class HDF5StructureHTMLRepr(_HDF5StructureRepr):
                 <ul id="{_id1}" class="h5tb-var-list">
                     <input id="{_id2}" class="h5tb-varname-in" type="checkbox" {self.checkbox_state}>
                     <label class='h5tb-varname' for="{_id2}">{name}</label>
-                    <span class="h5tb-dims">{_shape_repr} [{h5obj.dtype}]{chunks_str}{maxshape_str}</span>"""
+                    <span class="h5tb-dims">{_shape_repr} [{h5obj.dtype}]{chunks_str}{maxshape_str}{stats_str}</span>"""
         return _html
 
     def __dataset__(self, name, h5obj) -> str:
@@ -5,13 +5,16 @@ import h5py
 import inspect
 import logging
 import pathlib
+import pickle
 import re
 import shutil
 import sys
 import warnings
 import yaml
 from pydoc import locate
-from typing import Union, List, Dict, Tuple, Any
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Union, List, Dict, Tuple, Any, Iterable, Iterator, Optional
 
 from forge import kwargs
 
@@ -34,6 +37,17 @@ CV_DIR = UserDir["convention"]
 
 datetime_str = "%Y-%m-%dT%H:%M:%SZ%z"
 
+# columns of the report returned by `Convention.validate_many()`:
+VALIDATION_REPORT_COLUMNS = (
+    "filename",
+    "name",
+    "attribute",
+    "value",
+    "reason",
+    "required",
+    "error_message",
+)
+
 
 class MissingAttribute:
     def __init__(self, object_name: str, attribute_name: str):
@@ -148,6 +162,8 @@ class Convention(AbstractConvention):
 
         self.properties = {}
         self.methods = {File: {}, Group: {}, Dataset: {}}
+        # standard attributes to check per object class (see `_validation_plan()`):
+        self._validation_plans = {}
 
         if standard_attributes is None:
             standard_attributes = {}
@@ -192,6 +208,7 @@ class Convention(AbstractConvention):
         if target_cls not in self.properties:
             self.properties[target_cls] = {}
         self.properties[target_cls][std_attr_name] = std_attr
+        self._validation_plans.clear()
 
         if target_cls not in self.methods:
             self.methods[target_cls] = {}
@@ -402,6 +419,7 @@ class Convention(AbstractConvention):
         for prop in new_conv.properties.values():
             for name in names:
                 prop.pop(name, None)
+        new_conv._validation_plans.clear()
 
         _new_methods_dict = new_conv.methods
         for cls, meth_dict in new_conv.methods.items():
@@ -502,88 +520,235 @@ class Convention(AbstractConvention):
         List[Dict]
             The invalid attributes
         """
+        from ..database.scan import scan
         from ..wrapper.core import File
 
-        if not isinstance(file_or_filename, (str, pathlib.Path)):
-            with File(file_or_filename, "r") as f:
-                return self.check(f)
         failed = []
 
-        convention = self
-
-        def _is_str_dataset(node):
-            if node.dtype.kind == "S":
-                return True
-            return False
-
-        def _validate_convention(name, node):
-            """Checks if the node (dataset or group) is compliant with the convention"""
-            for k, v in convention.properties.items():
-                if isinstance(node, k):
-                    for ak, av in v.items():
-                        if av.default_value is not consts.DefaultValue.EMPTY:
-                            if ak in node.attrs:
-                                try:
-                                    node.attrs[ak]
-                                except errors.StandardAttributeError as e:
-                                    failed.append(
-                                        dict(
-                                            name=node.name,
-                                            attr_name=ak,
-                                            attr_value=node.attrs.raw[ak],
-                                            reason="invalid_value",
-                                            error_message=str(e),
-                                        )
-                                    )
-                        else:  # av.default_value is consts.DefaultValue.EMPTY:
-                            if (
-                                av.target_method == "create_string_dataset"
-                                and not _is_str_dataset(node)
-                            ):
-                                continue  # not the responsibility of this validator
-                            if av.target_method == "create_dataset" and _is_str_dataset(
-                                node
-                            ):
-                                continue  # not the responsibility of this validator
-
-                            if ak not in node.attrs:
-                                logger.debug(
-                                    f'The attribute "{ak}" is missing in the dataset "{name}" but '
-                                    "is required by the convention"
-                                )
-                                failed.append(
-                                    MissingAttribute(
-                                        object_name=node.name, attribute_name=ak
-                                    )
-                                )
-                            else:
-                                # just by accessing the standard attribute, the validation is performed
-                                try:
-                                    _ = node.attrs[ak]
-                                    # av.validate(value_to_check, parent=node, attrs=node.attrs.raw)
-                                    logger.debug(f'The attribute "{ak}" is valid')
-                                except errors.StandardAttributeError as e:
-                                    logger.debug(
-                                        f'The attribute "{ak}" exists but is invalid'
-                                    )
-                                    failed.append(
-                                        InvalidAttribute(
-                                            object_name=node.name,
-                                            attribute_name=ak,
-                                            attribute_value=node.attrs.raw[ak],
-                                            error_message=str(e),
-                                        )
-                                    )
+        def _validate_convention(f, record):
+            """Checks if the node (dataset or group) is compliant with the convention."""
+            for reason, ak, required, error_message in _check_record(
+                f, record, self._validation_plan(record)
+            ):
+                if reason == "missing":
+                    logger.debug(
+                        f'The attribute "{ak}" is missing in the dataset "{record.name}" but '
+                        "is required by the convention"
+                    )
+                    failed.append(
+                        MissingAttribute(object_name=record.name, attribute_name=ak)
+                    )
+                elif required:
+                    logger.debug(f'The attribute "{ak}" exists but is invalid')
+                    failed.append(
+                        InvalidAttribute(
+                            object_name=record.name,
+                            attribute_name=ak,
+                            attribute_value=record.attrs[ak],
+                            error_message=error_message,
+                        )
+                    )
+                else:
+                    failed.append(
+                        dict(
+                            name=record.name,
+                            attr_name=ak,
+                            attr_value=record.attrs[ak],
+                            reason="invalid_value",
+                            error_message=error_message,
+                        )
+                    )
+
+        if not isinstance(file_or_filename, (str, pathlib.Path)):
+            for record in scan(file_or_filename):
+                _validate_convention(file_or_filename, record)
+            return failed
 
         with File(file_or_filename, "r") as f:
             logger.debug(
                 f"Checking file {file_or_filename} for compliance with convention {self.name}"
             )
-            _validate_convention("/", f)
-            f.visititems(_validate_convention)
+            for record in scan(f):
+                _validate_convention(f, record)
 
         return failed
 
+    def _validation_plan(self, record) -> List[Tuple[str, StandardAttribute, bool]]:
+        """Return the standard attributes to check for the object described by `record`
+        as tuples of the attribute name, the standard attribute and whether the attribute
+        is required. The plan only depends on the class of the object and on whether it is
+        a string dataset and is computed once per convention."""
+        from ..wrapper.core import Dataset, File, Group
+
+        if record.name == "/":
+            cls = File
+        elif record.kind == "dataset":
+            cls = Dataset
+        else:
+            cls = Group
+        is_str_dataset = record.kind == "dataset" and record.dtype.kind == "S"
+
+        key = (cls, is_str_dataset)
+        if key in self._validation_plans:
+            return self._validation_plans[key]
+
+        plan = []
+        for k, v in self.properties.items():
+            if issubclass(cls, k):
+                for ak, av in v.items():
+                    required = av.default_value is consts.DefaultValue.EMPTY
+                    if required:
+                        if (
+                            av.target_method == "create_string_dataset"
+                            and not is_str_dataset
+                        ):
+                            continue  # not the responsibility of this validator
+                        if av.target_method == "create_dataset" and is_str_dataset:
+                            continue  # not the responsibility of this validator
+                    plan.append((ak, av, required))
+        self._validation_plans[key] = plan
+        return plan
+
+    def validate_many(
+        self,
+        filenames: Union[str, pathlib.Path, Iterable[Union[str, pathlib.Path]]],
+        workers: Optional[int] = None,
+    ) -> "pd.DataFrame":
+        """Checks many files for compliance with the convention and returns a report table
+        with one row per missing or invalid attribute.
+
+        The attributes of each object are read once (see `h5tbx.database.scan`), the standard
+        attributes to check are determined once per object class and standard attributes
+        validate each distinct value once, as long as the validator does not depend on the
+        object.
+
+        Parameters
+        ----------
+        filenames: Union[str, pathlib.Path, Iterable[Union[str, pathlib.Path]]]
+            The HDF5 file(s)
+        workers: Optional[int]
+            If larger than 1, the files are checked in parallel by this number of processes.
+            The convention is pickled and sent to the processes. If this is not possible
+            (e.g. validators defined in a function), the files are checked in this process.
+
+        Returns
+        -------
+        pd.DataFrame
+            The columns are "filename", "name" (object name), "attribute", "value" (raw value,
+            None for missing attributes), "reason" ("missing" or "invalid"), "required" and
+            "error_message". The table is empty if all files comply with the convention.
+
+        Examples
+        --------
+        >>> cv = h5tbx.convention.from_yaml('my_convention.yaml')
+        >>> report = cv.validate_many(pathlib.Path('campaign').glob('*.hdf'), workers=4)
+        >>> report[report.reason == 'missing'].groupby('attribute').size()
+        """
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError("pandas is required for this function")
+
+        if isinstance(filenames, (str, pathlib.Path)):
+            filenames = [filenames]
+        filenames = [pathlib.Path(filename) for filename in filenames]
+        rows = None
+        if workers is not None and workers > 1 and len(filenames) > 1:
+            rows = self._validate_in_processes(filenames, workers)
+        if rows is None:
+            rows = [
+                row
+                for filename in filenames
+                for row in _validate_file(self, filename)
+            ]
+        return pd.DataFrame(rows, columns=VALIDATION_REPORT_COLUMNS)
+
+    def _validate_in_processes(
+        self, filenames: List[pathlib.Path], workers: int
+    ) -> Optional[List[Tuple]]:
+        """Validate the files in `workers` processes. The convention is pickled and sent
+        to the processes. Returns None if this is not possible (e.g. validators defined
+        in a function), in which case the files are validated in this process."""
+        try:
+            pickle.dumps(self)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            logger.debug(
+                f'Convention "{self.name}" cannot be sent to other processes ({e}). '
+                "Validating the files in this process."
+            )
+            return None
+        # validators of conventions read from YAML files are defined in the generated module:
+        sys_paths = []
+        if self.filename is not None and self.filename.suffix == ".py":
+            sys_paths.append(str(self.filename.parent))
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_validation_process,
+                initargs=(sys_paths,),
+            ) as executor:
+                return [
+                    row
+                    for file_rows in executor.map(
+                        _validate_file, [self] * len(filenames), filenames
+                    )
+                    for row in file_rows
+                ]
+        except (BrokenProcessPool, ImportError, AttributeError, pickle.UnpicklingError) as e:
+            logger.debug(
+                f'Convention "{self.name}" could not be restored in other processes ({e}). '
+                "Validating the files in this process."
+            )
+            return None
+
+
+def _check_record(
+    f, record, plan: List[Tuple[str, StandardAttribute, bool]]
+) -> Iterator[Tuple[str, str, bool, Optional[str]]]:
+    """Check the attributes of a scanned object (record) against the validation plan.
+    Yields the reason ("missing" or "invalid"), the attribute name, whether the attribute
+    is required and the error message (None for missing attributes). The object is only
+    accessed (as context for the validators) if it has standard attributes to validate."""
+    node = None
+    for ak, av, required in plan:
+        if ak not in record.attrs:
+            if required:
+                yield "missing", ak, required, None
+            continue
+        if node is None:
+            node = f[record.name]
+        try:
+            av.decode(node, record.attrs[ak])
+        except errors.StandardAttributeError as e:
+            yield "invalid", ak, required, str(e)
+
+
+def _validate_file(convention: "Convention", filename: pathlib.Path) -> List[Tuple]:
+    """Return the rows of the validation report of a file"""
+    from ..database.scan import scan
+    from ..wrapper.core import File
+
+    rows = []
+    with File(filename, "r") as f:
+        logger.debug(
+            f"Checking file {filename} for compliance with convention {convention.name}"
+        )
+        for record in scan(f):
+            plan = convention._validation_plan(record)
+            for reason, ak, required, error_message in _check_record(f, record, plan):
+                value = record.attrs[ak] if reason == "invalid" else None
+                rows.append(
+                    (str(filename), record.name, ak, value, reason, required, error_message)
+                )
+    return rows
+
+
+def _init_validation_process(sys_paths: List[str]) -> None:
+    """Initializer of the processes of `Convention.validate_many()`"""
+    for path in sys_paths:
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
 
 def _clear_all_signatures():
     """Clear all convention parameters from all registered conventions.
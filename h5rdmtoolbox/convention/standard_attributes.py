@@ -1,9 +1,11 @@
 """standard attribute module"""
 
+import copy
 import json
 import logging
 import warnings
-from typing import Dict, List, Union
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import h5py
 import pydantic
@@ -30,6 +32,63 @@ __all__ = [
     "StandardAttribute",
 ]
 
+# maximum number of validated values kept in memory per standard attribute:
+VALIDATED_VALUES_CACHE_SIZE = 256
+
+
+class _ValidationContext(dict):
+    """Context passed to the validators, which records whether a validator read it.
+    Only results of validators, which do not depend on the context (the parent object
+    or the other attributes), are cached."""
+
+    accessed = False
+
+    def __getitem__(self, key):
+        self.accessed = True
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self.accessed = True
+        return super().get(key, default)
+
+    def __contains__(self, key):
+        self.accessed = True
+        return super().__contains__(key)
+
+    def __iter__(self):
+        self.accessed = True
+        return super().__iter__()
+
+    def keys(self):
+        self.accessed = True
+        return super().keys()
+
+    def values(self):
+        self.accessed = True
+        return super().values()
+
+    def items(self):
+        self.accessed = True
+        return super().items()
+
+
+def _value_key(value) -> Optional[Tuple]:
+    """Return the key of a raw value in the cache of validated values or None if
+    the value cannot be cached"""
+    try:
+        hash(value)
+    except TypeError:
+        return None
+    return type(value), value
+
+
+def _copy_validated(value):
+    """Return a copy of a cached validated value, so that callers cannot modify the cache.
+    Immutable values are returned as they are."""
+    if isinstance(value, (str, bytes, int, float, complex, type(None))):
+        return value
+    return copy.deepcopy(value)
+
 
 class StandardAttribute:
     """StandardAttribute class for the standardized attributes
@@ -186,6 +245,17 @@ class StandardAttribute:
                 f'Unexpected entry "{_k}" for StandardAttribute, which is ignored.'
             )
 
+        # the pydantic model used for validation (see `_validation_model()`) and the validated values:
+        self._model = None
+        self._validated_values: "OrderedDict[Tuple, Any]" = OrderedDict()
+
+    def __getstate__(self):
+        # the model may be created dynamically and cannot be pickled. It is rebuilt on demand:
+        state = self.__dict__.copy()
+        state["_model"] = None
+        state["_validated_values"] = OrderedDict()
+        return state
+
     def __repr__(self):
         if self.is_positional():
             return f'<{self.__class__.__name__}@{self.target_method}[positional/obligatory]("{self.name}"): "{self.description}">'
@@ -212,6 +282,49 @@ class StandardAttribute:
         h5tbx.use(None)
         h5tbx.use(_cache_cv)
 
+    def _validation_model(self) -> Tuple[pydantic.BaseModel, str]:
+        """Return the pydantic model validating the attribute value and the name of its field.
+        Validators, which are no model, are wrapped into a model with the field "value".
+        The model is created once."""
+        if self._model is None or self._model[0] is not self.validator:
+            try:
+                model_fields = list(self.validator.model_fields.keys())
+            except AttributeError:
+                model = pydantic.create_model(self.name, value=(self.validator, ...))
+                self._model = (self.validator, model, "value")
+            else:
+                self._model = (self.validator, self.validator, model_fields[0])
+            self._validated_values.clear()
+        return self._model[1], self._model[2]
+
+    def _validation_error_message(self, value, err: pydantic.ValidationError) -> str:
+        if self._validation_model()[0] is self.validator:
+            return (f'Validation of "{value}" for standard attribute "{self.name}" failed.\n'
+                    f"Expected fields: {self.validator.model_fields}\nPydantic error: {err}")
+        return (f'Validation of "{value}" for standard attribute "{self.name}" failed.'
+                f"\nPydantic error: {err}")
+
+    def _validate(self, value, parent, attrs):
+        """Return the validated value. Raises a pydantic.ValidationError if the value is invalid.
+
+        Validated values are cached by the raw value, unless the validator used the context
+        (the parent object or the other attributes). Copies of the cached values are returned."""
+        model, field = self._validation_model()
+        key = _value_key(value)
+        if key is not None and key in self._validated_values:
+            self._validated_values.move_to_end(key)
+            return _copy_validated(self._validated_values[key])
+        context = _ValidationContext(parent=parent, attrs=attrs)
+        validated_value = getattr(model.model_validate({field: value}, context=context), field)
+        if key is not None and not context.accessed:
+            try:
+                self._validated_values[key] = _copy_validated(validated_value)
+            except (TypeError, copy.Error):
+                return validated_value
+            while len(self._validated_values) > VALIDATED_VALUES_CACHE_SIZE:
+                self._validated_values.popitem(last=False)
+        return validated_value
+
     def set(self, parent, value, attrs=None):
         """Write `value` to attribute of `parent`
 
@@ -232,63 +345,55 @@ class StandardAttribute:
             # else:
             #     # None is passed. this is ignored
             #     return
-        else:
-            if isinstance(value, dict):
-                try:
-                    key0 = list(self.validator.model_fields.keys())[0]
-                    logger.debug(
-                        f'validating standard attribute "{self.name}" with '
-                        f'"{self.validator.model_fields[key0]}"="{value}"'
-                    )
-                    self.validator.model_validate(
-                        {key0: value}, context={"parent": parent, "attrs": attrs}
-                    )
-                    return super(type(parent.attrs), parent.attrs).__setitem__(
-                        self.name, json.dumps(value)
-                    )
-                except pydantic.ValidationError as err:
-                    raise errors.StandardAttributeError(
-                        f'Validation of "{value}" for standard attribute "{self.name}" failed.\n'
-                        f"Expected fields: {self.validator.model_fields}\nPydantic error: {err}"
-                    )
-            else:
-                try:
-                    model_fields = list(self.validator.model_fields.keys())
-                except AttributeError:
-                    tmp_model = pydantic.create_model(
-                        self.name, value=(self.validator, ...)
-                    )
-                    try:
-                        _validated_value = tmp_model.model_validate(
-                            {"value": value}, context={"parent": parent, "attrs": attrs}
-                        )
-                    except pydantic.ValidationError as err:
-                        raise errors.StandardAttributeError(
-                            f'Validation of "{value}" for standard attribute "{self.name}" failed.'
-                            f"\nPydantic error: {err}"
-                        )
-                    validated_value = _validated_value.value
-                else:
-                    key0 = model_fields[0]  # ==self.name!
-                    try:
-                        _validated_value = self.validator.model_validate(
-                            {key0: value}, context={"parent": parent, "attrs": attrs}
-                        )
-                    except pydantic.ValidationError as err:
-                        raise errors.StandardAttributeError(
-                            f'Validation of "{value}" for standard attribute "{self.name}" failed.\n'
-                            f"Expected fields: {self.validator.model_fields}\nPydantic error: {err}"
-                        )
-                    validated_value = getattr(_validated_value, key0)
-
-                ret = super(type(parent.attrs), parent.attrs).__setitem__(
-                    self.name, parse_object_for_attribute_setting(validated_value)
+        ret = super(type(parent.attrs), parent.attrs).__setitem__(
+            self.name, self.encode(parent, value, attrs)
+        )
+        if isinstance(value, dict):
+            return ret
+        if self.rdf_predicate is not None:
+            parent.rdf[self.name].predicate = self.rdf_predicate
+        if self.frdf_predicate is not None:
+            parent.frdf[self.name].predicate = self.frdf_predicate
+        return ret
+
+    def encode(self, parent, value, attrs=None):
+        """Validate `value` and return it the way it is written to the attribute of `parent`
+
+        Parameters
+        ----------
+        parent: h5py.File, h5py.Group, h5py.Dataset
+            The parent object, passed to the validator as context
+        value: any
+            The value to validate. Must not be None.
+        attrs: dict, optional=None
+            Other attributes to be set. This is used during dataset creation only.
+
+        Raises
+        ------
+        StandardAttributeError
+            If the value is invalid
+        """
+        if isinstance(value, dict):
+            try:
+                key0 = list(self.validator.model_fields.keys())[0]
+                logger.debug(
+                    f'validating standard attribute "{self.name}" with '
+                    f'"{self.validator.model_fields[key0]}"="{value}"'
+                )
+                self.validator.model_validate(
+                    {key0: value}, context={"parent": parent, "attrs": attrs}
+                )
+                return json.dumps(value)
+            except pydantic.ValidationError as err:
+                raise errors.StandardAttributeError(
+                    f'Validation of "{value}" for standard attribute "{self.name}" failed.\n'
+                    f"Expected fields: {self.validator.model_fields}\nPydantic error: {err}"
                 )
-                if self.rdf_predicate is not None:
-                    parent.rdf[self.name].predicate = self.rdf_predicate
-                if self.frdf_predicate is not None:
-                    parent.frdf[self.name].predicate = self.frdf_predicate
-                return ret
+        try:
+            validated_value = self._validate(value, parent, attrs)
+        except pydantic.ValidationError as err:
+            raise errors.StandardAttributeError(self._validation_error_message(value, err))
+        return parse_object_for_attribute_setting(validated_value)
 
     def get(self, parent: Union[h5py.File, h5py.Group, h5py.Dataset]):
         """Read the attribute from `parent`
@@ -319,58 +424,43 @@ class StandardAttribute:
             ret_val = self.default_value
             if ret_val is self.NONE:
                 return None
-        # is there a return value associated with the validator?
-        # validate:
         if isinstance(ret_val, str):
             if ret_val.startswith("{") and ret_val.endswith("}"):
                 ret_val = json.loads(ret_val)
-            # this is a reference to another attribute
+        try:
+            return self.decode(parent, ret_val)
+        except errors.StandardAttributeError as err:
+            if get_config("ignore_get_std_attr_err"):
+                warnings.warn(str(err), errors.StandardAttributeValidationWarning)
+                return ret_val
+            raise
+
+    def decode(self, parent, value):
+        """Validate the raw attribute value `value` of `parent` and return it the way
+        it is returned by `get()`
+
+        Parameters
+        ----------
+        parent: h5py.File, h5py.Group, h5py.Dataset
+            The parent object, passed to the validator as context
+        value: any
+            The raw value as read from the HDF5 attribute
+
+        Raises
+        ------
+        StandardAttributeError
+            If the value is invalid
+        """
+        if isinstance(value, str):
+            if value.startswith("{") and value.endswith("}"):
+                value = json.loads(value)
 
-        ignore_get_std_attr_err = get_config("ignore_get_std_attr_err")
         try:
-            model_fields = list(self.validator.model_fields.keys())
-        except AttributeError:
-            tmp_model = pydantic.create_model(self.name, value=(self.validator, ...))
-            try:
-                _validated_value = tmp_model.model_validate(
-                    {"value": ret_val}, context={"parent": parent, "attrs": None}
-                )
-            except pydantic.ValidationError as err:
-                if ignore_get_std_attr_err:
-                    warnings.warn(
-                        f'Validation of "{ret_val}" for standard attribute "{self.name}" failed.\n'
-                        f"Pydantic error: {err}",
-                        errors.StandardAttributeValidationWarning,
-                    )
-                else:
-                    raise errors.StandardAttributeError(
-                        f'Validation of "{ret_val}" for standard attribute "{self.name}" failed.\n'
-                        f"Pydantic error: {err}"
-                    )
-            else:
-                ret_val = _validated_value.value
-        else:
-            key0 = model_fields[0]
-            try:
-                ret_val = getattr(
-                    self.validator.model_validate(
-                        {key0: ret_val}, context=dict(attrs=None, parent=parent)
-                    ),
-                    key0,
-                )
-            except pydantic.ValidationError as e:
-                if ignore_get_std_attr_err:
-                    warnings.warn(
-                        f'Validation of "{ret_val}" for standard attribute "{self.name}" failed.\n'
-                        f"Expected fields: {self.validator.model_fields}\nPydantic error: {e}",
-                        errors.StandardAttributeValidationWarning,
-                    )
-                else:
-                    raise errors.StandardAttributeError(
-                        f'Validation of "{ret_val}" for standard attribute "{self.name}" failed.\n'
-                        f"Expected fields: {self.validator.model_fields}\nPydantic error: {e}"
-                    )
-        return ret_val
+            return self._validate(value, parent, None)
+        except pydantic.ValidationError as err:
+            raise errors.StandardAttributeError(
+                self._validation_error_message(value, err)
+            )
 
         # return self.validate(ret_val, parent=parent)
         # try:
@@ -416,22 +506,7 @@ class StandardAttribute:
                 return False
 
         try:
-            model_fields = list(self.validator.model_fields.keys())
-        except AttributeError:
-            tmp_model = pydantic.create_model(self.name, value=(self.validator, ...))
-            try:
-                _validated_value = tmp_model.model_validate(
-                    {"value": value}, context={"parent": parent, "attrs": attrs}
-                )
-            except pydantic.ValidationError as err:
-                return False
-            return False
-
-        key0 = model_fields[0]  # ==self.name!
-        try:
-            _validated_value = self.validator.model_validate(
-                {key0: value}, context={"parent": parent, "attrs": attrs}
-            )
+            self._validate(value, parent, attrs)
         except pydantic.ValidationError as _:
             return False
         return True
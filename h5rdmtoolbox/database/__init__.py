@@ -3,8 +3,9 @@ from typing import Optional
 from typing import Protocol
 
 from .hdfdb import FileDB
-from .hdfdb import FilesDB, ObjDB
+from .hdfdb import FilesDB, ObjDB, build_stats
 from .interface import HDF5DBInterface
+from .scan import FileScan, ObjectRecord, scan
 
 
 def find(source, *args, **kwargs):
@@ -72,4 +73,4 @@ def rdf_find(source, *,
                                       recursive=recursive)
 
 
-__all__ = ['FileDB', 'FilesDB', 'ObjDB', 'HDF5DBInterface', 'lazy']
+__all__ = ['FileDB', 'FilesDB', 'ObjDB', 'HDF5DBInterface', 'lazy', 'scan', 'FileScan', 'ObjectRecord']
@@ -0,0 +1,157 @@
+"""Process-wide pool of read-only HDF5 file handles shared by lazy objects and `FilesDB`.
+
+Lazy objects (see module `lazy`) open their file on demand. Instead of opening and closing the
+file for each access, the handles are kept open in a least-recently-used pool. Handles are keyed
+by the file path and its modification time, so a file changed on disk is opened again.
+The pool size is set by the configuration parameter "file_handle_pool_size". By default, it is 0,
+which means, that files are closed after each access. The handles are opened with the chunk cache
+of the configuration (see `h5rdmtoolbox.wrapper.chunkcache`).
+
+Note, that a file cannot be opened for writing while it is opened read-only in the same process.
+Call `release(filename)` (or `clear()`) before writing to a file with h5py directly.
+`h5rdmtoolbox.File` does this automatically.
+
+Examples
+--------
+>>> import h5rdmtoolbox as h5tbx
+>>> from h5rdmtoolbox.database import handles
+>>> h5tbx.set_config(file_handle_pool_size=16)
+>>> with handles.checkout('my_file.hdf') as h5:
+...     print(h5['/u'].shape)
+"""
+import atexit
+import logging
+import pathlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Generator, Optional, Tuple, Union
+
+import h5py
+
+from .._cfg import get_config
+
+logger = logging.getLogger('h5rdmtoolbox')
+
+PoolKey = Tuple[str, int, Tuple]  # (resolved path, modification time in ns, chunk cache kwargs)
+
+
+class _PoolEntry:
+    """A pooled file handle together with the number of current users"""
+    __slots__ = ('h5', 'users', 'evicted')
+
+    def __init__(self, h5: h5py.File):
+        self.h5 = h5
+        self.users = 0
+        self.evicted = False
+
+    def close_if_unused(self) -> bool:
+        if self.users == 0:
+            self.h5.close()
+            return True
+        self.evicted = True  # closed when the last user checks it in
+        return False
+
+
+class FileHandlePool:
+    """Thread-safe LRU pool of read-only HDF5 file handles.
+
+    Parameters
+    ----------
+    maxsize : Optional[int]
+        Maximum number of open handles. If None, the configuration parameter
+        "file_handle_pool_size" is used.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None):
+        self._maxsize = maxsize
+        self._entries: "OrderedDict[PoolKey, _PoolEntry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} (open handles: {len(self)}/{self.maxsize})>'
+
+    @property
+    def maxsize(self) -> int:
+        """Maximum number of open handles"""
+        if self._maxsize is None:
+            return get_config('file_handle_pool_size')
+        return self._maxsize
+
+    @staticmethod
+    def _key(filename: Union[str, pathlib.Path]) -> PoolKey:
+        from ..wrapper import chunkcache
+        filename = pathlib.Path(filename).resolve()
+        return str(filename), filename.stat().st_mtime_ns, tuple(sorted(chunkcache.file_kwargs().items()))
+
+    def _evict(self):
+        """Close least-recently-used handles until the pool size is respected"""
+        n_evict = len(self._entries) - self.maxsize
+        for key in list(self._entries.keys()):
+            if n_evict <= 0:
+                break
+            entry = self._entries.pop(key)
+            entry.close_if_unused()
+            n_evict -= 1
+
+    @contextmanager
+    def checkout(self, filename: Union[str, pathlib.Path]) -> Generator[h5py.File, None, None]:
+        """Context manager yielding an open read-only handle of the file. The handle must not be
+        closed by the caller. It stays open in the pool after the context is left."""
+        key = self._key(filename)
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is not None and entry.h5.id.valid:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            else:
+                self.misses += 1
+                entry = _PoolEntry(h5py.File(key[0], mode='r', **dict(key[2])))
+                self._entries[key] = entry
+            entry.users += 1
+            self._evict()
+        try:
+            yield entry.h5
+        finally:
+            with self._lock:
+                entry.users -= 1
+                if entry.evicted:
+                    entry.close_if_unused()
+
+    def release(self, filename: Union[str, pathlib.Path]) -> None:
+        """Close all handles of the file, which are not in use"""
+        path = str(pathlib.Path(filename).resolve())
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == path]:
+                self._entries.pop(key).close_if_unused()
+
+    def clear(self) -> None:
+        """Close all handles, which are not in use"""
+        with self._lock:
+            while self._entries:
+                _, entry = self._entries.popitem()
+                entry.close_if_unused()
+
+
+pool = FileHandlePool()
+
+
+def checkout(filename: Union[str, pathlib.Path]):
+    """Checkout an open read-only handle from the process-wide pool. See `FileHandlePool.checkout`"""
+    return pool.checkout(filename)
+
+
+def release(filename: Union[str, pathlib.Path]) -> None:
+    """Close the pooled handles of the file"""
+    pool.release(filename)
+
+
+@atexit.register
+def clear() -> None:
+    """Close all pooled handles"""
+    pool.clear()
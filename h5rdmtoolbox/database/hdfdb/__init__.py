@@ -1,4 +1,6 @@
 from .filedb import FileDB, FilesDB
+from .index import FileIndex
 from .objdb import ObjDB
+from .stats import build_stats
 
-__all__ = ['ObjDB', 'FileDB', 'FilesDB']
+__all__ = ['ObjDB', 'FileDB', 'FilesDB', 'FileIndex', 'build_stats']
@@ -1,11 +1,25 @@
+import itertools
 import pathlib
-from typing import Union, Generator, List, Optional
+import pickle
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from typing import Union, Generator, List, Optional, Dict
 
 import h5py
 
-from .objdb import ObjDB
+from . import utils
+from .index import FileIndex, INDEX_FILENAME, is_index_query
+from .objdb import ObjDB, parse_filter
 from ..interface import HDF5DBInterface
-from .. import lazy
+from .. import handles, lazy
+
+
+def _iter_find(filename: Union[str, pathlib.Path], args, kwargs,
+               pooled: bool = False) -> Generator[lazy.LHDFObject, None, None]:
+    """Yield the results of a file one at a time. The file stays open until the generator is exhausted.
+    If `pooled` is True, the read-only file handle is taken from the shared handle pool."""
+    kwargs = dict(kwargs, as_generator=True)
+    with (handles.checkout(filename) if pooled else h5py.File(filename, mode='r')) as h5:
+        yield from ObjDB(h5).find(*args, **kwargs)
 
 
 class FileDB(HDF5DBInterface):
@@ -24,6 +38,8 @@ class FileDB(HDF5DBInterface):
             return ObjDB(h5).find_one(*args, **kwargs)
 
     def _instance_find(self, *args, **kwargs):
+        if kwargs.get('as_generator', False):
+            return _iter_find(self.filename, args, kwargs)
         with h5py.File(self.filename, 'r') as h5:
             return list(ObjDB(h5).find(*args, **kwargs))
 
@@ -48,8 +64,13 @@ class FileDB(HDF5DBInterface):
     def find(file_or_filename, *args, **kwargs) -> List[lazy.LazyObject]:
         """Please refer to the docstring of the find method of the ObjDB class"""
         if isinstance(file_or_filename, (h5py.Group, h5py.Dataset)):
-            return list(ObjDB(file_or_filename).find(*args, **kwargs))
+            results = ObjDB(file_or_filename).find(*args, **kwargs)
+            if kwargs.get('as_generator', False):
+                return results
+            return list(results)
         else:
+            if kwargs.get('as_generator', False):
+                return _iter_find(file_or_filename, args, kwargs)
             with h5py.File(file_or_filename, 'r') as h5:
                 results = list(ObjDB(h5).find(*args, **kwargs))
             return results
@@ -65,17 +86,53 @@ class FileDB(HDF5DBInterface):
             return results
 
 
+def _find_in_file(filename: pathlib.Path, find_one: bool, args, kwargs):
+    """Search a single file. Called in the worker processes of `FilesDB`"""
+    with h5py.File(filename, mode='r') as h5:
+        if find_one:
+            return ObjDB(h5).find_one(*args, **kwargs)
+        return ObjDB(h5).find(*args, **kwargs)
+
+
 class FilesDB(HDF5DBInterface):
-    """A database interface for multiple HDF5 files."""
+    """A database interface for multiple HDF5 files.
 
-    def __init__(self, filenames: List[Union[str, pathlib.Path]]):
+    Parameters
+    ----------
+    filenames : List[Union[str, pathlib.Path]]
+        The HDF5 files of the database.
+    index : Optional[Union[str, pathlib.Path, FileIndex]]
+        Optional sidecar index (SQLite file). If provided, supported queries are answered
+        by the index without opening the HDF5 files. See `FileIndex` for details.
+    workers : Optional[int]
+        If larger than 1, the files are searched in parallel by a process pool with
+        this number of workers.
+    executor : Optional[concurrent.futures.Executor]
+        Alternatively to `workers`, an executor can be passed, which is used to search
+        the files. The executor is not shut down by the FilesDB.
+    """
+
+    def __init__(self,
+                 filenames: List[Union[str, pathlib.Path]],
+                 index: Optional[Union[str, pathlib.Path, FileIndex]] = None,
+                 workers: Optional[int] = None,
+                 executor: Optional[Executor] = None):
         self.filenames = list(set(pathlib.Path(filename) for filename in filenames))
+        self.workers = workers
+        self.executor = executor
+        if index is not None and not isinstance(index, FileIndex):
+            index = FileIndex(index)
+        self.index: Optional[FileIndex] = index
+        if self.index is not None:
+            self.index.update(self.filenames)
 
     @classmethod
     def from_folder(cls,
                     folder: Union[str, pathlib.Path],
                     hdf_suffixes: Union[str, List[str]] = '.hdf',
-                    recursive: bool = False):
+                    recursive: bool = False,
+                    index: Union[bool, str, pathlib.Path] = False,
+                    workers: Optional[int] = None):
         """Create a FilesDB from a folder containing HDF5 files.
 
         Parameters
@@ -86,6 +143,11 @@ class FilesDB(HDF5DBInterface):
             The suffixes of the HDF5 files to scan for, by default '.hdf'
         recursive : bool, optional
             Whether to scan the folder recursively, by default False
+        index : Union[bool, str, pathlib.Path], optional
+            If True, a sidecar index is built (or updated) in the folder (see `INDEX_FILENAME`).
+            A filename may be passed to store the index elsewhere. By default False
+        workers : Optional[int], optional
+            Number of worker processes used to search the files, by default None (serial search)
 
         Returns
         -------
@@ -103,27 +165,122 @@ class FilesDB(HDF5DBInterface):
                 filenames.extend(folder.rglob(f'*{suffix}'))
             else:
                 filenames.extend(folder.glob(f'*{suffix}'))
-        return cls(filenames)
+        if index is True:
+            index = folder / INDEX_FILENAME
+        elif index is False:
+            index = None
+        return cls(filenames, index=index, workers=workers)
 
     def insert_filename(self, filename: Union[str, pathlib.Path]):
         """Insert a filename to the database"""
         self.filenames.append(pathlib.Path(filename))
         self.filenames = list(set(self.filenames))
 
+    def _index_find(self, flt, objfilter=None, recursive: bool = True,
+                    ignore_attribute_error: bool = False, *args, **kwargs) -> Optional[Dict[str, List[str]]]:
+        """Return the matching object names per filename if the query can be answered
+        by the index. Returns None otherwise, also if arguments are passed, which are
+        unknown to the index (they are handled by the file-based search)."""
+        if self.index is None or not recursive or args or kwargs:
+            return None
+        flt = parse_filter(flt)
+        if not is_index_query(flt):
+            return None
+        self.index.update(self.filenames)
+        if not self.index.supports(flt, self.filenames):
+            return None
+        hits = {}
+        for filename, name in self.index.find(flt,
+                                              objfilter=utils.parse_obj_filter_input(objfilter),
+                                              filenames=self.filenames):
+            hits.setdefault(filename, []).append(name)
+        return hits
+
+    def _parallel_find(self, find_one: bool, args, kwargs) -> Optional[Generator]:
+        """Return a generator yielding the results of each file as soon as they are
+        available. Returns None if no parallel search is configured or the query cannot be
+        sent to other processes (e.g. lambda functions in the filter)."""
+        if self.executor is None and (self.workers is None or self.workers < 2):
+            return None
+        if len(self.filenames) < 2:
+            return None
+        try:
+            pickle.dumps((args, kwargs))
+        except (pickle.PicklingError, AttributeError, TypeError):
+            return None
+
+        def _iter_results():
+            executor = self.executor or ProcessPoolExecutor(max_workers=self.workers)
+            futures = [executor.submit(_find_in_file, filename, find_one, args, kwargs)
+                       for filename in self.filenames]
+            try:
+                for future in as_completed(futures):
+                    yield future.result()
+            finally:
+                # reached if the consumer stops early (e.g. first hit of find_one)
+                for future in futures:
+                    future.cancel()
+                if self.executor is None:
+                    executor.shutdown(wait=True, cancel_futures=True)
+
+        return _iter_results()
+
     def find_one(self, *args, **kwargs) -> lazy.LazyObject:
         """Call find_one on all the files registered. If more than one file
         contains the object, the first one is returned. If you want to find one per file,
-        call find_one_per_file instead."""
+        call find_one_per_file instead.
+
+        If the search runs in parallel (see `workers`), the first hit is returned and the
+        remaining tasks are cancelled. The first hit is not necessarily from the first file."""
+        hits = self._index_find(*args, **kwargs)
+        if hits is not None:
+            for filename, names in hits.items():
+                with handles.checkout(filename) as h5:
+                    return lazy.lazy(h5[names[0]])
+            return None
+        results = self._parallel_find(True, args, kwargs)
+        if results is not None:
+            for ret in results:
+                if ret:
+                    results.close()
+                    return ret
+            return None
         for filename in self.filenames:
-            with h5py.File(filename, mode='r') as h5:
+            with handles.checkout(filename) as h5:
                 ret = ObjDB(h5).find_one(*args, **kwargs)
                 if ret:
                     return ret
 
-    def find(self, *args, **kwargs) -> Generator[lazy.LHDFObject, None, None]:
-        """Call find on all the files"""
-        for filename in self.filenames:
-            with h5py.File(filename, 'r') as h5:
-                ret = ObjDB(h5).find(*args, **kwargs)
-                for r in ret:
-                    yield r
+    def find(self, *args, limit: Optional[int] = None, skip: int = 0,
+             **kwargs) -> Generator[lazy.LHDFObject, None, None]:
+        """Call find on all the files. The results are yielded one at a time. If the search
+        runs in parallel (see `workers`), the results are yielded file by file in the order
+        the files are processed.
+
+        `limit` and `skip` apply to the results of all files. The search stops once
+        `limit` results are found."""
+        kwargs.pop('as_generator', None)  # results are always yielded one at a time
+        stop = None if limit is None else skip + limit
+        hits = self._index_find(*args, **kwargs)
+        if hits is not None:
+            yield from itertools.islice(self._iter_index_hits(hits), skip, stop)
+            return
+        if stop is not None:
+            # no file needs to contribute more than `stop` results:
+            kwargs['limit'] = stop
+        results = self._parallel_find(False, args, kwargs)
+        if results is not None:
+            yield from itertools.islice(itertools.chain.from_iterable(results), skip, stop)
+            return
+        yield from itertools.islice(
+            itertools.chain.from_iterable(_iter_find(filename, args, kwargs, pooled=True)
+                                          for filename in self.filenames),
+            skip, stop
+        )
+
+    @staticmethod
+    def _iter_index_hits(hits: Dict[str, List[str]]) -> Generator[lazy.LHDFObject, None, None]:
+        for filename, names in hits.items():
+            with handles.checkout(filename) as h5:
+                for name in names:
+                    yield lazy.lazy(h5[name])
@@ -0,0 +1,323 @@
+"""Persistent (sidecar) attribute index for HDF5 files.
+
+The index stores the object paths, object types, shapes, dtypes and (flattened) attribute
+values of HDF5 files in a SQLite database. Queries supported by the index can then be
+answered without opening any HDF5 file. The selection of files and object types, string
+equality and the existence of attributes are evaluated by SQLite, other operators on the
+selected rows. Entries of a file are invalidated (and rebuilt) when the modification time or
+the size of the file changes.
+
+Attributes, whose raw values are bytes or arrays, are compared differently by the file-based
+search (no decoding, element-wise comparison). Queries on such attributes as well as queries
+for values of these types are therefore not answered by the index.
+"""
+import json
+import logging
+import pathlib
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Type, Union
+
+import h5py
+import numpy as np
+
+from . import query
+from ..scan import ObjectRecord, scan
+
+logger = logging.getLogger('h5rdmtoolbox')
+
+INDEX_FILENAME = '.h5tbx_index.sqlite'
+
+# query operators, which can be evaluated on the index:
+INDEX_OPERATORS = ('$eq', '$in', '$regex', '$exists', '$gt', '$gte', '$lt', '$lte', '$basename')
+# object properties, which are stored in the index:
+INDEX_PROPERTIES = ('$name', '$basename', '$shape', '$ndim', '$dtype')
+# version of the database layout. Indices of older versions are rebuilt:
+INDEX_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (filename TEXT PRIMARY KEY, mtime REAL, size INTEGER);
+CREATE TABLE IF NOT EXISTS objects (filename TEXT, name TEXT, kind TEXT, shape TEXT, dtype TEXT,
+                                    PRIMARY KEY (filename, name));
+CREATE TABLE IF NOT EXISTS attrs (filename TEXT, name TEXT, key TEXT, value TEXT);
+CREATE INDEX IF NOT EXISTS attrs_key_value ON attrs (key, value);
+CREATE INDEX IF NOT EXISTS attrs_object ON attrs (filename, name, key);
+CREATE INDEX IF NOT EXISTS objects_kind ON objects (kind);
+CREATE TABLE IF NOT EXISTS inexact_keys (filename TEXT, key TEXT);
+CREATE INDEX IF NOT EXISTS inexact_keys_key ON inexact_keys (key);
+CREATE TEMP TABLE IF NOT EXISTS query_files (filename TEXT PRIMARY KEY);
+"""
+
+Hit = Tuple[str, str]  # (filename, object name)
+
+
+def _to_builtin(value):
+    """Convert attribute values (numpy types, bytes) into JSON-serializable python objects"""
+    if isinstance(value, (bytes, np.bytes_)):
+        try:
+            return value.decode()
+        except UnicodeDecodeError:
+            return str(value)
+    if isinstance(value, np.ndarray):
+        return [_to_builtin(v) for v in value.tolist()]
+    if isinstance(value, (list, tuple)):
+        return [_to_builtin(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _flatten_attribute(key: str, value) -> Iterable[Tuple[str, object]]:
+    """Yield (key, value) pairs of an attribute. JSON-dictionaries are additionally
+    flattened using dots as separator, e.g. "b.c" for {"b": {"c": 2}}"""
+    value = _to_builtin(value)
+    yield key, value
+    if isinstance(value, str) and value.startswith('{') and value.endswith('}'):
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            return
+    if isinstance(value, dict):
+        for k, v in value.items():
+            yield from _flatten_attribute(f'{key}.{k}', v)
+
+
+def _is_inexact(value) -> bool:
+    """Return True if the index representation of a (raw or query) value is not
+    compared like the value itself by the file-based search"""
+    return isinstance(value, (bytes, np.bytes_, np.ndarray, list, tuple, dict))
+
+
+def _decode_dtype(dtype: Optional[str]):
+    if dtype is None:
+        return None
+    try:
+        return np.dtype(dtype)
+    except TypeError:
+        return dtype
+
+
+def is_index_query(flt: Dict) -> bool:
+    """Return True if the (normalized) filter can be evaluated on the index."""
+    for qk, qv in flt.items():
+        if qk.startswith('$') and qk not in INDEX_PROPERTIES:
+            return False
+        if callable(qv):
+            return False
+        if isinstance(qv, dict) and not all(ok in INDEX_OPERATORS for ok in qv):
+            return False
+        if qk == '$basename' and not isinstance(qv, str):
+            return False
+        if qk.startswith('$'):
+            continue
+        if not isinstance(qv, dict):
+            qv = {'$eq': qv}
+        for ok, ov in qv.items():
+            if ok == '$exists':
+                # the file-based search does not resolve dotted keys for $exists:
+                if '.' in qk:
+                    return False
+            elif ok == '$in':
+                if not isinstance(ov, (list, tuple)) or any(_is_inexact(v) for v in ov):
+                    return False
+            elif _is_inexact(ov):
+                return False
+    return True
+
+
+class FileIndex:
+    """SQLite sidecar index of one or multiple HDF5 files.
+
+    Parameters
+    ----------
+    index_filename : Union[str, pathlib.Path]
+        The filename of the SQLite database. It is created if it does not exist.
+
+    Examples
+    --------
+    >>> idx = FileIndex('campaign/.h5tbx_index.sqlite')
+    >>> idx.update(['campaign/run1.hdf', 'campaign/run2.hdf'])
+    >>> idx.find({'standard_name': 'x_velocity'}, objfilter=h5py.Dataset)
+    [('campaign/run1.hdf', '/u')]
+    """
+
+    def __init__(self, index_filename: Union[str, pathlib.Path]):
+        self.index_filename = pathlib.Path(index_filename)
+        self._con = sqlite3.connect(str(self.index_filename))
+        version = self._con.execute('PRAGMA user_version').fetchone()[0]
+        if version < INDEX_VERSION:
+            with self._con:
+                for table in ('files', 'objects', 'attrs', 'inexact_keys'):
+                    self._con.execute(f'DROP TABLE IF EXISTS {table}')
+                self._con.execute(f'PRAGMA user_version = {INDEX_VERSION}')
+        self._con.executescript(_SCHEMA)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} "{self.index_filename}">'
+
+    def close(self):
+        """Close the connection to the SQLite database"""
+        self._con.close()
+
+    @staticmethod
+    def _key(filename: Union[str, pathlib.Path]) -> str:
+        return str(pathlib.Path(filename).resolve())
+
+    def is_valid(self, filename: Union[str, pathlib.Path]) -> bool:
+        """Return True if the index entry of the file is up-to-date"""
+        stat = pathlib.Path(filename).stat()
+        row = self._con.execute('SELECT mtime, size FROM files WHERE filename=?',
+                                (self._key(filename),)).fetchone()
+        return row is not None and row[0] == stat.st_mtime and row[1] == stat.st_size
+
+    def remove(self, filename: Union[str, pathlib.Path]):
+        """Remove all entries of a file from the index"""
+        key = self._key(filename)
+        with self._con:
+            for table in ('files', 'objects', 'attrs', 'inexact_keys'):
+                self._con.execute(f'DELETE FROM {table} WHERE filename=?', (key,))
+
+    def add(self, filename: Union[str, pathlib.Path]):
+        """(Re-)index a file"""
+        key = self._key(filename)
+        stat = pathlib.Path(filename).stat()
+        objects, attrs, inexact = [], [], set()
+
+        def _collect(rec: ObjectRecord):
+            if rec.kind == 'dataset':
+                objects.append((key, rec.name, 'dataset', json.dumps(rec.shape), str(rec.dtype)))
+            else:
+                objects.append((key, rec.name, 'group', None, None))
+            for ak, av in rec.attrs.items():
+                if _is_inexact(av):
+                    inexact.add((key, ak))
+                for fk, fv in _flatten_attribute(ak, av):
+                    attrs.append((key, rec.name, fk, json.dumps(fv, default=str)))
+
+        logger.debug(f'Indexing file "{filename}"')
+        scan(filename, visitors=[_collect])
+
+        self.remove(filename)
+        with self._con:
+            self._con.execute('INSERT INTO files VALUES (?, ?, ?)', (key, stat.st_mtime, stat.st_size))
+            self._con.executemany('INSERT INTO objects VALUES (?, ?, ?, ?, ?)', objects)
+            self._con.executemany('INSERT INTO attrs VALUES (?, ?, ?, ?)', attrs)
+            self._con.executemany('INSERT INTO inexact_keys VALUES (?, ?)', sorted(inexact))
+
+    def update(self, filenames: Iterable[Union[str, pathlib.Path]]):
+        """Index all files, which are not yet indexed or have changed since indexing"""
+        for filename in filenames:
+            if not self.is_valid(filename):
+                self.add(filename)
+
+    def _set_query_files(self, filenames: Iterable[Union[str, pathlib.Path]]):
+        with self._con:
+            self._con.execute('DELETE FROM temp.query_files')
+            self._con.executemany('INSERT OR IGNORE INTO temp.query_files VALUES (?)',
+                                  [(self._key(f),) for f in filenames])
+
+    def supports(self, flt: Dict, filenames: Optional[Iterable[Union[str, pathlib.Path]]] = None) -> bool:
+        """Return True if the index returns the same result for the (normalized) filter
+        as the file-based search. This is not the case, if the filter is not an index query
+        (see `is_index_query`) or if a queried attribute has a bytes or array value in one
+        of the files."""
+        if not is_index_query(flt):
+            return False
+        keys = {qk.split('.', 1)[0] for qk in flt if not qk.startswith('$')}
+        if not keys:
+            return True
+        sql = f'SELECT 1 FROM inexact_keys WHERE key IN ({", ".join("?" * len(keys))})'
+        if filenames is not None:
+            self._set_query_files(filenames)
+            sql += ' AND filename IN (SELECT filename FROM temp.query_files)'
+        return self._con.execute(sql + ' LIMIT 1', sorted(keys)).fetchone() is None
+
+    def _select(self, sql: str, conditions: List[str], params: List) -> sqlite3.Cursor:
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        return self._con.execute(sql, params)
+
+    def _evaluate(self, qk: str, qv, conditions: List[str], params: List) -> Set[Hit]:
+        """Return the set of objects matching a single filter query {qk: qv}. The objects
+        are restricted by the SQL `conditions` on the objects table (alias "o"). String
+        equality and the existence of attributes are evaluated in SQL, all other operators
+        on the selected rows."""
+        if qk == '$basename':
+            qk, qv = '$name', {'$basename': qv}
+        if not isinstance(qv, dict):
+            qv = {'$eq': qv}
+        eq_str = qv.get('$eq', None) if isinstance(qv.get('$eq', None), str) else None
+
+        if qk.startswith('$'):
+            conditions = list(conditions)
+            params = list(params)
+            if qk != '$name':
+                conditions.append("o.kind = 'dataset'")
+            elif eq_str is not None:
+                conditions.append('o.name = ?')
+                params.append(eq_str)
+            rows = self._select('SELECT o.filename, o.name, o.shape, o.dtype FROM objects o',
+                                conditions, params)
+            values = {}
+            for f, n, shape, dtype in rows:
+                if qk == '$name':
+                    values[(f, n)] = n
+                else:
+                    _shape = tuple(json.loads(shape))
+                    values[(f, n)] = {'$shape': _shape, '$ndim': len(_shape), '$dtype': _decode_dtype(dtype)}[qk]
+        else:
+            attr_conditions = list(conditions) + ['a.key = ?']
+            attr_params = list(params) + [qk]
+            if eq_str is not None:
+                attr_conditions.append('a.value = ?')
+                attr_params.append(json.dumps(eq_str))
+            rows = self._select('SELECT a.filename, a.name, a.value FROM attrs a '
+                                'JOIN objects o ON a.filename = o.filename AND a.name = o.name',
+                                attr_conditions, attr_params)
+            values = {(f, n): json.loads(v) for f, n, v in rows}
+            if any(ok == '$exists' and not ov for ok, ov in qv.items()):
+                # all other objects have "None" as attribute value. Like the file-based
+                # search, the root group is only considered if the attribute exists:
+                rows = self._select('SELECT o.filename, o.name FROM objects o',
+                                    list(conditions) + [
+                                        "o.name != '/'",
+                                        'NOT EXISTS (SELECT 1 FROM attrs a WHERE a.filename = o.filename '
+                                        'AND a.name = o.name AND a.key = ?)'
+                                    ],
+                                    list(params) + [qk])
+                values.update({(f, n): None for f, n in rows})
+
+        found = set()
+        for hit, value in values.items():
+            if all(query.operator[ok](value, ov) for ok, ov in qv.items()):
+                found.add(hit)
+        return found
+
+    def find(self,
+             flt: Dict,
+             objfilter: Optional[Union[Type[h5py.Group], Type[h5py.Dataset]]] = None,
+             filenames: Optional[Iterable[Union[str, pathlib.Path]]] = None) -> List[Hit]:
+        """Find objects in the index.
+
+        Parameters
+        ----------
+        flt : Dict
+            The (normalized) filter query. See `is_index_query` for the supported queries.
+        objfilter : Optional[Union[Type[h5py.Group], Type[h5py.Dataset]]]
+            If provided, only objects of this type are returned.
+        filenames : Optional[Iterable[Union[str, pathlib.Path]]]
+            If provided, the search is restricted to these files.
+
+        Returns
+        -------
+        List[Tuple[str, str]]
+            Sorted list of (filename, object name) tuples
+        """
+        conditions, params = [], []
+        if filenames is not None:
+            self._set_query_files(filenames)
+            conditions.append('o.filename IN (SELECT filename FROM temp.query_files)')
+        if objfilter is not None:
+            conditions.append('o.kind = ?')
+            params.append('dataset' if issubclass(objfilter, h5py.Dataset) else 'group')
+        results = [self._evaluate(qk, qv, conditions, params) for qk, qv in flt.items()]
+        return sorted(set.intersection(*results)) if results else []
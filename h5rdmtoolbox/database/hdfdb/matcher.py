@@ -0,0 +1,342 @@
+"""Compilation of (MongoDB-like) filter dictionaries into a predicate tree.
+
+The filter is compiled once and then evaluated for every HDF object of a single
+traversal. Within an AND-combination, cheap conditions (object type, name, existence of
+attributes) are evaluated first, so that attribute values and dataset values are only
+read if required.
+"""
+import json
+from typing import Callable, Dict, Generator, List, Optional, Set, Type, Union
+
+import h5py
+
+from . import query
+
+# evaluation costs. Cheap conditions are evaluated first:
+COST_OBJFILTER = 0
+COST_NAME = 1
+COST_ATTR_EXISTS = 2
+COST_PROPERTY = 3
+COST_ATTR_VALUE = 4
+COST_DATA_VALUE = 5
+
+LOGICAL_OPERATORS = ('$and', '$or')
+
+
+def _get_operator(name: str) -> Callable:
+    try:
+        return query.operator[name]
+    except KeyError:
+        raise KeyError(f'Unexpected operator "{name}". Valid ones are: {list(query.operator.keys())}')
+
+
+def _format_ops(ops: Dict) -> str:
+    return ', '.join(f'{ok} {ov!r}' for ok, ov in ops.items())
+
+
+class Condition:
+    """Base class of all conditions of the predicate tree. Counts how often it
+    was evaluated and how often it matched."""
+    cost: int = COST_ATTR_VALUE
+
+    def __init__(self):
+        self.evaluated = 0
+        self.matched = 0
+
+    def __call__(self, obj: Union[h5py.Group, h5py.Dataset], is_root: bool) -> bool:
+        self.evaluated += 1
+        ret = self._match(obj, is_root)
+        if ret:
+            self.matched += 1
+        return ret
+
+    def _match(self, obj, is_root: bool) -> bool:
+        raise NotImplementedError
+
+    def describe(self) -> str:
+        """Return a human-readable description of the condition"""
+        raise NotImplementedError
+
+    def explain(self) -> Dict:
+        """Return the statistics of the condition"""
+        return {'condition': self.describe(), 'evaluated': self.evaluated, 'matched': self.matched}
+
+
+class ObjFilterCondition(Condition):
+    """Only objects of a certain type (group or dataset) match"""
+    cost = COST_OBJFILTER
+
+    def __init__(self, objfilter: Union[Type[h5py.Group], Type[h5py.Dataset]]):
+        super().__init__()
+        self.objfilter = objfilter
+
+    def _match(self, obj, is_root: bool) -> bool:
+        return isinstance(obj, self.objfilter)
+
+    def describe(self) -> str:
+        return f'objfilter {self.objfilter.__name__}'
+
+
+class PropertyCondition(Condition):
+    """Compares a property of the HDF object (e.g. name, shape, dtype)"""
+
+    def __init__(self, prop: str, ops: Dict, recursive: bool, ignore_attribute_error: bool):
+        super().__init__()
+        self.prop = prop
+        self.ops = {ok: (_get_operator(ok), ov) for ok, ov in ops.items()}
+        self._ops_repr = _format_ops(ops)
+        self.recursive = recursive
+        self.ignore_attribute_error = ignore_attribute_error
+        self.cost = COST_NAME if prop == 'name' else COST_PROPERTY
+
+    def _match(self, obj, is_root: bool) -> bool:
+        if is_root and not self.recursive and isinstance(obj, h5py.Group):
+            # a non-recursive search only considers the members of a group
+            return False
+        try:
+            value = getattr(obj, self.prop)
+        except AttributeError:
+            if self.recursive or self.ignore_attribute_error:
+                return False
+            raise ValueError(f'No such attribute: {self.prop}.')
+        return all(op(value, ov) for op, ov in self.ops.values())
+
+    def describe(self) -> str:
+        return f'${self.prop} {self._ops_repr}'
+
+
+class AttributeCondition(Condition):
+    """Compares the value of an HDF attribute. Keys with dots are also resolved in
+    JSON-dictionary attributes, e.g. "b.c" matches attribute "b" with value '{"c": 2}'."""
+
+    def __init__(self, key: str, ops: Dict):
+        super().__init__()
+        self.key = key
+        self.ops = {ok: (_get_operator(ok), ov) for ok, ov in ops.items()}
+        self._ops_repr = _format_ops(ops)
+        self.cost = COST_ATTR_EXISTS if set(ops) == {'$exists'} else COST_ATTR_VALUE
+        self._dict_path = key.split('.') if '.' in key else None
+
+    def _values(self, attrs):
+        yield attrs.get(self.key, None)
+        if self._dict_path is not None:
+            value = attrs.get(self._dict_path[0], None)
+            if isinstance(value, str) and value.startswith('{') and value.endswith('}'):
+                value = json.loads(value)
+            for item in self._dict_path[1:]:
+                if not isinstance(value, dict):
+                    value = None
+                    break
+                value = value.get(item, None)
+            if value is not None:
+                yield value
+
+    def _match(self, obj, is_root: bool) -> bool:
+        attrs = obj.attrs
+        if is_root:
+            # the start object is only considered if the attribute exists:
+            if self.key not in attrs and (self._dict_path is None or self._dict_path[0] not in attrs):
+                return False
+        if self.cost == COST_ATTR_EXISTS:
+            exists = self.key in attrs
+            return all(op(True if exists else None, ov) for op, ov in self.ops.values())
+        return any(all(op(value, ov) for op, ov in self.ops.values()) for value in self._values(attrs))
+
+    def describe(self) -> str:
+        return f'{self.key} {self._ops_repr}'
+
+
+class ValueCondition(Condition):
+    """Compares the (transformed) data of a dataset"""
+    cost = COST_DATA_VALUE
+
+    def __init__(self, comparison: str, math_operator: str, comparison_value):
+        super().__init__()
+        self.comparison = comparison
+        self.math_operator = math_operator
+        self.comparison_value = comparison_value
+        self._cfunc = query.value_operator[comparison]
+        self._tfunc = query.math_operator[math_operator]
+
+    def _match(self, obj, is_root: bool) -> bool:
+        if not isinstance(obj, h5py.Dataset):
+            return False
+        if self.comparison == '$eq' and self.math_operator == '$eq' and obj.ndim > 0 and obj.dtype.kind in 'biuf':
+            # compare numeric arrays block by block instead of reading the full dataset:
+            return query.array_equal(obj, self.comparison_value)
+        transformed_value = self._tfunc(obj, self.comparison_value)
+        if transformed_value is None:
+            return False
+        return bool(self._cfunc(transformed_value, self.comparison_value))
+
+    def describe(self) -> str:
+        return f'{self.comparison} {self.math_operator}(data) {self.comparison_value!r}'
+
+
+class AndCondition(Condition):
+    """All conditions must match. Cheap conditions are evaluated first"""
+
+    def __init__(self, conditions: List[Condition]):
+        super().__init__()
+        self.conditions = sorted(conditions, key=lambda c: c.cost)
+        self.cost = max((c.cost for c in conditions), default=COST_OBJFILTER)
+
+    def _match(self, obj, is_root: bool) -> bool:
+        return all(c(obj, is_root) for c in self.conditions)
+
+    def describe(self) -> str:
+        return '$and'
+
+    def explain(self) -> Dict:
+        ret = super().explain()
+        ret['conditions'] = [c.explain() for c in self.conditions]
+        return ret
+
+
+class OrCondition(AndCondition):
+    """At least one of the conditions must match. Cheap conditions are evaluated first"""
+
+    def _match(self, obj, is_root: bool) -> bool:
+        return any(c(obj, is_root) for c in self.conditions)
+
+    def describe(self) -> str:
+        return '$or'
+
+
+def _compile_item(qk: str, qv, recursive: bool, ignore_attribute_error: bool) -> Condition:
+    if isinstance(qv, set):
+        raise TypeError(
+            'It seems that your query has a typo. Expecting a dictionary or base string or number but got '
+            f'a set: {qv}'
+        )
+    if qk in LOGICAL_OPERATORS:
+        if not isinstance(qv, (list, tuple)) or not all(isinstance(f, Dict) for f in qv):
+            raise TypeError(f'Expected a list of filter dictionaries for "{qk}" but got {qv}')
+        conditions = [_compile_dict(f, recursive, ignore_attribute_error) for f in qv]
+        return AndCondition(conditions) if qk == '$and' else OrCondition(conditions)
+
+    if qk == '$basename':
+        if not isinstance(qv, str):
+            raise TypeError('Expected {$basename: "search value"} but value is not a string')
+        qk, qv = '$name', {'$basename': qv}
+
+    if qk in query.value_operator:
+        # user wants to compare qv to the value of the object
+        if not isinstance(qv, Dict):
+            qv = {'$eq': qv}
+        if len(qv) != 1:
+            raise ValueError(f'Cannot use query.operator "{qk}" for dict with more than one key')
+        math_operator_name, comparison_value = list(qv.items())[0]
+        return ValueCondition(qk, math_operator_name, comparison_value)
+
+    if callable(qv):
+        qv = {'$userdefined': qv}
+    elif not isinstance(qv, Dict):
+        qv = {'$eq': qv}
+
+    if qk.startswith('$'):
+        return PropertyCondition(qk[1:], qv, recursive, ignore_attribute_error)
+    return AttributeCondition(qk, qv)
+
+
+def _compile_dict(flt: Dict, recursive: bool, ignore_attribute_error: bool) -> Condition:
+    conditions = [_compile_item(qk, qv, recursive, ignore_attribute_error) for qk, qv in flt.items()]
+    if len(conditions) == 1:
+        return conditions[0]
+    return AndCondition(conditions)
+
+
+def _iter_members(group: h5py.Group, seen: Set) -> Generator[Union[h5py.Group, h5py.Dataset], None, None]:
+    """Yield all members of a group depth-first, similar to `h5py.Group.visititems`: Only
+    hard links are followed and every object is returned once. In contrast to visititems,
+    the traversal can be stopped at any time."""
+    for name in group:
+        if not isinstance(group.get(name, getlink=True), h5py.HardLink):
+            continue
+        obj = group[name]
+        if obj.id in seen:
+            continue
+        seen.add(obj.id)
+        yield obj
+        if isinstance(obj, h5py.Group):
+            yield from _iter_members(obj, seen)
+
+
+class CompiledFilter:
+    """A filter dictionary compiled into a predicate tree.
+
+    Parameters
+    ----------
+    flt : Dict
+        The (normalized) filter dictionary. Multiple keys are combined by AND. Logical
+        combinations are possible with "$and" and "$or", e.g.
+        {'$or': [{'units': 'm/s'}, {'units': 'km/s'}]}
+    objfilter : Optional[Union[Type[h5py.Group], Type[h5py.Dataset]]]
+        If provided, only objects of this type match.
+    recursive : bool
+        Whether the filter is used in a recursive search.
+    ignore_attribute_error : bool
+        If True, missing object properties are ignored in non-recursive searches.
+    """
+
+    def __init__(self,
+                 flt: Dict,
+                 objfilter: Optional[Union[Type[h5py.Group], Type[h5py.Dataset]]] = None,
+                 recursive: bool = True,
+                 ignore_attribute_error: bool = False):
+        self.flt = flt
+        self.objfilter = objfilter
+        self.recursive = recursive
+        condition = _compile_dict(flt, recursive, ignore_attribute_error)
+        if objfilter is not None:
+            condition = AndCondition([ObjFilterCondition(objfilter), condition])
+        self.condition = condition
+        self.visited = 0
+
+    def __call__(self, obj: Union[h5py.Group, h5py.Dataset], is_root: bool = False) -> bool:
+        self.visited += 1
+        return self.condition(obj, is_root)
+
+    def iter_candidates(self, h5obj: Union[h5py.Group, h5py.Dataset]):
+        """Yield (obj, is_root) for all objects to be tested (single traversal)"""
+        yield h5obj, True
+        if not isinstance(h5obj, h5py.Group):
+            return
+        if self.recursive:
+            yield from ((obj, False) for obj in _iter_members(h5obj, {h5obj.id}))
+        else:
+            for obj in h5obj.values():
+                yield obj, False
+
+    def iter_matches(self,
+                     h5obj: Union[h5py.Group, h5py.Dataset],
+                     skip: int = 0,
+                     limit: Optional[int] = None) -> Generator[Union[h5py.Group, h5py.Dataset], None, None]:
+        """Yield the matching objects while traversing. The traversal stops after
+        `limit` matches (after skipping the first `skip` matches)."""
+        if limit is not None and limit <= 0:
+            return
+        n_found = 0
+        for obj, is_root in self.iter_candidates(h5obj):
+            if self(obj, is_root):
+                if skip > 0:
+                    skip -= 1
+                    continue
+                yield obj
+                n_found += 1
+                if limit is not None and n_found >= limit:
+                    return
+
+    def run(self, h5obj: Union[h5py.Group, h5py.Dataset], skip: int = 0, limit: Optional[int] = None) -> List:
+        """Return the list of matching objects"""
+        return list(self.iter_matches(h5obj, skip=skip, limit=limit))
+
+    def explain(self) -> Dict:
+        """Return a report of the last run, i.e. which conditions ran how often and how
+        many nodes were visited"""
+        return {'filter': self.flt,
+                'objfilter': None if self.objfilter is None else self.objfilter.__name__,
+                'recursive': self.recursive,
+                'nodes_visited': self.visited,
+                'nodes_matched': self.condition.matched,
+                'conditions': self.condition.explain()}
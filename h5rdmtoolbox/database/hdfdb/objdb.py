@@ -1,10 +1,8 @@
 import h5py
-import json
-import numpy as np
 from typing import Type
-from typing import Union, Dict, List, Callable, Optional
+from typing import Union, Dict, List, Optional, Generator
 
-from . import query, utils
+from . import matcher, utils
 from ..interface import HDF5DBInterface
 from ...protocols import LazyDataset, LazyGroup, LazyObject
 from .. import lazy
@@ -16,96 +14,6 @@ def basename(name: str) -> str:
     return name.rsplit('/', 1)[-1]
 
 
-class RecFind:
-    """Visititems class to find all objects with a certain attribute value"""
-
-    def __init__(self, func: Callable, attribute, value, objfilter, ignore_attribute_error):
-        self._func = func
-        self._attribute = attribute
-        if isinstance(value, set):
-            raise TypeError(
-                'It seems that your query has a typo. Expecting a dictionary or base string or number but got '
-                f'a set: {value}'
-            )
-        # if isinstance(value, dict):
-        #     _operators = query.operator.get(k) for k in value.keys()
-        self._value = value
-        self.found_objects = []
-        self.objfilter = objfilter
-        self.ignore_attribute_error = ignore_attribute_error
-
-    def __call__(self, name, h5obj):
-        if self.objfilter:
-            if not isinstance(h5obj, self.objfilter):
-                return
-        try:
-            objattr = h5obj.__getattribute__(self._attribute)
-            if self._func(objattr, self._value):
-                self.found_objects.append(h5obj)
-        except AttributeError:
-            return
-            # if not self.ignore_attribute_error:
-            #     raise AttributeError(f'HDF object {h5obj} has no attribute "{self._attribute}". You may add '
-            #                          'an objfilter, because dataset and groups dont share all attributes. '
-            #                          'One example is "dtype", which is only available with datasets') from e
-
-
-class RecValueFind:
-    def __init__(self, transformer_func: Callable, comparison_func: Callable, comparison_value):
-        self._tfunc = transformer_func
-        self._cfunc = comparison_func
-        self._value = comparison_value
-        self._ndim = query.get_ndim(comparison_value)
-        self.objfilter = h5py.Dataset
-        self.found_objects = []
-
-    def __call__(self, name, obj):
-        if self.objfilter:
-            if not isinstance(obj, self.objfilter):
-                return
-        transformed_value = self._tfunc(obj, self._value)
-        if transformed_value is not None:
-            if self._cfunc(transformed_value, self._value):
-                self.found_objects.append(obj)
-
-
-class RecAttrFind:
-    """Visititems class to find all objects with a certain attribute value"""
-
-    def __init__(self, func: Callable, attribute, value, objfilter):
-        self._func = func
-        self._attribute = attribute
-        self._value = value
-        self.objfilter = objfilter
-        self.found_objects = []
-
-    def __call__(self, name, obj):
-        if self.objfilter:
-            if not isinstance(obj, self.objfilter):
-                return
-        if '.' in self._attribute:
-            # dict comparison:
-            attr_name, dict_path = self._attribute.split('.', 1)
-            attr_value = obj.attrs.get(attr_name, None)
-            if attr_value is not None:
-                if isinstance(attr_value, str) and attr_value.startswith('{') and attr_value.endswith('}'):
-                    _attr_dict = json.loads(attr_value)
-
-                    _attr_value = None
-                    for _item in dict_path.split('.'):
-                        try:
-                            _attr_value = _attr_dict[_item]
-                        except KeyError:
-                            break
-
-                    if _attr_value:
-                        if self._func(_attr_value, self._value):
-                            self.found_objects.append(obj)
-
-        if self._func(obj.attrs.get(self._attribute, None), self._value):
-            self.found_objects.append(obj)
-
-
 class RecPropCollect:
     """Visititems class to collect all class attributes matching a certain string"""
 
@@ -148,172 +56,24 @@ class RecAttrCollect:
                     self.found_objects.append(obj.attrs[self._attribute_name])
 
 
-def _h5find(h5obj: Union[h5py.Group, h5py.Dataset], qk, qv, recursive, objfilter, ignore_attribute_error: bool = False):
-    """
-
-    Parameters
-    ----------
-    h5obj: h5py.Group, h5py.Dataset
-        h5py object (group or dataset) to start search from
-
-    Returns
-    -------
-
-    """
-
-    if qk == '$basename':
-        qk = '$name'
-        assert isinstance(qv, str), 'Expected {$basename: "search value"} but value is not a string'
-        qv = {'$basename': qv}
-
-    found_objs = []
-    if qk in query.value_operator:
-        # user wants to compare qv to the value of the object
-
-        if not isinstance(qv, Dict):
-            qv = {'$eq': qv}
-
-        if len(qv) != 1:
-            raise ValueError(f'Cannot use query.operator "{qk}" for dict with more than one key')
+ListOfLazyObjs = List[Union[LazyDataset, LazyGroup]]
 
-        if isinstance(h5obj, h5py.Dataset):
-            recursive = False
 
-        # h5obj is a group:
-        # assert isinstance(h5obj, h5py.Group)
-
-        for math_operator_name, comparison_value in qv.items():
-
-            if recursive:
-                rf = RecValueFind(query.math_operator[math_operator_name], query.value_operator[qk], comparison_value)
-                h5obj.visititems(rf)  # will not visit the root group
-                for found_obj in rf.found_objects:
-                    found_objs.append(found_obj)
-            else:
-                # iterator over all datasets in group
-                if isinstance(h5obj, h5py.Group):
-                    iterator = h5obj.values()
-                else:
-                    iterator = [h5obj]
-                for target_obj in iterator:
-                    if isinstance(target_obj, h5py.Dataset):
-                        transformed_value = query.math_operator[math_operator_name](target_obj, comparison_value)
-                        if transformed_value is not None:
-                            if query.value_operator[qk](transformed_value, comparison_value):
-                                found_objs.append(target_obj)
-            return found_objs
-
-        if isinstance(qv, Dict) and len(qv) != 1:
-            raise ValueError(f'Cannot use query.operator "{qk}" for dict with more than one key')
-
-        if isinstance(qv, (float, int)):
-            qv_ndim = 0
-        else:
-            assert isinstance(qv, (str, np.ndarray)), f'Unexpected type: {type(qv)}'
-            qv_ndim = np.ndim(qv)
-
-        if qv_ndim > 0 and qk != '$eq':
-            raise ValueError(f'Cannot use query.operator "{qk}" for non-scalar value "{qv}"')
-        if qk == '$eq':
-            qk = '$arreq'
-
-        if recursive:
-            rf = RecValueFind(query.operator[qk], qv, qv_ndim)
-            h5obj.visititems(rf)
-            for found_obj in rf.found_objects:
-                found_objs.append(found_obj)
+def parse_filter(flt: Union[Dict, str, List[str]]) -> Dict:
+    """Return the filter as dictionary. A string or a list of strings is interpreted as
+    attribute names, which must exist. An empty dictionary matches any object."""
+    if flt == {}:  # just find any!
+        flt = {'$name': {'$regex': '.*'}}
+    if isinstance(flt, str):  # just find the attribute and don't filter for the value:
+        flt = {flt: {'$regex': '.*'}}
+    if isinstance(flt, List):
+        if all(isinstance(f, str) for f in flt):
+            flt = {f: {'$regex': '.*'} for f in flt}
         else:
-            for ds in h5obj.values():
-                if isinstance(ds, h5py.Dataset):
-                    if ds.ndim == qv_ndim:
-                        if query.value_operator[qk](ds[()], qv):
-                            found_objs.append(ds)
-        return found_objs
-
-    is_hdf_attrs_search = qk[0] != '$'
-
-    if callable(qv):
-        qv = {'$userdefined': qv}
-    else:
-        if not isinstance(qv, Dict):
-            qv = {'$eq': qv}
-
-    # find objects with equal value
-    if is_hdf_attrs_search:
-        for ok, ov in qv.items():
-            if recursive:
-                _skip = False
-                if objfilter:
-                    if not isinstance(h5obj, objfilter):
-                        _skip = True
-                if not _skip:
-                    if '.' in qk:
-                        # dict comparison:
-                        attr_name, dict_path = qk.split('.', 1)
-                        if attr_name in h5obj.attrs:
-                            _attr_dict = dict(h5obj.attrs[attr_name])
-                            _attr_value = None
-                            for _item in dict_path.split('.'):
-                                try:
-                                    _attr_value = _attr_dict[_item]
-                                except KeyError:
-                                    break
-                            if _attr_value:
-                                if query.operator[ok](_attr_value, ov):
-                                    found_objs.append(h5obj)
-                    elif qk in h5obj.attrs:
-                        if query.operator[ok](h5obj.attrs[qk], ov):
-                            found_objs.append(h5obj)
-                rf = RecAttrFind(query.operator[ok], qk, ov, objfilter=objfilter)
-                h5obj.visititems(rf)
-                for found_obj in rf.found_objects:
-                    found_objs.append(found_obj)
-            else:
-                if qk in h5obj.attrs:
-                    if query.operator[ok](h5obj.attrs[qk], ov):
-                        found_objs.append(h5obj)
-                if isinstance(h5obj, h5py.Group):
-                    for hv in h5obj.values():
-                        if qk in hv.attrs:
-                            if query.operator[ok](hv.attrs[qk], ov):
-                                found_objs.append(hv)
-    else:
-        for ok, ov in qv.items():
-            if recursive:
-                rf = RecFind(query.operator[ok], qk[1:], ov, objfilter=objfilter,
-                             ignore_attribute_error=ignore_attribute_error)
-                rf(name='/', h5obj=h5obj)  # visit the root group
-                # rf(name=h5obj.name, h5obj=h5obj)  # visit the root group
-                h5obj.visititems(rf)  # will not visit the root group
-                for found_obj in rf.found_objects:
-                    found_objs.append(found_obj)
-            else:
-                if isinstance(h5obj, h5py.Dataset):
-                    iterator = [(basename(h5obj.name), h5obj), ]
-                else:
-                    iterator = h5obj.items()
-                for hk, hv in iterator:
-                    if objfilter:
-                        if not isinstance(hv, objfilter):
-                            continue
-
-                    if qk.startswith('$'):
-                        try:
-                            objattr = hv.__getattribute__(qk[1:])
-                        except AttributeError:
-                            if ignore_attribute_error:
-                                continue
-                            raise ValueError(f'No such attribute: {qk[1:]}.')
-
-                        try:
-                            if query.operator[ok](objattr, ov):
-                                found_objs.append(hv)
-                        except Exception as e:
-                            raise Exception(f'Error while filtering for "{qk}" with "{ok}" and "{ov}": {e}')
-    return found_objs
-
-
-ListOfLazyObjs = List[Union[LazyDataset, LazyGroup]]
+            raise TypeError(f'Filter must be a dictionary, a string or a list of strings not {type(flt)}')
+    if not isinstance(flt, Dict):
+        raise TypeError(f'Filter must be a dictionary not {type(flt)}')
+    return flt
 
 
 def find(h5obj: Union[h5py.Group, h5py.Dataset],
@@ -321,15 +81,23 @@ def find(h5obj: Union[h5py.Group, h5py.Dataset],
          objfilter: Union[h5py.Group, h5py.Dataset, None],
          recursive: bool,
          find_one: bool,
-         ignore_attribute_error) -> Optional[Union[List[LazyObject], LazyObject]]:
+         ignore_attribute_error,
+         limit: Optional[int] = None,
+         skip: int = 0,
+         as_generator: bool = False
+         ) -> Optional[Union[List[LazyObject], LazyObject, Generator[LazyObject, None, None]]]:
     """Find datasets or groups in an object.
 
+    The filter is compiled once into a predicate tree (see `matcher.CompiledFilter`), which
+    is evaluated for every object during a single traversal of the object.
+
     Parameters
     ----------
     h5obj: Group or Dataset
         obj from where to start searching
     flt: Union[Dict, str, List[str]]
-        The filter query similar to the pymongo syntax.
+        The filter query similar to the pymongo syntax. Multiple keys are combined by AND.
+        "$and" and "$or" take a list of filter dictionaries.
     objfilter: Optional
         Filter only for dataset or group. if None, consider both types.
     recursive: bool
@@ -338,6 +106,13 @@ def find(h5obj: Union[h5py.Group, h5py.Dataset],
         If True, the first search result is returned
     ignore_attribute_error: bool
         If True, attribute errors are ignored.
+    limit: Optional[int]
+        Maximum number of results. The traversal stops once the limit is reached.
+    skip: int
+        Number of results to skip.
+    as_generator: bool
+        If True, a generator is returned, which yields the lazy objects one at a time
+        during the traversal. The HDF5 file must stay open while consuming the generator.
 
     Examples
     --------
@@ -347,35 +122,35 @@ def find(h5obj: Union[h5py.Group, h5py.Dataset],
     ...     hdfdb.ObjDB(h5).find({'standard_name': 'x_velocity'})
     ...     # all datasets must be gzip-compressed:
     ...     hdfdb.ObjDB(h5).find({'$compression': 'gzip'}, objfilter='dataset')
+    ...     # logical combinations:
+    ...     hdfdb.ObjDB(h5).find({'$or': [{'units': 'm/s'}, {'units': 'km/s'}]})
+    ...     # the first ten results, one at a time:
+    ...     for res in hdfdb.ObjDB(h5).find({'units': 'm/s'}, limit=10, as_generator=True):
+    ...         print(res)
     """
-    if flt == {}:  # just find any!
-        flt = {'$name': {'$regex': '.*'}}
-    if isinstance(flt, str):  # just find the attribute and don't filter for the value:
-        flt = {flt: {'$regex': '.*'}}
-    if isinstance(flt, List):
-        if all(isinstance(f, str) for f in flt):
-            flt = {f: {'$regex': '.*'} for f in flt}
-        else:
-            raise TypeError(f'Filter must be a dictionary, a string or a list of strings not {type(flt)}')
-    if not isinstance(flt, Dict):
-        raise TypeError(f'Filter must be a dictionary not {type(flt)}')
-    objfilter = utils.parse_obj_filter_input(objfilter)
-
-    # perform the filter process:
-    # ---------------------------
-    results = []
-    # go through all filter queries. They are treated as AND queries
-    for k, v in flt.items():
-        _results = _h5find(h5obj, k, v, recursive, objfilter, ignore_attribute_error)
-        results.append(_results)
-    # only get common results from all results:
-    common_results = lazy.lazy(list(set.intersection(*map(set, results))))
+    compiled_filter = compile_filter(flt, objfilter, recursive, ignore_attribute_error)
+    if find_one:
+        limit = 1
+    if as_generator:
+        return (lazy.lazy(obj) for obj in compiled_filter.iter_matches(h5obj, skip=skip, limit=limit))
+    results = lazy.lazy(compiled_filter.run(h5obj, skip=skip, limit=limit))
 
     if find_one:
-        if len(common_results):
-            return common_results[0]
+        if len(results):
+            return results[0]
         return  # Nothing found
-    return common_results
+    return results
+
+
+def compile_filter(flt: Union[Dict, str, List[str]],
+                   objfilter: Union[str, h5py.Group, h5py.Dataset, None] = None,
+                   recursive: bool = True,
+                   ignore_attribute_error: bool = False) -> matcher.CompiledFilter:
+    """Compile the filter query into a predicate tree, which can be evaluated in a single traversal"""
+    return matcher.CompiledFilter(parse_filter(flt),
+                                  objfilter=utils.parse_obj_filter_input(objfilter),
+                                  recursive=recursive,
+                                  ignore_attribute_error=ignore_attribute_error)
 
 
 def distinct(h5obj: Union[h5py.Group, h5py.Dataset],
@@ -482,7 +257,30 @@ class ObjDB(HDF5DBInterface):
                        flt: Union[Dict, str],
                        objfilter=None,
                        recursive: bool = True,
-                       ignore_attribute_error: bool = False) -> List[LazyObject]:
+                       ignore_attribute_error: bool = False,
+                       limit: Optional[int] = None,
+                       skip: int = 0,
+                       as_generator: bool = False) -> Union[List[LazyObject], Generator[LazyObject, None, None]]:
+        """Find objects in the obj
+
+        Parameters
+        ----------
+        flt : Union[Dict, str]
+            The filter query similar to the pymongo syntax.
+        objfilter : Union[h5py.Group, h5py.Dataset, None]
+            If provided, only objects of this type will be returned.
+        recursive : bool
+            If True, the search will be recursive. If False, only the current obj
+            will be searched.
+        ignore_attribute_error : bool
+            If True, an AttributeError will be ignored if the attribute is not found.
+        limit : Optional[int]
+            Maximum number of results. The traversal stops once the limit is reached.
+        skip : int
+            Number of results to skip.
+        as_generator : bool
+            If True, a generator yielding one lazy object at a time is returned instead of a list.
+        """
         if isinstance(self.src_obj, h5py.Dataset) and recursive:
             recursive = False
         results = find(self.src_obj,
@@ -490,7 +288,10 @@ class ObjDB(HDF5DBInterface):
                        objfilter=objfilter,
                        recursive=recursive,
                        find_one=False,
-                       ignore_attribute_error=ignore_attribute_error)
+                       ignore_attribute_error=ignore_attribute_error,
+                       limit=limit,
+                       skip=skip,
+                       as_generator=as_generator)
         return results
 
     def _instance_rdf_find(self, *,
@@ -511,6 +312,26 @@ class ObjDB(HDF5DBInterface):
                                           rdf_object=rdf_object,
                                           recursive=recursive))
 
+    def explain(self,
+                flt: Union[Dict, str],
+                objfilter=None,
+                recursive: bool = True,
+                ignore_attribute_error: bool = False) -> Dict:
+        """Run the query and report which conditions were evaluated how often and
+        how many objects were visited.
+
+        Examples
+        --------
+        >>> ObjDB(h5).explain({'units': 'm/s', '$basename': 'u'})
+        {'filter': {...}, 'objfilter': None, 'recursive': True, 'nodes_visited': 12, 'nodes_matched': 1,
+         'conditions': {'condition': '$and', 'evaluated': 12, 'matched': 1, 'conditions': [...]}}
+        """
+        if isinstance(self.src_obj, h5py.Dataset) and recursive:
+            recursive = False
+        compiled_filter = compile_filter(flt, objfilter, recursive, ignore_attribute_error)
+        compiled_filter.run(self.src_obj)
+        return compiled_filter.explain()
+
     def distinct(self, key: str,
                  objfilter: Optional[Union[h5py.Group, h5py.Dataset]] = None):
         """Return a distinct list of all found targets. A target generally is
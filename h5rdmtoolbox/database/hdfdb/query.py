@@ -1,8 +1,13 @@
 """query module"""
 import logging
-import numpy as np
+import pathlib
 import re
 import warnings
+from collections import OrderedDict
+from typing import Dict, Generator, Optional, Tuple
+
+import h5py
+import numpy as np
 
 logger = logging.getLogger('h5rdmtoolbox')
 
@@ -110,16 +115,132 @@ operator = {'$regex': _regex,
 value_operator = {'$eq': _arreq, '$gt': _gt, '$gte': _gte, '$lt': _lt, '$lte': _lte}
 
 
+# maximum number of bytes read at once when evaluating value queries:
+BLOCK_SIZE = 2 ** 24
+# maximum number of datasets, of which the statistics are kept in memory:
+STATS_CACHE_SIZE = 1024
+
+_stats_cache: "OrderedDict[Tuple, Dict]" = OrderedDict()
+
+
+def iter_slices(obj: h5py.Dataset) -> Generator[Tuple[slice, ...], None, None]:
+    """Yield slices reading the dataset block by block along the first dimension. The
+    blocks are aligned to the chunks and are at most `BLOCK_SIZE` bytes large (but at
+    least one chunk or one row)."""
+    if obj.ndim == 0:
+        yield ()
+        return
+    rest = (slice(None),) * (obj.ndim - 1)
+    row_size = max(1, obj.dtype.itemsize * int(np.prod(obj.shape[1:])))
+    n_rows = max(1, BLOCK_SIZE // row_size)
+    if obj.chunks is not None:
+        n_rows = max(1, n_rows // obj.chunks[0]) * obj.chunks[0]
+    for start in range(0, obj.shape[0], n_rows):
+        yield (slice(start, min(start + n_rows, obj.shape[0])),) + rest
+
+
+def _compute_stats(obj: h5py.Dataset) -> Optional[Dict]:
+    """Compute the statistics of a numeric dataset in a single pass over its blocks.
+    The mean and the variance of the blocks are combined with the parallel algorithm
+    of Chan et al., so memory usage is bounded by the block size."""
+    if obj.dtype.kind not in 'biuf':
+        return None
+    if obj.size == 0:
+        return {'$count_nonzero': 0}
+    count, total, m2 = 0, 0., 0.
+    nan_count, nan_total = 0, 0.
+    _min, _max, nonzero = None, None, 0
+    for slc in iter_slices(obj):
+        block = np.asarray(obj[slc], dtype=np.float64)
+        n = block.size
+        block_mean = block.mean()
+        block_m2 = float(np.sum((block - block_mean) ** 2))
+        if count:
+            delta = block_mean - total / count
+            m2 += block_m2 + delta ** 2 * count * n / (count + n)
+        else:
+            m2 = block_m2
+        count += n
+        total += float(block.sum())
+        valid = ~np.isnan(block)
+        nan_count += int(np.count_nonzero(valid))
+        nan_total += float(block[valid].sum())
+        nonzero += int(np.count_nonzero(block))
+        _min = block.min() if _min is None else np.minimum(_min, block.min())
+        _max = block.max() if _max is None else np.maximum(_max, block.max())
+    return {'$mean': total / count,
+            '$nanmean': nan_total / nan_count if nan_count else np.nan,
+            '$std': np.sqrt(m2 / count),
+            '$min': float(_min),
+            '$max': float(_max),
+            '$count_nonzero': nonzero}
+
+
+def _stats_key(obj: h5py.Dataset) -> Optional[Tuple]:
+    """Return the cache key of a dataset. Only datasets of files opened in read-only mode
+    are cached, as the modification time of a file opened for writing is not reliable."""
+    try:
+        if obj.file.mode != 'r':
+            return None
+        stat = pathlib.Path(obj.file.filename).stat()
+    except (OSError, ValueError):
+        return None
+    return obj.file.filename, obj.name, stat.st_mtime_ns, stat.st_size
+
+
+def get_stats(obj: h5py.Dataset) -> Optional[Dict]:
+    """Return the statistics ($mean, $nanmean, $std, $min, $max, $count_nonzero) of a
+    numeric dataset. Precomputed statistics (see module `stats`) are used if available.
+    Otherwise, the data is read chunk by chunk. The result is cached, thus repeated
+    queries on unchanged files do not read the data again. Returns None for non-numeric
+    datasets."""
+    from .stats import lookup
+    if obj.dtype.kind not in 'biuf':
+        return None
+    key = _stats_key(obj)
+    if key is not None and key in _stats_cache:
+        _stats_cache.move_to_end(key)
+        return _stats_cache[key]
+    stats = None if key is None else lookup(obj)
+    if stats is None:
+        stats = _compute_stats(h5py.Dataset(obj.id))  # avoid the xarray interface of the wrapper classes
+    if key is not None:
+        _stats_cache[key] = stats
+        while len(_stats_cache) > STATS_CACHE_SIZE:
+            _stats_cache.popitem(last=False)
+    return stats
+
+
+def array_equal(obj: h5py.Dataset, value) -> bool:
+    """Check if the data of the dataset is equal to the value. The data is compared block
+    by block and the comparison stops at the first difference."""
+    value = np.asarray(value)
+    if value.shape != obj.shape:
+        return False
+    obj = h5py.Dataset(obj.id)
+    return all(np.array_equal(obj[slc], value[slc]) for slc in iter_slices(obj))
+
+
 def _pass(obj, comparison_value):
     if get_ndim(comparison_value) == obj.ndim:
         return obj[()]
     return None
 
 
-def _mean(obj, _):
-    if obj.dtype.char == 'S':
-        return None
-    return np.mean(obj[()])
+def _reducer(name: str):
+    """Return the math operator function returning the statistic `name` of the dataset"""
+
+    def _reduce(obj, _):
+        stats = get_stats(obj)
+        if stats is None:
+            return None
+        return stats.get(name, None)
+
+    _reduce.__name__ = name[1:]
+    return _reduce
+
+
+_mean = _reducer('$mean')
 
 
 def get_ndim(value) -> int:
@@ -130,4 +251,9 @@ def get_ndim(value) -> int:
 
 
 math_operator = {'$eq': _pass,
-                 '$mean': _mean}
+                 '$mean': _mean,
+                 '$nanmean': _reducer('$nanmean'),
+                 '$std': _reducer('$std'),
+                 '$min': _reducer('$min'),
+                 '$max': _reducer('$max'),
+                 '$count_nonzero': _reducer('$count_nonzero')}
@@ -0,0 +1,130 @@
+"""Precomputed dataset statistics stored in a sidecar file next to the HDF5 file.
+
+The statistics ($mean, $nanmean, $std, $min, $max, $count_nonzero) of all numeric datasets
+are computed chunk by chunk and written to a hidden JSON file (see `sidecar_filename`). The
+sidecar stores the modification time and the size of the HDF5 file. If the file changes, the
+sidecar is outdated and ignored until `build_stats` is called again.
+Value queries, lazy datasets and the HTML representation use the statistics if available.
+"""
+import json
+import logging
+import pathlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import h5py
+
+from . import query
+from ..scan import scan
+
+logger = logging.getLogger('h5rdmtoolbox')
+
+STATS_SUFFIX = '.h5tbx_stats.json'
+# maximum number of sidecar files kept in memory:
+SIDECAR_CACHE_SIZE = 64
+
+_sidecar_cache: "OrderedDict[Tuple, Dict]" = OrderedDict()
+
+
+def sidecar_filename(filename: Union[str, pathlib.Path]) -> pathlib.Path:
+    """Return the filename of the statistics sidecar of an HDF5 file"""
+    filename = pathlib.Path(filename)
+    return filename.parent / f'.{filename.name}{STATS_SUFFIX}'
+
+
+def _fingerprint(filename: Union[str, pathlib.Path]) -> str:
+    stat = pathlib.Path(filename).stat()
+    return f'{stat.st_mtime_ns}-{stat.st_size}'
+
+
+def compute_stats(filename: Union[str, pathlib.Path]) -> Dict[str, Dict]:
+    """Compute the statistics of all numeric datasets of a file"""
+    results = {}
+    with h5py.File(filename, mode='r') as h5:
+        for rec in scan(h5).datasets():
+            if rec.dtype.kind in 'biuf':
+                results[rec.name] = query._compute_stats(h5[rec.name])
+    return results
+
+
+def _build_file_stats(filename: pathlib.Path) -> pathlib.Path:
+    fingerprint = _fingerprint(filename)
+    logger.debug(f'Computing statistics of file "{filename}"')
+    datasets = compute_stats(filename)
+    target = sidecar_filename(filename)
+    with open(target, 'w') as f:
+        json.dump({'fingerprint': fingerprint, 'datasets': datasets}, f, indent=2)
+    return target
+
+
+def build_stats(filenames: Union[str, pathlib.Path, Iterable[Union[str, pathlib.Path]]],
+                workers: Optional[int] = None) -> List[pathlib.Path]:
+    """Compute the statistics of all numeric datasets and write them into sidecar files.
+
+    Parameters
+    ----------
+    filenames : Union[str, pathlib.Path, Iterable[Union[str, pathlib.Path]]]
+        The HDF5 file(s)
+    workers : Optional[int]
+        If larger than 1, the files are processed in parallel by this number of processes.
+
+    Returns
+    -------
+    List[pathlib.Path]
+        The filenames of the sidecar files
+
+    Examples
+    --------
+    >>> import h5rdmtoolbox as h5tbx
+    >>> h5tbx.database.build_stats(pathlib.Path('campaign').glob('*.hdf'), workers=4)
+    """
+    if isinstance(filenames, (str, pathlib.Path)):
+        filenames = [filenames]
+    filenames = [pathlib.Path(filename) for filename in filenames]
+    if workers is None or workers < 2 or len(filenames) < 2:
+        return [_build_file_stats(filename) for filename in filenames]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_build_file_stats, filenames))
+
+
+def load_stats(filename: Union[str, pathlib.Path]) -> Optional[Dict[str, Dict]]:
+    """Return the statistics of all datasets of a file from its sidecar. Returns None if no
+    sidecar exists or if the file has changed since the statistics were built."""
+    target = sidecar_filename(filename)
+    if not target.exists():
+        return None
+    fingerprint = _fingerprint(filename)
+    key = (str(target.resolve()), fingerprint)
+    if key in _sidecar_cache:
+        _sidecar_cache.move_to_end(key)
+        return _sidecar_cache[key]
+    with open(target) as f:
+        sidecar = json.load(f)
+    if sidecar.get('fingerprint', None) != fingerprint:
+        logger.debug(f'Statistics sidecar of "{filename}" is outdated')
+        return None
+    _sidecar_cache[key] = sidecar['datasets']
+    while len(_sidecar_cache) > SIDECAR_CACHE_SIZE:
+        _sidecar_cache.popitem(last=False)
+    return sidecar['datasets']
+
+
+def file_stats(obj: Union[h5py.Group, h5py.Dataset]) -> Optional[Dict[str, Dict]]:
+    """Return the precomputed statistics of all datasets of the file of `obj` or None if
+    not available. Files opened for writing are not looked up, as they may have changed."""
+    try:
+        if obj.file.mode != 'r':
+            return None
+        return load_stats(obj.file.filename)
+    except (OSError, ValueError):
+        return None
+
+
+def lookup(obj: h5py.Dataset) -> Optional[Dict]:
+    """Return the precomputed statistics of a dataset or None if not available. Datasets
+    of files opened for writing are not looked up, as they may have changed."""
+    stats = file_stats(obj)
+    if stats is None:
+        return None
+    return stats.get(obj.name, None)
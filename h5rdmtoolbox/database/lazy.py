@@ -1,29 +1,60 @@
 """lazy objects. user can work with datasets and groups without having to open the file him/her-self"""
 import pathlib
+import pickle
+from contextlib import contextmanager
 from typing import Union, List, Dict, Optional
 
 import h5py
 
 from h5rdmtoolbox.protected_attributes import COORDINATES
+from . import handles
 from h5rdmtoolbox.protocols import LazyObject
 
 
 class LHDFObject:
     """Lazy HDF object. This object is a proxy for an HDF object (dataset or group) that returns data
-    on-demand. This means, that the file is opened when the object is accessed and closed when the object
-    is no longer needed. This is useful for working with large files, where the user does not want to
-    open the file manually, but still wants to work with the dataset.
+    on-demand. This means, that the file is opened when the object is accessed. The read-only file
+    handles are shared by all lazy objects (see module `handles`). This is useful for working with
+    large files, where the user does not want to open the file manually, but still wants to work
+    with the dataset.
+
+    Lazy objects are compact slotted records. Only the attributes of the object itself are read
+    during initialization.
     """
+    __slots__ = ('filename', 'name', '_attrs', '_file')
 
     def __init__(self, obj: Union[h5py.Group, h5py.Dataset]):
         self.filename = pathlib.Path(obj.file.filename)
-        self._attrs = dict(obj.attrs)
+        self._attrs = dict(obj.attrs.items())
         self.name = obj.name
         self._file = None
 
     def __repr__(self):
         return f'<{self.__class__.__name__} "{self.name}" in "{self.filename}">'
 
+    def __getstate__(self):
+        """Attribute values, which cannot be pickled (object references like the DIMENSION_LIST)
+        are dropped. They are meaningless outside the opened file anyway."""
+        state = dict(getattr(self, '__dict__', {}))
+        for cls in type(self).__mro__:
+            for slot in getattr(cls, '__slots__', ()):
+                if hasattr(self, slot):
+                    state[slot] = getattr(self, slot)
+        state['_file'] = None
+        attrs = {}
+        for k, v in self._attrs.items():
+            try:
+                pickle.dumps(v)
+            except TypeError:
+                continue
+            attrs[k] = v
+        state['_attrs'] = attrs
+        return state
+
+    def __setstate__(self, state):
+        for k, v in state.items():
+            object.__setattr__(self, k, v)
+
     def __lt__(self, other):
         return self.name < other.name
 
@@ -34,13 +65,20 @@ class LHDFObject:
             other_filename = other.filename
         return self.name == other.name and self.filename == other_filename and self.attrs == other.attrs
 
-    def __enter__(self):
+    @contextmanager
+    def _checkout(self):
+        """Yield the (wrapped) HDF object using a pooled read-only file handle"""
         from .. import File
-        self._file = File(self.filename)
-        return self._file[self.name]
+        with handles.checkout(self.filename) as h5:
+            yield File(h5.id)[self.name]
+
+    def __enter__(self):
+        self._file = self._checkout()
+        return self._file.__enter__()
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self._file.close()
+        self._file.__exit__(exc_type, exc_val, exc_tb)
+        self._file = None
 
     @property
     def basename(self) -> str:
@@ -69,34 +107,48 @@ class LHDFObject:
 
 
 class LGroup(LHDFObject):
-    """Lazy Group"""
+    """Lazy Group. Only the names and kinds (group or dataset) of the members are
+    read during initialization. Members are built on first access and then kept."""
+    __slots__ = ('_child_kinds', '_children')
 
     def __init__(self, obj: h5py.Group):
         super().__init__(obj)
-
-        self._children = {}
-        for k, v in obj.items():
-            if isinstance(v, h5py.Group):
-                self._children[k] = LGroup(v)
-                if ' ' not in k and not hasattr(self, k):
-                    setattr(self, k, self._children[k])
-            elif isinstance(v, h5py.Dataset):
-                self._children[k] = LDataset(v)
-                if ' ' not in k and not hasattr(self, k):
-                    setattr(self, k, self._children[k])
+        self._child_kinds: Dict[str, str] = {}
+        for k in obj.keys():
+            cls = obj.get(k, getclass=True)
+            if cls is None:
+                continue
+            if issubclass(cls, h5py.Group):
+                self._child_kinds[k] = 'group'
+            elif issubclass(cls, h5py.Dataset):
+                self._child_kinds[k] = 'dataset'
+        self._children: Dict[str, LHDFObject] = {}
 
     def keys(self):
         """Return the keys of the group which are the names of datasets and groups"""
-        return self._children.keys()
+        return self._child_kinds.keys()
 
     def __getitem__(self, item: str):
-        if item in self._children:
-            return self._children[item]
-        raise KeyError(f'No such item: {item}. Known items: {self.keys()}')
+        if item not in self._child_kinds:
+            raise KeyError(f'No such item: {item}. Known items: {self.keys()}')
+        child = self._children.get(item, None)
+        if child is None:
+            with handles.checkout(self.filename) as h5:
+                child = lazy(h5[self.name][item])
+            self._children[item] = child
+        return child
+
+    def __getattr__(self, item: str):
+        # natural naming of the members. Only called if no regular attribute is found:
+        if not item.startswith('_') and ' ' not in item and item in self._child_kinds:
+            return self[item]
+        raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{item}'")
 
 
 class LDataset(LHDFObject):
     """Lazy Dataset"""
+    __slots__ = ('ndim', 'shape', 'dtype', 'size', 'chunks', 'compression', 'compression_opts',
+                 'shuffle', 'fletcher32', 'maxshape', 'fillvalue', 'scaleoffset', 'external', '_coords')
 
     def __init__(self, obj: h5py.Dataset):
         super().__init__(obj)
@@ -129,23 +181,29 @@ class LDataset(LHDFObject):
         return f'<LDataset "{self.name}" in "{self.filename}" attrs=({attrs_str})>'
 
     def __getitem__(self, item):
-        from .. import File
-        with File(self.filename, mode='r') as h5:
-            return h5[self.name][item]
+        with self._checkout() as ds:
+            return ds[item]
 
     @property
     def coords(self):
         return self._coords
 
+    @property
+    def stats(self) -> Optional[Dict]:
+        """Return the statistics ($mean, $nanmean, $std, $min, $max, $count_nonzero) of a numeric
+        dataset. Precomputed statistics (see `h5rdmtoolbox.database.build_stats`) are used if
+        available, otherwise the data is read chunk by chunk. Returns None for non-numeric data."""
+        from .hdfdb import query
+        with self._checkout() as ds:
+            return query.get_stats(ds)
+
     def isel(self, **indexers):
-        from .. import File
-        with File(self.filename) as h5:
-            return h5[self.name].isel(**indexers)
+        with self._checkout() as ds:
+            return ds.isel(**indexers)
 
     def sel(self, **coords):
-        from .. import File
-        with File(self.filename) as h5:
-            return h5[self.name].sel(**coords)
+        with self._checkout() as ds:
+            return ds.sel(**coords)
 
     # def find(self, flt: Union[Dict, str],
     #          objfilter: Union[str, h5py.Dataset, h5py.Group, None] = None,
@@ -1,3 +1,5 @@
+import hashlib
+import json
 import os
 import pathlib
 import warnings
@@ -6,12 +8,17 @@ from typing import List, Dict, Any, Union, Generator, Optional
 
 import h5py
 import numpy as np
+from pymongo import InsertOne, UpdateOne
 from pymongo.collection import Collection
 from pymongo.errors import InvalidDocument
 
 from .interface import ExtHDF5DBInterface
 from .. import protected_attributes
 from ..database import lazy
+from .scan import ObjectRecord, scan
+
+# number of write operations sent to the database at once:
+DEFAULT_BATCH_SIZE = 1000
 
 
 def get_file_creation_time(filename: Union[str, pathlib.Path], tz=None) -> datetime:
@@ -156,73 +163,138 @@ def _generate_dataset_document(
         ]
 
     if axis == 0:
-        docs = []
-        for i in range(dataset.shape[axis]):
-            dataset_slice = [(i, i + 1, 1)]
-            dataset_slice.extend((0, None, 1) for _ in range(dataset.ndim - 1))
-            doc = {
-                "filename": filename,
-                "name": dataset.name,
-                "basename": os.path.basename(dataset.name),
-                "file_creation_time": filename_ctime,
-                "shape": dataset.shape,
-                "ndim": dataset.ndim,
-                "hdfobj": "dataset",
-                "slice": tuple(dataset_slice),
-            }
-
-            dim_ls = []
-            if dims is not None:
-                for dim in dims:
-                    if not isinstance(dim, h5py.Dataset):
-                        raise TypeError(
-                            f"Dimension must be of type h5py.Dataset, not {type(dim)}"
-                        )
-                    dim_ls.append(dim)
-
-            if len(dataset.dims[axis]) > 0:
-                for iscale in range(len(dataset.dims[axis])):
-                    dim = dataset.dims[axis][iscale]
-                    if dim.ndim != 1:
-                        warnings.warn(
-                            f"Dimension scale dataset must be 1D, not {dim.ndim}D. Skipping"
-                        )
-                    else:
-                        if dim.name not in dim_ls:
-                            # add dim scale to list
-                            dim_ls.append(dim)
-
-            for dim in dim_ls:
-                scale = dim[i]
-                if use_standard_names_for_dim_scales:
-                    dim_name_to_use = dim.attrs.get("standard_name", None)
-                    if dim_name_to_use is None:
-                        dim_name_to_use = os.path.basename(dim.name[1:])
-
-                else:
-                    dim_name_to_use = os.path.basename(dim.name[1:])
-                # TODO: add string entry that tells us where the scale ds is located
-                doc[dim_name_to_use] = type2mongo(scale)
-
-            for ak, av in dataset.attrs.items():
-                if ak not in protected_attributes.h5rdmtoolbox:
-                    if ak not in ignore_attrs:
-                        if ak == protected_attributes.COORDINATES:
-                            if isinstance(av, (np.ndarray, list)):
-                                for c in av:
-                                    doc[c[1:]] = float(dataset.parent[c][()])
-                            else:
-                                doc[av[1:]] = float(dataset.parent[av][()])
-                        else:
-                            doc[ak] = type2mongo(av)
-            docs.append(doc)
-        return docs
+        return list(
+            _iter_dataset_documents_axis0(
+                dataset,
+                filename,
+                filename_ctime,
+                ignore_attrs,
+                dims,
+                use_standard_names_for_dim_scales,
+            )
+        )
     raise NotImplementedError(
         "This method is under heavy construction. Currently, "
         "only accepts axis==0 in this development stage."
     )
 
 
+def _to_mongo_values(data: np.ndarray) -> List:
+    """Convert an array into a list of mongo-compatible values"""
+    if data.dtype.kind in "iuf":
+        return data.tolist()  # vectorized conversion into python int/float
+    return [type2mongo(v) for v in data]
+
+
+def _iter_dataset_documents_axis0(
+    dataset: h5py.Dataset,
+    filename: str,
+    filename_ctime: datetime,
+    ignore_attrs: List[str],
+    dims: List[h5py.Dataset] = None,
+    use_standard_names_for_dim_scales: bool = False,
+) -> Generator[Dict, None, None]:
+    """Yield one document per index of the first dimension. Dimension scales and
+    coordinates are read once as arrays and not for every document."""
+    dim_ls = []
+    if dims is not None:
+        for dim in dims:
+            if not isinstance(dim, h5py.Dataset):
+                raise TypeError(
+                    f"Dimension must be of type h5py.Dataset, not {type(dim)}"
+                )
+            dim_ls.append(dim)
+    for iscale in range(len(dataset.dims[0])):
+        dim = dataset.dims[0][iscale]
+        if dim.ndim != 1:
+            warnings.warn(
+                f"Dimension scale dataset must be 1D, not {dim.ndim}D. Skipping"
+            )
+        elif dim.name not in [d.name for d in dim_ls]:
+            # add dim scale to list
+            dim_ls.append(dim)
+
+    scale_values = {}
+    for dim in dim_ls:
+        if use_standard_names_for_dim_scales:
+            dim_name_to_use = dim.attrs.get("standard_name", None)
+            if dim_name_to_use is None:
+                dim_name_to_use = os.path.basename(dim.name[1:])
+        else:
+            dim_name_to_use = os.path.basename(dim.name[1:])
+        # TODO: add string entry that tells us where the scale ds is located
+        scale_values[dim_name_to_use] = _to_mongo_values(
+            np.asarray(h5py.Dataset(dim.id)[()])
+        )
+
+    attrs_doc = {}
+    for ak, av in dataset.attrs.items():
+        if ak not in protected_attributes.h5rdmtoolbox:
+            if ak not in ignore_attrs:
+                if ak == protected_attributes.COORDINATES:
+                    if isinstance(av, (np.ndarray, list)):
+                        for c in av:
+                            attrs_doc[c[1:]] = float(dataset.parent[c][()])
+                    else:
+                        attrs_doc[av[1:]] = float(dataset.parent[av][()])
+                else:
+                    attrs_doc[ak] = type2mongo(av)
+
+    base_doc = {
+        "filename": filename,
+        "name": dataset.name,
+        "basename": os.path.basename(dataset.name),
+        "file_creation_time": filename_ctime,
+        "shape": dataset.shape,
+        "ndim": dataset.ndim,
+        "hdfobj": "dataset",
+    }
+    other_slices = tuple((0, None, 1) for _ in range(dataset.ndim - 1))
+    for i in range(dataset.shape[0]):
+        doc = dict(base_doc)
+        doc["slice"] = ((i, i + 1, 1),) + other_slices
+        for name, values in scale_values.items():
+            doc[name] = values[i]
+        doc.update(attrs_doc)
+        yield doc
+
+
+class _BulkWriter:
+    """Collects write operations and sends them to the collection with `bulk_write`
+    in batches of `batch_size` operations."""
+
+    def __init__(self, collection: Collection, batch_size: int = DEFAULT_BATCH_SIZE, ordered: bool = True):
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be a positive integer, not {batch_size}")
+        self.collection = collection
+        self.batch_size = batch_size
+        self.ordered = ordered
+        self._ops = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.flush()
+
+    def add(self, doc: Dict, update: bool):
+        """Add an upsert (update=True) or insert operation of the document"""
+        if update:
+            _doc = {k: type2mongo(v) for k, v in doc.items()}
+            self._ops.append(UpdateOne(_doc, {"$set": _doc}, upsert=True))
+        else:
+            self._ops.append(InsertOne(doc))
+        if len(self._ops) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Send the collected operations to the collection"""
+        if self._ops:
+            self.collection.bulk_write(self._ops, ordered=self.ordered)
+            self._ops = []
+
+
 def _insert_dataset(
     dataset: h5py.Dataset,
     collection: Collection,
@@ -233,25 +305,38 @@ def _insert_dataset(
     additional_fields: Dict = None,
     ordered: bool = True,
     use_standard_names_for_dim_scales: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    _writer: Optional[_BulkWriter] = None,
 ):
-    """Insert a dataset into the collection"""
-    docs = _generate_dataset_document(
-        dataset,
-        axis,
-        ignore_attrs,
-        dims,
-        use_standard_names_for_dim_scales=use_standard_names_for_dim_scales,
-    )
+    """Insert a dataset into the collection. The documents are sent in batches
+    of `batch_size` operations (see `pymongo.collection.Collection.bulk_write`)."""
+    if axis == 0:
+        if ignore_attrs is None:
+            ignore_attrs = []
+        docs = _iter_dataset_documents_axis0(
+            dataset,
+            str(pathlib.Path(dataset.file.filename).absolute()),
+            get_file_creation_time(dataset.file.filename),
+            ignore_attrs,
+            dims,
+            use_standard_names_for_dim_scales,
+        )
+    else:
+        docs = _generate_dataset_document(
+            dataset,
+            axis,
+            ignore_attrs,
+            dims,
+            use_standard_names_for_dim_scales=use_standard_names_for_dim_scales,
+        )
 
-    if additional_fields is not None:
-        for doc in docs:
+    writer = _writer or _BulkWriter(collection, batch_size=batch_size, ordered=ordered)
+    for doc in docs:
+        if additional_fields is not None:
             doc.update(additional_fields)
-    if update:
-        for doc in docs:
-            _doc = {k: type2mongo(v) for k, v in doc.items()}
-            collection.update_one(_doc, {"$set": _doc}, upsert=True)
-    else:
-        collection.insert_many(docs, ordered=ordered)
+        writer.add(doc, update=update)
+    if _writer is None:
+        writer.flush()
     return collection
 
 
@@ -265,8 +350,11 @@ def _insert_group(
     ignore_attrs: List[str] = None,
     use_relative_filename: bool = False,
     additional_fields: Dict = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    _writer: Optional[_BulkWriter] = None,
 ):
-    """Insert a group into the collection"""
+    """Insert a group into the collection. The documents of the group and its
+    members are sent in batches of `batch_size` operations."""
     filename_ctime = get_file_creation_time(group.file.filename)
     if use_relative_filename:
         filename = group.file.filename
@@ -304,10 +392,8 @@ def _insert_group(
         if ak not in protected_attributes.h5rdmtoolbox:
             if ak not in ignore_attrs:
                 doc[ak] = type2mongo(av)
-    if update:
-        collection.update_one(doc, {"$set": doc}, upsert=True)
-    else:
-        collection.insert_one(doc)
+    writer = _writer or _BulkWriter(collection, batch_size=batch_size)
+    writer.add(doc, update=update)
 
     if recursive:
         include_dataset = True
@@ -322,6 +408,7 @@ def _insert_group(
                         axis=None,
                         update=update,
                         ignore_attrs=ignore_attrs,
+                        _writer=writer,
                     )
             else:
                 if recursive:
@@ -332,11 +419,50 @@ def _insert_group(
                         update=update,
                         include_dataset=include_dataset,
                         ignore_attrs=ignore_attrs,
+                        _writer=writer,
                     )
 
+    if _writer is None:
+        writer.flush()
     return collection
 
 
+def get_file_fingerprint(filename: Union[str, pathlib.Path], content_hash: bool = False) -> Dict:
+    """Return the fingerprint (modification time, size and optionally the SHA256 hash
+    of the content) of a file, which is used to detect changes of the file."""
+    stat = pathlib.Path(filename).stat()
+    fingerprint = {"mtime": stat.st_mtime_ns, "size": stat.st_size}
+    if content_hash:
+        sha = hashlib.sha256()
+        with open(filename, "rb") as f:
+            for block in iter(lambda: f.read(2**20), b""):
+                sha.update(block)
+        fingerprint["sha256"] = sha.hexdigest()
+    return fingerprint
+
+
+def _object_signatures(h5: h5py.File, ignore_attrs: List[str]) -> Dict[str, str]:
+    """Return a hash of the metadata (attributes, shape, dtype and the value of 0D datasets)
+    of every object of the file."""
+
+    def _signature(rec: ObjectRecord) -> str:
+        meta = {
+            ak: type2mongo(av)
+            for ak, av in rec.attrs.items()
+            if ak not in protected_attributes.h5rdmtoolbox and ak not in ignore_attrs
+        }
+        if rec.kind == "dataset":
+            meta["$shape"] = rec.shape
+            meta["$dtype"] = str(rec.dtype)
+            if rec.ndim == 0:
+                meta["$data"] = type2mongo(h5[rec.name][()])
+        return hashlib.sha1(
+            json.dumps(meta, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    return {rec.name: _signature(rec) for rec in scan(h5)}
+
+
 class MongoDBLazyDataset(lazy.LDataset):
     def __init__(self, obj: h5py.Dataset, mongo_doc):
         super().__init__(obj)
@@ -357,10 +483,17 @@ class MongoDB(ExtHDF5DBInterface):
     Call `.find_one()` or `.find()` to query the database. The syntax is the
     same as for pymongo. The returned objects are on-demand-opened HDF5 objects
     (see module `lazy`).
+
+    Call `.sync()` to incrementally synchronize the collection with files, which
+    may have changed since the last call. The fingerprints of the files are stored in the
+    companion collection `fingerprints` (by default "<collection name>_fingerprints").
     """
 
-    def __init__(self, collection: Collection):
+    def __init__(self, collection: Collection, fingerprints: Optional[Collection] = None):
         self.collection = collection
+        if fingerprints is None:
+            fingerprints = collection.database[f"{collection.name}_fingerprints"]
+        self.fingerprints = fingerprints
 
     def insert_dataset(self, dataset: h5py.Dataset, **kwargs):
         """Insert a dataset into the collection"""
@@ -370,6 +503,123 @@ class MongoDB(ExtHDF5DBInterface):
         """Insert a group into the collection"""
         return _insert_group(group, self.collection, **kwargs)
 
+    def sync(
+        self,
+        filenames: Union[str, pathlib.Path, List[Union[str, pathlib.Path]]],
+        axis: Optional[int] = None,
+        content_hash: bool = False,
+        ignore_attrs: List[str] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> Dict[str, int]:
+        """Incrementally synchronize the collection with the files.
+
+        The fingerprint of every file (see `get_file_fingerprint`) and a hash of the
+        metadata of every object are stored in the companion collection `fingerprints`.
+        Unchanged files are skipped. For changed files, only groups and datasets with
+        changed metadata are re-inserted and documents of removed objects are deleted.
+        Documents of files, which no longer exist, are deleted, too.
+
+        Parameters
+        ----------
+        filenames : Union[str, pathlib.Path, List[Union[str, pathlib.Path]]]
+            The HDF5 file(s) to synchronize.
+        axis : Optional[int]
+            Passed to `insert_dataset` for all datasets with at least one dimension.
+        content_hash : bool
+            If True, the SHA256 hash of the file content is part of the fingerprint. Files,
+            which were touched but not changed, are then skipped, too.
+        ignore_attrs : List[str]
+            Attributes, which are not inserted.
+        batch_size : int
+            Number of write operations sent to the database at once.
+
+        Returns
+        -------
+        Dict[str, int]
+            Number of skipped and synchronized files as well as the number of
+            inserted and deleted objects.
+        """
+        if isinstance(filenames, (str, pathlib.Path)):
+            filenames = [filenames]
+        if ignore_attrs is None:
+            ignore_attrs = []
+        report = {"skipped": 0, "synced": 0, "inserted": 0, "deleted": 0}
+        for filename in filenames:
+            filename = str(pathlib.Path(filename).absolute())
+            stored = self.fingerprints.find_one({"filename": filename})
+
+            if not pathlib.Path(filename).exists():
+                if stored is not None:
+                    report["deleted"] += len(stored["objects"])
+                    self.collection.delete_many({"filename": filename})
+                    self.fingerprints.delete_one({"filename": filename})
+                    report["synced"] += 1
+                continue
+
+            fingerprint = get_file_fingerprint(filename, content_hash=content_hash)
+            if stored is not None:
+                if all(stored["fingerprint"].get(k, None) == v for k, v in fingerprint.items()):
+                    report["skipped"] += 1
+                    continue
+                if content_hash and stored["fingerprint"].get("sha256", None) == fingerprint["sha256"]:
+                    # only touched, the content did not change:
+                    self.fingerprints.update_one(
+                        {"filename": filename}, {"$set": {"fingerprint": fingerprint}}
+                    )
+                    report["skipped"] += 1
+                    continue
+            stored_signatures = {} if stored is None else dict(stored["objects"])
+
+            with h5py.File(filename, mode="r") as h5:
+                signatures = _object_signatures(h5, ignore_attrs)
+                changed = [
+                    name
+                    for name, sig in signatures.items()
+                    if stored_signatures.get(name, None) != sig
+                ]
+                removed = [name for name in stored_signatures if name not in signatures]
+                if changed or removed:
+                    self.collection.delete_many(
+                        {"filename": filename, "name": {"$in": changed + removed}}
+                    )
+                with _BulkWriter(self.collection, batch_size=batch_size) as writer:
+                    for name in changed:
+                        obj = h5[name]
+                        if isinstance(obj, h5py.Dataset):
+                            _insert_dataset(
+                                obj,
+                                self.collection,
+                                axis=axis if obj.ndim > 0 else None,
+                                update=False,
+                                ignore_attrs=ignore_attrs,
+                                _writer=writer,
+                            )
+                        else:
+                            _insert_group(
+                                obj,
+                                self.collection,
+                                update=False,
+                                include_dataset=False,
+                                ignore_attrs=ignore_attrs,
+                                _writer=writer,
+                            )
+
+            self.fingerprints.update_one(
+                {"filename": filename},
+                {
+                    "$set": {
+                        "fingerprint": fingerprint,
+                        # list of pairs, as object names are not valid mongo keys:
+                        "objects": [[k, v] for k, v in signatures.items()],
+                    }
+                },
+                upsert=True,
+            )
+            report["synced"] += 1
+            report["inserted"] += len(changed)
+            report["deleted"] += len(removed)
+        return report
+
     def find_one(self, *args, **kwargs) -> Optional[lazy.LHDFObject]:
         """Calls the `.find_one` method of the underlying pymongo collection.
         If the result contains data either the corresponding lazy (on-demand)
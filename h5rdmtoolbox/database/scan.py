@@ -0,0 +1,162 @@
+"""Single-pass scan of the metadata of an HDF5 file.
+
+`scan()` reads the name, kind, shape, dtype and the (raw) attributes of every object of a file
+once into an in-memory snapshot (`FileScan`). Whole-file consumers (index building, validation,
+synchronization, ...) work on the snapshot instead of walking the file themselves. Visitors can
+be passed to `scan()` to run in the same pass. Snapshots of files, which are not opened for
+writing, are cached and reused as long as the file does not change.
+
+Examples
+--------
+>>> from h5rdmtoolbox.database import scan
+>>> units = {}
+>>> snapshot = scan('my_file.hdf', visitors=[lambda rec: units.update({rec.name: rec.attrs.get('units')})])
+>>> [rec.name for rec in snapshot.datasets() if rec.ndim == 2]
+"""
+import pathlib
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+import h5py
+
+# maximum number of snapshots kept in memory:
+SCAN_CACHE_SIZE = 8
+
+_scan_cache: "OrderedDict[Tuple, FileScan]" = OrderedDict()
+
+
+class ObjectRecord:
+    """Metadata of a single HDF5 object"""
+    __slots__ = ('name', 'kind', 'shape', 'dtype', 'attrs')
+
+    def __init__(self, obj: Union[h5py.Group, h5py.Dataset]):
+        self.name: str = obj.name
+        if isinstance(obj, h5py.Dataset):
+            self.kind = 'dataset'
+            self.shape = obj.shape
+            self.dtype = obj.dtype
+        else:
+            self.kind = 'group'
+            self.shape = None
+            self.dtype = None
+        self.attrs: Dict = dict(obj.attrs.items())
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} {self.kind} "{self.name}">'
+
+    @property
+    def basename(self) -> str:
+        """The basename of the object"""
+        return self.name.rsplit('/', 1)[-1]
+
+    @property
+    def ndim(self) -> Optional[int]:
+        """The number of dimensions of a dataset. None for groups"""
+        if self.shape is None:
+            return None
+        return len(self.shape)
+
+
+Visitor = Callable[[ObjectRecord], None]
+
+
+class FileScan:
+    """In-memory snapshot of the metadata of all objects below a start object. The records
+    are ordered like a traversal with `visititems`, starting with the start object."""
+
+    def __init__(self, filename: str, records: Dict[str, ObjectRecord]):
+        self.filename = filename
+        self.records = records
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} "{self.filename}" ({len(self)} objects)>'
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[ObjectRecord]:
+        return iter(self.records.values())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.records
+
+    def __getitem__(self, name: str) -> ObjectRecord:
+        return self.records[name]
+
+    def groups(self) -> Iterator[ObjectRecord]:
+        """Iterate over the records of all groups"""
+        return (rec for rec in self if rec.kind == 'group')
+
+    def datasets(self) -> Iterator[ObjectRecord]:
+        """Iterate over the records of all datasets"""
+        return (rec for rec in self if rec.kind == 'dataset')
+
+    def visit(self, *visitors: Visitor) -> None:
+        """Run the visitors on all records of the snapshot (without accessing the file)"""
+        for rec in self:
+            for visitor in visitors:
+                visitor(rec)
+
+
+def _cache_key(h5obj: Union[h5py.Group, h5py.Dataset]) -> Optional[Tuple]:
+    if h5obj.file.mode != 'r':
+        return None
+    try:
+        stat = pathlib.Path(h5obj.file.filename).stat()
+    except OSError:
+        return None
+    return str(pathlib.Path(h5obj.file.filename).resolve()), h5obj.name, stat.st_mtime_ns, stat.st_size
+
+
+def _scan(h5obj: Union[h5py.Group, h5py.Dataset], visitors: Iterable[Visitor]) -> FileScan:
+    key = _cache_key(h5obj)
+    if key is not None and key in _scan_cache:
+        _scan_cache.move_to_end(key)
+        snapshot = _scan_cache[key]
+        snapshot.visit(*visitors)
+        return snapshot
+
+    records = {}
+
+    def _add(obj):
+        rec = ObjectRecord(obj)
+        records[rec.name] = rec
+        for visitor in visitors:
+            visitor(rec)
+
+    _add(h5obj)
+    if isinstance(h5obj, h5py.Group):
+        h5obj.visititems(lambda name, obj: _add(obj))
+    snapshot = FileScan(h5obj.file.filename, records)
+    if key is not None:
+        _scan_cache[key] = snapshot
+        while len(_scan_cache) > SCAN_CACHE_SIZE:
+            _scan_cache.popitem(last=False)
+    return snapshot
+
+
+def scan(source: Union[str, pathlib.Path, h5py.Group, h5py.Dataset],
+         visitors: Iterable[Visitor] = ()) -> FileScan:
+    """Read the metadata of all objects of a file (or below an object) in a single pass.
+
+    Parameters
+    ----------
+    source : Union[str, pathlib.Path, h5py.Group, h5py.Dataset]
+        A filename or an opened HDF5 object. Attributes are read without the decoding of the
+        wrapper classes of the toolbox (raw values).
+    visitors : Iterable[Callable[[ObjectRecord], None]]
+        Functions called with every record during the scan.
+
+    Returns
+    -------
+    FileScan
+        The snapshot of the metadata
+    """
+    visitors = list(visitors)
+    if isinstance(source, (str, pathlib.Path)):
+        with h5py.File(source, mode='r') as h5:
+            return _scan(h5, visitors)
+    # use plain h5py objects. The wrapper classes would decode every attribute:
+    if isinstance(source, h5py.Dataset):
+        return _scan(h5py.Dataset(source.id), visitors)
+    return _scan(h5py.Group(source.id), visitors)
@@ -1,8 +1,11 @@
 """RDF (Resource Description Framework) module for use with HDF5 files"""
 import abc
+import copy
 import json
 import warnings
-from typing import Dict, Union, Optional, List, Any
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Union, Optional, List, Any, Tuple
 
 import h5py
 import pydantic
@@ -58,11 +61,111 @@ CLASS_DICT = {
 }
 
 
+# maximum number of parsed JSON attributes (predicates, objects, definitions) kept in memory:
+JSON_ATTR_CACHE_SIZE = 1024
+
+_json_attr_cache: "OrderedDict[Tuple, Tuple[Optional[int], Optional[Dict]]]" = OrderedDict()
+_generation = 0
+_batches: Dict[Tuple, Dict[str, Dict]] = {}
+
+
 class RDFError(Exception):
     """Generic RDF error"""
     pass
 
 
+def invalidate() -> None:
+    """Invalidate all parsed JSON attributes of objects of writable files"""
+    global _generation
+    _generation += 1
+
+
+def _object_key(attr: h5py.AttributeManager) -> Optional[Tuple]:
+    parent = getattr(attr, '_parent', None)
+    if parent is None:
+        return None
+    # the address changes, if the object is deleted and another one is moved to its name:
+    return parent.id.fileno, h5py.h5o.get_info(parent.id).addr
+
+
+def _stamp(attr: h5py.AttributeManager) -> Optional[int]:
+    if h5py.h5i.get_file_id(attr._parent.id).get_intent() == h5py.h5f.ACC_RDONLY:
+        return None
+    return _generation
+
+
+def read_json_attr(attr: h5py.AttributeManager, name: str) -> Optional[Dict]:
+    """Return the parsed JSON attribute `name` (e.g. RDF_PREDICATE) or None if it does not exist.
+
+    The parsed dictionary is cached per object and a deep copy is returned, so callers may
+    modify it. Inside a batch (see `batch()`), the buffered (not yet written) dictionary is
+    returned.
+    """
+    key = _object_key(attr)
+    if key is None:
+        data = attr.get(name, None)
+        return json.loads(data) if isinstance(data, str) and data.startswith("{") else data
+
+    buffer = _batches.get(key, None)
+    if buffer is not None and name in buffer:
+        return buffer[name]
+
+    cache_key = key + (name,)
+    stamp = _stamp(attr)
+    entry = _json_attr_cache.get(cache_key, None)
+    if entry is not None and entry[0] == stamp:
+        _json_attr_cache.move_to_end(cache_key)
+        data = entry[1]
+    else:
+        data = attr.get(name, None)
+        if isinstance(data, str) and data.startswith("{"):
+            data = json.loads(data)
+        _json_attr_cache[cache_key] = (stamp, data)
+        while len(_json_attr_cache) > JSON_ATTR_CACHE_SIZE:
+            _json_attr_cache.popitem(last=False)
+    if not isinstance(data, dict):
+        return data
+    return copy.deepcopy(data)  # callers modify the returned dictionary and its values
+
+
+def write_json_attr(attr: h5py.AttributeManager, name: str, data: Dict) -> None:
+    """Write the dictionary `data` as JSON attribute `name`. Inside a batch, the
+    dictionary is buffered and written when the batch is left."""
+    key = _object_key(attr)
+    if key is None:
+        attr[name] = data
+        return
+    buffer = _batches.get(key, None)
+    if buffer is not None:
+        buffer[name] = data
+        return
+    attr[name] = data
+    _json_attr_cache.pop(key + (name,), None)
+
+
+@contextmanager
+def batch(attr: h5py.AttributeManager):
+    """Buffer all changes of the JSON attributes (predicates, objects and definitions)
+    of the object and write each attribute once when the context is left.
+
+    Nested batches of the same object are merged into the outermost one. Changes made
+    before an exception is raised are still written.
+    """
+    key = _object_key(attr)
+    if key is None or key in _batches:
+        yield
+        return
+    buffer = {}
+    _batches[key] = buffer
+    try:
+        yield
+    finally:
+        del _batches[key]
+        for name, data in buffer.items():
+            attr[name] = data
+            _json_attr_cache.pop(key + (name,), None)
+
+
 def validate_url(url: str) -> str:
     """validate the url with pydantic
     Raises
@@ -129,11 +232,11 @@ def set_predicate(attr: h5py.AttributeManager,
                 raise RDFError(f'Invalid IRI: "{value}" for attr name "{attr_name}". '
                                f'Expecting a valid URL. This was validated with pydantic. Pydantic error: {e}')
 
-    iri_name_data = attr.get(rdf_predicate_attr_name, None)
+    iri_name_data = read_json_attr(attr, rdf_predicate_attr_name)
     if iri_name_data is None:
         iri_name_data = {}
     iri_name_data.update({attr_name: value})
-    attr[rdf_predicate_attr_name] = iri_name_data
+    write_json_attr(attr, rdf_predicate_attr_name, iri_name_data)
 
 
 def is_sdict(data):
@@ -153,12 +256,10 @@ def set_object(attr: h5py.AttributeManager,
             set_object(attr, attr_name, d, rdf_object_attr_name)
         return
 
-    iri_data_data = attr.get(rdf_object_attr_name, None)
+    iri_data_data = read_json_attr(attr, rdf_object_attr_name)
 
     if iri_data_data is None:
         iri_data_data = {}
-    elif is_sdict(iri_data_data):
-        iri_data_data = json.loads(iri_data_data)
 
     if isinstance(data, Thing):
         data = data.get_jsonld_dict()
@@ -203,7 +304,7 @@ def set_object(attr: h5py.AttributeManager,
                 iri_data_data.update({attr_name: [curr_data, *data]})
             else:
                 iri_data_data.update({attr_name: [curr_data, data]})
-    attr[rdf_object_attr_name] = iri_data_data
+    write_json_attr(attr, rdf_object_attr_name, iri_data_data)
 
 
 def append(attr: h5py.AttributeManager,
@@ -211,7 +312,7 @@ def append(attr: h5py.AttributeManager,
            data: Union[str, List[str]],
            attr_identifier: str) -> None:
     """Append the class, predicate or subject of an attribute"""
-    iri_data_data = attr.get(attr_identifier, None)
+    iri_data_data = read_json_attr(attr, attr_identifier)
     if iri_data_data is None:
         iri_data_data = {}
 
@@ -227,7 +328,7 @@ def append(attr: h5py.AttributeManager,
             iri_data_data.update({attr_name: [curr_data, *data]})
         else:
             iri_data_data.update({attr_name: [curr_data, data]})
-    attr[attr_identifier] = iri_data_data
+    write_json_attr(attr, attr_identifier, iri_data_data)
 
 
 def parse_typed_data(data: Dict) -> Any:
@@ -295,14 +396,14 @@ class IRIDict(Dict):
     @property
     def definition(self):
         """Return the definition of the attribute"""
-        return self._attr.get(DEFINITION_ATTR_NAME, {}).get(self._attr_name, None)
+        return (read_json_attr(self._attr, DEFINITION_ATTR_NAME) or {}).get(self._attr_name, None)
 
     @definition.setter
     def definition(self, definition: str):
         """Define the attribute. JSON-LD export will interpret this as SKOS.definition."""
-        attr_def = self._attr.get(DEFINITION_ATTR_NAME, {})
+        attr_def = read_json_attr(self._attr, DEFINITION_ATTR_NAME) or {}
         attr_def.update({self._attr_name: definition})
-        self._attr[DEFINITION_ATTR_NAME] = attr_def
+        write_json_attr(self._attr, DEFINITION_ATTR_NAME, attr_def)
 
 
 class _RDFPO(abc.ABC):
@@ -317,16 +418,12 @@ class _RDFPO(abc.ABC):
         """Set IRI to an attribute"""
 
     def get(self, item, default=None):
-        attrs = self._attr.get(self.IRI_ATTR_NAME, None)
+        attrs = read_json_attr(self._attr, self.IRI_ATTR_NAME)
         if attrs is None:
             return default
         if item is None:
             return attrs.get('SELF', default)
-        if isinstance(attrs, dict):
-            return attrs.get(item, default)
-        assert isinstance(attrs, str)
-        parsed_str = json.loads(attrs)
-        value = parsed_str.get(item, default)
+        value = attrs.get(item, default)
         if isinstance(value, dict) and value.get("$type", None) == "rdflib.term.Literal":
             return parse_typed_data(value)
         if isinstance(value, list):
@@ -342,23 +439,23 @@ class _RDFPO(abc.ABC):
         self.__setiri__(key, value)
 
     def __delitem__(self, key):
-        iri_data_data = self._attr.get(self.IRI_ATTR_NAME, None)
+        iri_data_data = read_json_attr(self._attr, self.IRI_ATTR_NAME)
         if iri_data_data is None:
             iri_data_data = {}
         iri_data_data.pop(key, None)
-        self._attr[self.IRI_ATTR_NAME] = iri_data_data
+        write_json_attr(self._attr, self.IRI_ATTR_NAME, iri_data_data)
 
     def keys(self):
         """Return all attribute names assigned to the IRIs"""
-        return self._attr.get(self.IRI_ATTR_NAME, {}).keys()
+        return (read_json_attr(self._attr, self.IRI_ATTR_NAME) or {}).keys()
 
     def values(self):
         """Return all IRIs assigned to the attributes"""
-        return self._attr.get(self.IRI_ATTR_NAME, {}).values()
+        return (read_json_attr(self._attr, self.IRI_ATTR_NAME) or {}).values()
 
     def items(self):
         """Return all attribute names and IRIs"""
-        return self._attr.get(self.IRI_ATTR_NAME, {}).items()
+        return (read_json_attr(self._attr, self.IRI_ATTR_NAME) or {}).items()
 
     def __iter__(self):
         return iter(self.keys())
@@ -423,6 +520,43 @@ class RDFManager:
         """Return the parent object"""
         return self._attr._parent
 
+    def batch(self):
+        """Context manager, which buffers all changes of predicates, objects and definitions
+        of the attributes of the object and writes them once when the context is left.
+
+        Examples
+        --------
+        >>> with h5tbx.File() as h5:
+        ...     with h5.rdf.batch():
+        ...         for name in h5.attrs.keys():
+        ...             h5.rdf.predicate[name] = 'https://example.org/hasValue'
+        """
+        return batch(self._attr)
+
+    def update(self, rdf_data: Dict[str, Dict]) -> None:
+        """Assign predicates, objects and definitions to multiple attributes at once.
+        Each RDF attribute of the object is written only once.
+
+        Parameters
+        ----------
+        rdf_data : Dict[str, Dict]
+            Attribute names and their RDF information. Allowed keys of the information
+            are "predicate", "object" and "definition", e.g.
+            {'orcid': {'predicate': M4I.orcidId, 'object': 'https://orcid.org/0000-0001-8729-0482'}}
+        """
+        for name, rdf_info in rdf_data.items():
+            if name not in self._attr:
+                raise KeyError(f'No attribute "{name}" found. Cannot assign an IRI to a non-existing attribute.')
+            unknown = set(rdf_info).difference(('predicate', 'object', 'definition'))
+            if unknown:
+                raise ValueError(f'Unknown RDF information {unknown} for attribute "{name}". Expecting '
+                                 '"predicate", "object" or "definition".')
+        with batch(self._attr):
+            for name, rdf_info in rdf_data.items():
+                iri_dict = IRIDict({}, self._attr, name)
+                for key, value in rdf_info.items():
+                    setattr(iri_dict, key, value)
+
     def find(self,
              *,
              rdf_subject: Optional[str] = None,
@@ -455,6 +589,12 @@ class RDFManager:
         res_predicate = []
         res_object = []
 
+        def _visit(func):
+            if not hasattr(self.parent, "visit_nodes"):
+                return self.parent.visititems(func)
+            # objects without attributes cannot match and are not wrapped:
+            return self.parent.visit_nodes(lambda node: func(node.name, node.obj) if node.num_attrs else None)
+
         def _find_subject(_, node):
             rdfm = RDFManager(node.attrs)
             _subject: str = rdfm.subject
@@ -486,23 +626,23 @@ class RDFManager:
         if rdf_object:
             _find_object(self.parent.name, self.parent)
             if recursive and isinstance(self.parent, h5py.Group):
-                self.parent.visititems(_find_object)
+                _visit(_find_object)
 
         if rdf_type is not None:
             _find_type(self.parent.name, self.parent)
             if recursive and isinstance(self.parent, h5py.Group):
-                self.parent.visititems(_find_type)
+                _visit(_find_type)
 
         if rdf_predicate:
             _find_predicate(self.parent.name, self.parent)
             if recursive and isinstance(self.parent, h5py.Group):
-                self.parent.visititems(_find_predicate)
+                _visit(_find_predicate)
 
         if rdf_subject:
             _find_subject(self.parent.name, self.parent)
             if recursive:
                 if isinstance(self.parent, h5py.Group):
-                    self.parent.visititems(_find_subject)
+                    _visit(_find_subject)
 
         common_objects = []
         res = [res_subject, res_types, res_predicate, res_object]
@@ -608,11 +748,11 @@ class RDFManager:
             raise TypeError(f'Expecting a string or URL. Got {type(data_predicate)}. Note, that a predicate of '
                             'a group or dataset can only be one value. If you meant to set one or multiple RDF types, '
                             'use .type instead.')
-        iri_predicate_data = self._attr.get(RDF_PREDICATE_ATTR_NAME, None)
+        iri_predicate_data = read_json_attr(self._attr, RDF_PREDICATE_ATTR_NAME)
         if iri_predicate_data is None:
             iri_predicate_data = {}
         iri_predicate_data.update({'DATA_PREDICATE': data_predicate})
-        self._attr[RDF_PREDICATE_ATTR_NAME] = iri_predicate_data
+        write_json_attr(self._attr, RDF_PREDICATE_ATTR_NAME, iri_predicate_data)
 
     @property
     def predicate(self) -> RDF_Predicate:
@@ -626,20 +766,20 @@ class RDFManager:
             raise TypeError(f'Expecting a string or URL. Got {type(predicate)}. Note, that a predicate of '
                             'a group or dataset can only be one value. If you meant to set one or multiple RDF types, '
                             'use .type instead.')
-        iri_predicate_data = self._attr.get(RDF_PREDICATE_ATTR_NAME, None)
+        iri_predicate_data = read_json_attr(self._attr, RDF_PREDICATE_ATTR_NAME)
         if iri_predicate_data is None:
             iri_predicate_data = {}
         iri_predicate_data.update({'SELF': predicate})
-        self._attr[RDF_PREDICATE_ATTR_NAME] = iri_predicate_data
+        write_json_attr(self._attr, RDF_PREDICATE_ATTR_NAME, iri_predicate_data)
 
     @predicate.deleter
     def predicate(self):
         """Delete the predicate of the group or dataset. It does not delete the predicate of the attributes.
         Use `del h5.rdf.predicate[<attr_name>]` instead."""
-        iri_predicate_data = self._attr.get(RDF_PREDICATE_ATTR_NAME, None)
+        iri_predicate_data = read_json_attr(self._attr, RDF_PREDICATE_ATTR_NAME)
         if 'SELF' in iri_predicate_data:
             del iri_predicate_data['SELF']
-        self._attr[RDF_PREDICATE_ATTR_NAME] = iri_predicate_data
+        write_json_attr(self._attr, RDF_PREDICATE_ATTR_NAME, iri_predicate_data)
 
     @property
     def file_predicate(self) -> str:
@@ -721,8 +861,8 @@ class RDFManager:
     def __getitem__(self, item) -> IRIDict:
         if item not in self._attr:
             raise KeyError(f'Attribute "{item}" not found in {self.parent.name}.')
-        return IRIDict({RDF_PREDICATE_ATTR_NAME: self._attr.get(RDF_PREDICATE_ATTR_NAME, {}).get(item, None),
-                        RDF_OBJECT_ATTR_NAME: self._attr.get(RDF_OBJECT_ATTR_NAME, {}).get(item, None)},
+        return IRIDict({RDF_PREDICATE_ATTR_NAME: (read_json_attr(self._attr, RDF_PREDICATE_ATTR_NAME) or {}).get(item, None),
+                        RDF_OBJECT_ATTR_NAME: (read_json_attr(self._attr, RDF_OBJECT_ATTR_NAME) or {}).get(item, None)},
                        self._attr, item)
 
     def delete(self, name):
@@ -757,11 +897,11 @@ class FileIRIDict(Dict):
 
     @object.deleter
     def object(self):
-        iri_data_data = self._attr.get(RDF_FILE_OBJECT_ATTR_NAME, None)
+        iri_data_data = read_json_attr(self._attr, RDF_FILE_OBJECT_ATTR_NAME)
         if iri_data_data is None:
             iri_data_data = {}
         iri_data_data.pop(self._attr_name, None)
-        self._attr[RDF_FILE_OBJECT_ATTR_NAME] = iri_data_data
+        write_json_attr(self._attr, RDF_FILE_OBJECT_ATTR_NAME, iri_data_data)
 
     @object.setter
     def object(self, value):
@@ -795,6 +935,11 @@ class FileRDFManager:
     def __init__(self, attr: H5TbxAttributeManager = None):
         self._attr = attr
 
+    def batch(self):
+        """Context manager, which buffers all changes of file predicates and objects and
+        writes them once when the context is left. See also `RDFManager.batch()`"""
+        return batch(self._attr)
+
     def __getitem__(self, item) -> FileIRIDict:
         """Overwrite parent implementation, because other attr name is used"""
         ret = self.get(item, None)
@@ -807,8 +952,10 @@ class FileRDFManager:
             return default
         return FileIRIDict(
             {
-                RDF_FILE_PREDICATE_ATTR_NAME: self._attr.get(RDF_FILE_PREDICATE_ATTR_NAME, {}).get(item, None),
-                RDF_FILE_OBJECT_ATTR_NAME: self._attr.get(RDF_FILE_OBJECT_ATTR_NAME, {}).get(item, None)
+                RDF_FILE_PREDICATE_ATTR_NAME: (read_json_attr(self._attr, RDF_FILE_PREDICATE_ATTR_NAME) or {}).get(
+                    item, None),
+                RDF_FILE_OBJECT_ATTR_NAME: (read_json_attr(self._attr, RDF_FILE_OBJECT_ATTR_NAME) or {}).get(
+                    item, None)
             },
             self._attr, item)
 
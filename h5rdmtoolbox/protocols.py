@@ -145,6 +145,10 @@ class H5TbxAttributeManager(Protocol):
     def items(self):
         pass
 
+    def raw_items(self) -> List[Tuple[str, Any]]: ...
+
+    def decode_all(self) -> Dict: ...
+
 
 class H5TbxHLObject(Protocol):
     name: str
@@ -172,6 +172,33 @@ def try_making_serializable(d: Dict) -> Dict:
     return result_dict
 
 
+def special_attribute_value(value):
+    """Return the value of `value`, which is written to the attribute by `create_special_attribute`.
+    Dictionaries become JSON strings, groups and datasets their names.
+
+    Parameters
+    ----------
+    value : any
+        Attribute value.
+    """
+    if isinstance(value, dict):
+        for k, v in value.items():
+            if isinstance(v, (h5py.Dataset, h5py.Group)):
+                value[k] = v.name
+        return json.dumps(try_making_serializable(value))
+    if isinstance(value, (h5py.Dataset, h5py.Group)):
+        return value.name
+    if isinstance(value, str):
+        return value
+    if isinstance(value, pint.Quantity):
+        return str(value)
+    if isinstance(value, pathlib.Path):
+        return str(value)
+    if isinstance(value, datetime.datetime):
+        return value.strftime(get_config("dtime_fmt"))
+    return value
+
+
 def create_special_attribute(h5obj: h5py.AttributeManager, name: str, value):
     """Allows writing more than the usual hdf5 attributes.
 
@@ -184,23 +211,7 @@ def create_special_attribute(h5obj: h5py.AttributeManager, name: str, value):
     value : any
         Attribute value.
     """
-    if isinstance(value, dict):
-        for k, v in value.items():
-            if isinstance(v, (h5py.Dataset, h5py.Group)):
-                value[k] = v.name
-        _value = json.dumps(try_making_serializable(value))
-    elif isinstance(value, (h5py.Dataset, h5py.Group)):
-        _value = value.name
-    elif isinstance(value, str):
-        _value = value
-    elif isinstance(value, pint.Quantity):
-        _value = str(value)
-    elif isinstance(value, pathlib.Path):
-        _value = str(value)
-    elif isinstance(value, datetime.datetime):
-        _value = value.strftime(get_config("dtime_fmt"))
-    else:
-        _value = value
+    _value = special_attribute_value(value)
 
     if hasattr(name, "fragment"):
         fragment = name.fragment
@@ -0,0 +1,256 @@
+"""Writing the same attributes to many objects at once.
+
+Setting attributes one by one validates every value with the standard attribute of the
+convention, converts it and updates the RDF predicates of the object for each attribute.
+`bulk_set_attrs` converts each distinct value once (standard attributes cache their validated
+values themselves), prepares the HDF5 datatype and dataspace once and writes the attributes
+with the low-level HDF5 attribute API. RDF predicates, objects and definitions are written
+once per object (see `rdf.batch()`).
+
+Objects which cannot be resolved or for which a value is invalid are skipped and reported
+instead of aborting the whole operation. All values of an object are validated before the first
+attribute is written. Writing an object is not atomic, though: if writing an attribute or the
+RDF information fails, the attributes written before are kept.
+"""
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import h5py
+import numpy as np
+import rdflib
+from h5py import h5a, h5s, h5t
+from h5py._hl import base
+from h5py._hl.base import phil
+
+from . import coords, h5attr
+from ..ld import rdf
+from ..utils.hdf5 import parse_object_for_attribute_setting, special_attribute_value
+
+logger = logging.getLogger("h5rdmtoolbox")
+
+# a prepared attribute value: the array, the logical and the memory HDF5 datatype and the dataspace
+_Prepared = Tuple[np.ndarray, h5t.TypeID, h5t.TypeID, h5s.SpaceID]
+
+
+class _Entry:
+    """An attribute to be written: name, value and RDF information"""
+    __slots__ = ('name', 'value', 'key', 'rdf_predicate', 'rdf_object',
+                 'frdf_predicate', 'frdf_object', 'definition')
+
+    def __init__(self, name: str, value, rdf_predicate=None, rdf_object=None,
+                 frdf_predicate=None, frdf_object=None, definition=None):
+        self.name = name
+        self.value = value
+        self.key = _value_key(value)
+        self.rdf_predicate = None if rdf_predicate is None else str(rdf_predicate)
+        self.rdf_object = rdf_object
+        self.frdf_predicate = None if frdf_predicate is None else str(frdf_predicate)
+        self.frdf_object = frdf_object
+        self.definition = definition
+
+
+def _value_key(value) -> Tuple:
+    """Return a hashable key for the attribute value. The type is part of the key,
+    because 1, 1.0 and True are equal but written differently."""
+    if isinstance(value, np.ndarray):
+        return np.ndarray, value.dtype.str, value.shape, value.tobytes()
+    try:
+        hash(value)
+    except TypeError:
+        return type(value), repr(value)
+    return type(value), value
+
+
+def _entries(attrs: Dict) -> List[_Entry]:
+    entries = []
+    for name, value in attrs.items():
+        rdf_predicate = None
+        if isinstance(name, tuple):
+            if not len(name) == 2:
+                raise ValueError("Tuple must have length 2 in order to interpret it as an "
+                                 "attribute name and its IRI")
+            name, rdf_predicate = name
+            rdf_predicate = h5attr.Attribute._validate_rdf(rdf_predicate)
+        if not isinstance(name, str):
+            raise TypeError(f"Attribute name must be a str but got {type(name)}")
+        if isinstance(value, h5attr.Attribute):
+            if rdf_predicate is not None and value.rdf_predicate is not None:
+                raise ValueError("You cannot set the predicate iri at the same time by Attribute and through "
+                                 "the tuple syntax.")
+            entries.append(_Entry(name, value.value,
+                                  rdf_predicate=rdf_predicate or value.rdf_predicate,
+                                  rdf_object=value.rdf_object,
+                                  frdf_predicate=value.frdf_predicate,
+                                  frdf_object=value.frdf_object,
+                                  definition=value.definition))
+        elif isinstance(value, rdflib.Literal):
+            entries.append(_Entry(name, value.value, rdf_predicate=rdf_predicate, rdf_object=value))
+        else:
+            entries.append(_Entry(name, value, rdf_predicate=rdf_predicate))
+    return entries
+
+
+def _prepare(value) -> _Prepared:
+    """Convert the (encoded) value into the array, HDF5 datatypes and dataspace
+    as done by `h5py.AttributeManager.create`"""
+    try:
+        data = base.array_for_new_object(value)
+    except TypeError:
+        data = base.array_for_new_object(str(value))
+    return (data,
+            h5t.py_create(data.dtype, logical=True),
+            h5t.py_create(data.dtype),
+            h5s.create_simple(data.shape))
+
+
+def _write(oid, name: bytes, prepared: _Prepared) -> None:
+    data, htype, mtype, space = prepared
+    if h5a.exists(oid, name):
+        h5a.delete(oid, name)
+    attr = h5a.create(oid, name, htype, space)
+    try:
+        attr.write(data, mtype=mtype)
+    except Exception:
+        attr.close()
+        h5a.delete(oid, name)
+        raise
+    attr.close()
+
+
+def _update_json_attr(attrs, attr_name: str, data: Dict) -> None:
+    if not data:
+        return
+    curr_data = rdf.read_json_attr(attrs, attr_name) or {}
+    curr_data.update(data)
+    rdf.write_json_attr(attrs, attr_name, curr_data)
+
+
+def _set_attrs(obj: Union[h5py.Group, h5py.Dataset],
+               entries: List[_Entry],
+               prepared_values: Dict[Tuple, Union[_Prepared, Exception]]) -> None:
+    """Validate all entries for `obj` and write them. Nothing is written if one value is invalid,
+    but attributes already written are kept if a later write fails."""
+    convention = getattr(obj, '_convention', None)
+    sattrs = {} if convention is None else convention.properties.get(obj.__class__, {})
+    is_root = obj.name == '/'
+
+    writes = []
+    predicates, objects, definitions, file_predicates, file_objects = {}, [], {}, {}, []
+    for entry in entries:
+        if entry.value is None:
+            continue
+        sattr = sattrs.get(entry.name, None)
+        if sattr is None:
+            cache_key = (None, entry.key)
+        else:
+            # the standard attribute caches validated values, unless the validator depends on
+            # the object (e.g. on other attributes). Thus, it is called for every object:
+            encoded = sattr.encode(obj, entry.value)
+            cache_key = (sattr, _value_key(encoded))
+        prepared = prepared_values.get(cache_key, None)
+        if prepared is None:
+            try:
+                if sattr is None:
+                    encoded = parse_object_for_attribute_setting(special_attribute_value(entry.value))
+                prepared = _prepare(encoded)
+            except Exception as e:
+                prepared = e
+            prepared_values[cache_key] = prepared
+        if isinstance(prepared, Exception):
+            raise prepared
+        writes.append((entry.name.encode('utf-8'), prepared))
+
+        rdf_predicate = entry.rdf_predicate
+        frdf_predicate = entry.frdf_predicate
+        if sattr is not None and not isinstance(entry.value, dict):
+            rdf_predicate = rdf_predicate or sattr.rdf_predicate
+            frdf_predicate = frdf_predicate or sattr.frdf_predicate
+        if rdf_predicate is not None:
+            predicates[entry.name] = rdf_predicate
+        if entry.rdf_object is not None:
+            objects.append((entry.name, entry.rdf_object))
+        if entry.definition is not None:
+            definitions[entry.name] = entry.definition
+        if frdf_predicate is not None or entry.frdf_object is not None:
+            if not is_root:
+                raise ValueError(f'Cannot assign a file RDF to attribute "{entry.name}" of "{obj.name}", '
+                                 'because it is not the root group')
+            if frdf_predicate is not None:
+                file_predicates[entry.name] = frdf_predicate
+            if entry.frdf_object is not None:
+                file_objects.append((entry.name, entry.frdf_object))
+
+    attrs = obj.attrs
+    with phil:
+        oid = obj.id
+        for name, prepared in writes:
+            _write(oid, name, prepared)
+    with rdf.batch(attrs):
+        _update_json_attr(attrs, rdf.RDF_PREDICATE_ATTR_NAME, predicates)
+        _update_json_attr(attrs, rdf.DEFINITION_ATTR_NAME, definitions)
+        _update_json_attr(attrs, rdf.RDF_FILE_PREDICATE_ATTR_NAME, file_predicates)
+        for name, rdf_object in objects:
+            rdf.set_object(attrs, name, rdf_object)
+        for name, rdf_object in file_objects:
+            rdf.set_object(attrs, name, rdf_object, rdf_object_attr_name=rdf.RDF_FILE_OBJECT_ATTR_NAME)
+
+
+def bulk_set_attrs(objects: Iterable[Union[str, h5py.Group, h5py.Dataset]],
+                   attrs: Dict[Union[str, Tuple[str, str]], Any],
+                   *,
+                   parent: Optional[h5py.Group] = None) -> Dict[str, Exception]:
+    """Write the same attributes to many groups or datasets.
+
+    Each distinct value is converted only once. Values of standard attributes of the current
+    convention are validated for every object, but the validation results are cached as long
+    as the validator does not depend on the object. All values are validated before the first
+    attribute of an object is written, thus objects, for which a value is invalid, are not
+    changed and reported in the returned dictionary instead of raising the error. Writing is not
+    atomic: if writing fails (e.g. an invalid RDF object), the attributes written before are kept
+    and the object is reported as well.
+
+    Parameters
+    ----------
+    objects : Iterable[Union[str, h5py.Group, h5py.Dataset]]
+        The groups and datasets. Strings are interpreted as paths relative to `parent`.
+    attrs : Dict[Union[str, Tuple[str, str]], Any]
+        The attributes to write. As for `attrs.__setitem__`, keys may be tuples of the attribute
+        name and its RDF predicate and values may be of type `h5tbx.Attribute`.
+        Values, which are None, are not written.
+    parent : h5py.Group, optional
+        The group to resolve the paths in `objects`
+
+    Returns
+    -------
+    Dict[str, Exception]
+        The objects (path or name), which could not be resolved or changed, and the error.
+        Empty if all attributes were written.
+
+    Examples
+    --------
+    >>> with h5tbx.File('test.h5', 'r+') as h5:
+    ...     failed = h5tbx.bulk_set_attrs(['u', 'v', 'w'], {'units': 'm/s'}, parent=h5)
+    """
+    entries = _entries(attrs)
+    prepared_values = {}
+    failures = {}
+    written = []
+    try:
+        for obj in objects:
+            try:
+                if isinstance(obj, str):
+                    if parent is None:
+                        raise ValueError(f'Cannot resolve "{obj}". Please provide the parent group.')
+                    obj = parent[obj]
+                written.append(obj.id)
+                _set_attrs(obj, entries, prepared_values)
+            except Exception as e:
+                name = obj if isinstance(obj, str) else getattr(obj, "name", repr(obj))
+                logger.debug(f'Could not set attributes of "{name}": {e}')
+                failures[name] = e
+    finally:
+        # the attributes are written with the low-level API, thus the caches are invalidated here:
+        if written:
+            coords.invalidate(*written)
+            rdf.invalidate()
+    return failures
@@ -0,0 +1,118 @@
+"""Raw data chunk cache settings of files and datasets.
+
+HDF5 keeps decompressed chunks in a cache per opened dataset (by default 1 MiB with 521 slots).
+Reading chunks, which do not fit into the cache, repeatedly (e.g. random `isel` on compressed
+datasets) decompresses the same chunks again and again. The cache is configured by
+
+- "hdf_chunk_cache_mb", "hdf_chunk_cache_nslots", "hdf_chunk_cache_w0": default of all files
+  opened by `h5tbx.File` and the shared read-only handles of lazy objects and `FilesDB`
+- "hdf_dataset_chunk_cache_mb": per-dataset override ({dataset name: size in MB}), applied
+  whenever a dataset is returned by a wrapper group (item access, natural naming and visitors)
+
+All open handles of a dataset share one cache, which is set up when the dataset is opened first.
+Likewise, a file opened several times in a process keeps the settings of the first handle.
+
+None keeps the default of HDF5. If the number of slots is not given, it is derived from the
+cache size (a prime number of about 100 slots per chunk fitting into the cache).
+
+Examples
+--------
+>>> import h5rdmtoolbox as h5tbx
+>>> with h5tbx.set_config(hdf_chunk_cache_mb=64, hdf_dataset_chunk_cache_mb={'/piv/u': 512}):
+...     with h5tbx.File('piv.hdf') as h5:
+...         h5['piv/u'].isel(x=[1, 5, 100])
+"""
+import posixpath
+from typing import Dict, Optional
+
+import h5py
+from h5py import h5d, h5i, h5p
+
+from .._cfg import get_config
+
+MB = 1024 ** 2
+# chunk size assumed to derive the number of slots for a file (chunk size unknown):
+DEFAULT_CHUNK_NBYTES = 2 ** 16
+
+
+def _is_prime(n: int) -> bool:
+    if n < 2:
+        return False
+    i = 2
+    while i * i <= n:
+        if n % i == 0:
+            return False
+        i += 1
+    return True
+
+
+def get_nslots(nbytes: int, chunk_nbytes: int = DEFAULT_CHUNK_NBYTES) -> int:
+    """Return a prime number of hash table slots of about 100 per chunk fitting into the cache"""
+    n = max(521, 100 * int(nbytes) // max(1, int(chunk_nbytes)))
+    while not _is_prime(n):
+        n += 1
+    return n
+
+
+def file_kwargs(kwargs: Optional[Dict] = None) -> Dict:
+    """Return the keyword arguments of `h5py.File` (rdcc_nbytes, rdcc_nslots, rdcc_w0) according
+    to the configuration. Values in `kwargs` take precedence."""
+    kwargs = dict(kwargs or {})
+    mb = get_config('hdf_chunk_cache_mb')
+    if mb is not None and 'rdcc_nbytes' not in kwargs:
+        kwargs['rdcc_nbytes'] = int(mb * MB)
+    nslots = get_config('hdf_chunk_cache_nslots')
+    if 'rdcc_nslots' not in kwargs:
+        if nslots is not None:
+            kwargs['rdcc_nslots'] = nslots
+        elif 'rdcc_nbytes' in kwargs:
+            kwargs['rdcc_nslots'] = get_nslots(kwargs['rdcc_nbytes'])
+    w0 = get_config('hdf_chunk_cache_w0')
+    if w0 is not None and 'rdcc_w0' not in kwargs:
+        kwargs['rdcc_w0'] = w0
+    return kwargs
+
+
+def open_dataset(group: h5py.Group, name: str, mb: float, nslots: Optional[int] = None,
+                 w0: Optional[float] = None) -> h5d.DatasetID:
+    """Open the dataset `name` of the group with a chunk cache of `mb` megabytes.
+
+    Note, that all open handles of a dataset share one cache. The settings only take effect
+    if the dataset is not open already."""
+    nbytes = int(mb * MB)
+    if nslots is None:
+        nslots = get_config('hdf_chunk_cache_nslots') or get_nslots(nbytes)
+    if w0 is None:
+        w0 = get_config('hdf_chunk_cache_w0')
+        if w0 is None:
+            w0 = h5i.get_file_id(group.id).get_access_plist().get_cache()[3]
+    dapl = h5p.create(h5p.DATASET_ACCESS)
+    dapl.set_chunk_cache(nslots, nbytes, w0)
+    return h5d.open(group.id, name.encode(), dapl=dapl)
+
+
+def apply_override(group: h5py.Group, name: str) -> Optional[h5d.DatasetID]:
+    """Open the dataset `name` of the group with the cache of "hdf_dataset_chunk_cache_mb",
+    if an override is configured for it. Returns None otherwise."""
+    overrides = get_config('hdf_dataset_chunk_cache_mb')
+    if not overrides or not isinstance(name, str):
+        return None
+    path = posixpath.normpath(posixpath.join(group.name, name))
+    mb = overrides.get(path, None)
+    if mb is None or group.get(name, getclass=True) is not h5py.Dataset:
+        return None
+    return open_dataset(group, name, mb)
+
+
+def info(dataset: h5py.Dataset) -> Dict:
+    """Return the chunk cache settings of the opened dataset (nslots, nbytes, w0).
+
+    HDF5 does not count hits and misses of the raw data chunk cache. If the HDF5 build exposes
+    the hit rate of the metadata cache of the file, it is returned as "mdc_hit_rate"."""
+    nslots, nbytes, w0 = dataset.id.get_access_plist().get_chunk_cache()
+    ret = {'nslots': nslots, 'nbytes': nbytes, 'w0': w0}
+    try:
+        ret['mdc_hit_rate'] = h5i.get_file_id(dataset.id).get_mdc_hit_rate()
+    except (AttributeError, RuntimeError):
+        pass
+    return ret
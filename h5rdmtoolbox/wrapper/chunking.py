@@ -0,0 +1,231 @@
+"""Chunk layouts derived from the intended access pattern of a dataset.
+
+`create_dataset(..., chunks=<strategy>)` accepts the following strategies:
+
+- "auto-timeseries": long runs along the access axis (e.g. reading the time history of a point)
+- "auto-slice": complete slices perpendicular to the access axis (e.g. reading one time step)
+- "auto": "auto-timeseries" for 1D datasets and scales, "auto-slice" along the time axis if a
+  time dataset is attached as scale, otherwise the generic guess of h5py
+
+The access axis is passed with `access_axis=` (default: the time axis or 0). `advise` also
+returns a chunk cache size, which holds all chunks touched by one read of the pattern over the
+current (or the expected) shape. Chunks are at most `TARGET_CHUNK_BYTES` large and are extended
+along axes, which are not read at once, only up to `MIN_CHUNK_BYTES` (to limit the per-chunk
+overhead of small reads). Along unlimited axes, chunks may extend beyond the current shape
+unless the expected shape is passed with `expected_shape=`.
+`benchmark` measures the read throughput of candidate layouts on the local disk.
+"""
+import pathlib
+import time
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import h5py
+import numpy as np
+from h5py._hl.filters import guess_chunk
+
+CHUNK_STRATEGIES = ('auto', 'auto-timeseries', 'auto-slice')
+# aimed size of a chunk in bytes:
+TARGET_CHUNK_BYTES = 2 ** 20
+# chunks are extended along axes, which are not read at once, only up to this size:
+MIN_CHUNK_BYTES = 2 ** 16
+
+
+class ChunkAdvice:
+    """Advised chunk shape and chunk cache size (rdcc_nbytes) of a dataset"""
+    __slots__ = ('chunks', 'cache_nbytes', 'strategy', 'access_axis')
+
+    def __init__(self, chunks: Optional[Tuple[int, ...]], cache_nbytes: int, strategy: str, access_axis: int):
+        self.chunks = chunks
+        self.cache_nbytes = cache_nbytes
+        self.strategy = strategy
+        self.access_axis = access_axis
+
+    def __repr__(self):
+        return (f'<{self.__class__.__name__} chunks={self.chunks} cache_nbytes={self.cache_nbytes} '
+                f'({self.strategy}, axis {self.access_axis})>')
+
+
+def _extents(shape: Tuple[int, ...], maxshape: Optional[Tuple], itemsize: int, target_nbytes: int) -> List[int]:
+    """Maximum chunk extent (number of elements) per axis. Chunks along unlimited axes may grow
+    beyond the current shape up to the number of elements fitting into `target_nbytes`"""
+    if maxshape is None:
+        return [max(1, n) for n in shape]
+    max_elements = max(1, target_nbytes // itemsize)
+    return [max(1, n) if m is not None else max(1, n, max_elements) for n, m in zip(shape, maxshape)]
+
+
+def _fill(chunks: List[int], extents: List[int], axes: Sequence[int], budget: int) -> int:
+    """Grow the chunk along the axes (in the given order) until the element budget is used"""
+    for axis in axes:
+        if budget <= 1:
+            break
+        chunks[axis] = max(1, min(extents[axis], budget))
+        budget //= chunks[axis]
+    return budget
+
+
+def _fill_pattern(ndim: int, extents: List[int], read_axes: Sequence[int], other_axes: Sequence[int],
+                  itemsize: int, target_nbytes: int) -> Tuple[int, ...]:
+    """Chunk shape covering the read axes up to the target size. Small chunks are extended
+    along the other axes up to MIN_CHUNK_BYTES"""
+    chunks = [1] * ndim
+    _fill(chunks, extents, read_axes, max(1, target_nbytes // itemsize))
+    min_elements = min(MIN_CHUNK_BYTES, target_nbytes) // itemsize
+    _fill(chunks, extents, other_axes, max(1, min_elements // int(np.prod(chunks))))
+    return tuple(chunks)
+
+
+def advise(shape: Tuple[int, ...],
+           dtype,
+           strategy: str = 'auto-slice',
+           access_axis: int = 0,
+           maxshape: Optional[Tuple] = None,
+           target_nbytes: int = TARGET_CHUNK_BYTES,
+           expected_shape: Optional[Tuple[int, ...]] = None) -> ChunkAdvice:
+    """Return the chunk shape and the chunk cache size for an access pattern.
+
+    Parameters
+    ----------
+    shape : Tuple[int, ...]
+        Shape of the dataset
+    dtype : np.dtype
+        Data type of the dataset
+    strategy : str
+        "auto-timeseries" or "auto-slice" (see module docstring). "auto" is "auto-timeseries"
+        for 1D datasets and the guess of h5py otherwise.
+    access_axis : int
+        The dominant access axis
+    maxshape : Optional[Tuple]
+        The maximum shape of the dataset (None for unlimited axes)
+    target_nbytes : int
+        Aimed size of a chunk in bytes
+    expected_shape : Optional[Tuple[int, ...]]
+        The expected final shape of a resizable dataset. The chunks and the cache size are
+        based on it instead of the current shape.
+
+    Returns
+    -------
+    ChunkAdvice
+        The advised layout. `chunks` is None for scalar datasets.
+    """
+    if strategy not in CHUNK_STRATEGIES:
+        raise ValueError(f'Unknown chunk strategy "{strategy}". Expected one of {CHUNK_STRATEGIES}')
+    if isinstance(shape, int):
+        shape = (shape,)
+    shape = tuple(int(n) for n in shape)
+    ndim = len(shape)
+    if ndim == 0:
+        return ChunkAdvice(None, 0, strategy, 0)
+    access_axis = access_axis % ndim
+    itemsize = np.dtype(dtype).itemsize
+    if expected_shape is None:
+        extents = _extents(shape, maxshape, itemsize, target_nbytes)
+        sizes = [max(1, n) for n in shape]
+    else:
+        if isinstance(expected_shape, int):
+            expected_shape = (expected_shape,)
+        if len(expected_shape) != ndim:
+            raise ValueError(f'Expected shape {expected_shape} does not match the dimensions of shape {shape}')
+        extents = sizes = [max(1, int(n)) for n in expected_shape]
+    others = [axis for axis in reversed(range(ndim)) if axis != access_axis]  # C order: last axis first
+
+    if strategy == 'auto' and ndim == 1:
+        strategy = 'auto-timeseries'
+    if strategy == 'auto':
+        chunks = tuple(guess_chunk(shape, maxshape, itemsize))
+    elif strategy == 'auto-timeseries':
+        chunks = _fill_pattern(ndim, extents, [access_axis], others, itemsize, target_nbytes)
+    else:  # auto-slice
+        chunks = _fill_pattern(ndim, extents, others, [access_axis], itemsize, target_nbytes)
+
+    # chunks touched by one read of the pattern:
+    if strategy == 'auto-timeseries':
+        n_chunks = -(-sizes[access_axis] // chunks[access_axis])
+    else:
+        n_chunks = int(np.prod([-(-sizes[axis] // chunks[axis]) for axis in others]))
+    chunk_nbytes = int(np.prod(chunks)) * itemsize
+    return ChunkAdvice(chunks, max(1, n_chunks) * chunk_nbytes, strategy, access_axis)
+
+
+def _read_pattern(dataset: h5py.Dataset, pattern: str, access_axis: int, n_reads: int, rng) -> int:
+    """Read the dataset `n_reads` times with the pattern and return the number of bytes read"""
+    nbytes = 0
+    for _ in range(n_reads):
+        if pattern == 'timeseries':
+            idx = [int(rng.integers(n)) for n in dataset.shape]
+            idx[access_axis] = slice(None)
+        else:
+            idx = [slice(None)] * dataset.ndim
+            idx[access_axis] = int(rng.integers(dataset.shape[access_axis]))
+        nbytes += dataset[tuple(idx)].nbytes
+    return nbytes
+
+
+def benchmark(shape: Tuple[int, ...],
+              dtype='f4',
+              pattern: str = 'slice',
+              access_axis: int = 0,
+              candidates: Optional[Dict[str, Optional[Tuple[int, ...]]]] = None,
+              n_reads: int = 20,
+              directory: Optional[Union[str, pathlib.Path]] = None,
+              **create_kwargs) -> List[Dict]:
+    """Measure the read throughput of chunk layouts for an access pattern on the local disk.
+
+    For every candidate, a temporary file with random data of the given shape is written and
+    read `n_reads` times with the pattern ("timeseries": all values along the access axis at a
+    random position, "slice": a random slice perpendicular to the access axis).
+
+    Parameters
+    ----------
+    shape : Tuple[int, ...]
+        Shape of the test dataset. Choose a representative but moderate size.
+    dtype : np.dtype
+        Data type of the test dataset
+    pattern : str
+        "timeseries" or "slice"
+    access_axis : int
+        The dominant access axis
+    candidates : Optional[Dict[str, Optional[Tuple[int, ...]]]]
+        Named chunk shapes. By default, the advised layouts of all strategies and the
+        contiguous layout (None) are compared.
+    n_reads : int
+        Number of reads per candidate
+    directory : Optional[Union[str, pathlib.Path]]
+        Directory of the test files (default: the temporary directory of the toolbox)
+    **create_kwargs
+        Further arguments of `h5py.Group.create_dataset` (e.g. compression)
+
+    Returns
+    -------
+    List[Dict]
+        One entry (name, chunks, write_s, read_MBps) per candidate, fastest read first
+    """
+    from ..utils import generate_temporary_filename
+
+    if pattern not in ('timeseries', 'slice'):
+        raise ValueError(f'Unknown access pattern "{pattern}". Expected "timeseries" or "slice"')
+    if candidates is None:
+        candidates = {strategy: advise(shape, dtype, strategy, access_axis).chunks for strategy in CHUNK_STRATEGIES}
+        candidates['contiguous'] = None
+    rng = np.random.default_rng(0)
+    data = rng.random(shape).astype(dtype)
+    results = []
+    for name, chunks in candidates.items():
+        filename = generate_temporary_filename(suffix='.hdf')
+        if directory is not None:
+            filename = pathlib.Path(directory) / filename.name
+        try:
+            start = time.perf_counter()
+            with h5py.File(filename, 'w') as h5:
+                h5.create_dataset('data', data=data, chunks=chunks, **create_kwargs)
+            write_s = time.perf_counter() - start
+            # fresh handle, so that the chunk cache is empty:
+            with h5py.File(filename, 'r') as h5:
+                start = time.perf_counter()
+                nbytes = _read_pattern(h5['data'], pattern, access_axis % len(shape), n_reads, rng)
+                read_s = time.perf_counter() - start
+        finally:
+            filename.unlink(missing_ok=True)
+        results.append({'name': name, 'chunks': chunks, 'write_s': write_s,
+                        'read_MBps': nbytes / max(read_s, 1e-9) / 1e6})
+    return sorted(results, key=lambda r: r['read_MBps'], reverse=True)
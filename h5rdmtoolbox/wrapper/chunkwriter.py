@@ -0,0 +1,111 @@
+"""Parallel writing of compressed, chunked datasets.
+
+HDF5 applies the filters (e.g. gzip) of a dataset in the writing thread, one chunk after the other.
+`write_chunks` instead filters the chunks in a thread pool (zlib releases the GIL) and writes the
+already filtered chunks in order with `write_direct_chunk`. Supported filter pipelines are gzip
+(deflate), optionally preceded by the shuffle filter. Datasets with other filters are written
+by h5py as usual.
+
+Examples
+--------
+>>> import h5rdmtoolbox as h5tbx
+>>> with h5tbx.set_config(hdf_compression='gzip', hdf_write_workers=8):
+...     with h5tbx.File('big.hdf', 'w') as h5:
+...         h5.create_dataset('u', data=big_array, chunks=(1, 512, 512))
+"""
+import itertools
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Generator, List, Optional, Tuple
+
+import h5py
+import numpy as np
+from h5py import h5z
+
+# maximum number of filtered chunks per worker waiting to be written:
+QUEUE_DEPTH = 4
+
+
+def get_filter_pipeline(dataset: h5py.Dataset) -> Optional[List[Tuple[int, Tuple]]]:
+    """Return the filters (code, values) of the dataset, if they can be applied by
+    `write_chunks`. Returns None otherwise."""
+    if dataset.chunks is None or dataset.dtype.kind not in 'biufc':
+        return None
+    dcpl = dataset.id.get_create_plist()
+    pipeline = []
+    for i in range(dcpl.get_nfilters()):
+        code, _, values, _ = dcpl.get_filter(i)
+        pipeline.append((code, values))
+    codes = [code for code, _ in pipeline]
+    if codes not in ([h5z.FILTER_DEFLATE], [h5z.FILTER_SHUFFLE, h5z.FILTER_DEFLATE]):
+        return None
+    return pipeline
+
+
+def iter_chunk_slices(shape: Tuple[int, ...], chunks: Tuple[int, ...]) -> Generator[Tuple[slice, ...], None, None]:
+    """Yield the slices of all chunks of a dataset in C order"""
+    ranges = [range(0, n, c) for n, c in zip(shape, chunks)]
+    for offset in itertools.product(*ranges):
+        yield tuple(slice(o, min(o + c, n)) for o, c, n in zip(offset, chunks, shape))
+
+
+def _filter_chunk(block: np.ndarray, chunks: Tuple[int, ...], dtype: np.dtype, fillvalue,
+                  pipeline: List[Tuple[int, Tuple]]) -> bytes:
+    if block.shape != chunks:  # edge chunks are stored with the full chunk shape
+        full = np.full(chunks, fillvalue, dtype=dtype)
+        full[tuple(slice(0, n) for n in block.shape)] = block
+        block = full
+    buffer = np.ascontiguousarray(block, dtype=dtype).tobytes()
+    for code, values in pipeline:
+        if code == h5z.FILTER_SHUFFLE and dtype.itemsize > 1:
+            buffer = np.frombuffer(buffer, dtype=np.uint8).reshape(-1, dtype.itemsize).T.tobytes()
+        elif code == h5z.FILTER_DEFLATE:
+            buffer = zlib.compress(buffer, values[0] if values else 4)
+    return buffer
+
+
+def write_chunks(dataset: h5py.Dataset, data: np.ndarray, workers: int) -> bool:
+    """Write `data` into the (empty, chunked and compressed) dataset. The chunks are filtered
+    by `workers` threads and written in order. Returns False (and writes nothing) if the
+    filter pipeline of the dataset is not supported.
+
+    Parameters
+    ----------
+    dataset : h5py.Dataset
+        The dataset to write to. Its shape must match the shape of data.
+    data : np.ndarray
+        The data
+    workers : int
+        Number of threads filtering the chunks
+
+    Returns
+    -------
+    bool
+        True if the data has been written
+    """
+    pipeline = get_filter_pipeline(dataset)
+    if pipeline is None:
+        return False
+    data = np.asarray(data)
+    if data.shape != dataset.shape:
+        raise ValueError(f'Shape of data {data.shape} does not match the dataset shape {dataset.shape}')
+    chunks, dtype = dataset.chunks, dataset.dtype
+    fillvalue = dataset.fillvalue
+    dsid = dataset.id
+    pending = deque()
+
+    def _write_next():
+        offset, future = pending.popleft()
+        dsid.write_direct_chunk(offset, future.result(), filter_mask=0)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for slc in iter_chunk_slices(data.shape, chunks):
+            offset = tuple(s.start for s in slc)
+            pending.append((offset, executor.submit(_filter_chunk, data[slc], chunks, dtype, fillvalue, pipeline)))
+            if len(pending) >= workers * QUEUE_DEPTH:
+                _write_next()
+        while pending:
+            _write_next()
+    return True
+
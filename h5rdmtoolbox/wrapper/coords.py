@@ -0,0 +1,148 @@
+"""Cache of the coordinates (dimension scales) of datasets.
+
+Slicing a dataset with dimension scales returns a `xr.DataArray` with coordinates. Reading the
+dimension list, the scales, their attributes and decoding time strings is done once per dataset.
+The resulting `CoordDescriptor` is cached (keyed by the HDF5 file number and the address of the
+dataset), so repeated slicing only reads the hyperslab of the dataset itself and slices the
+cached coordinate arrays.
+
+Datasets of files opened read-only cannot change, thus their entries stay valid as long as the
+file is open. For writable files, writing data or attributes of a dataset removes the entries of
+the dataset and of all datasets using it as dimension scale. Attaching or detaching scales
+removes the entries of the dataset and of the scale. Deleting or moving objects through the
+toolbox invalidates all entries of writable files.
+"""
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import h5py
+import numpy as np
+import xarray as xr
+from h5py._hl import dims as h5dims
+
+# maximum number of datasets, of which the coordinates are kept in memory:
+COORDS_CACHE_SIZE = 256
+
+# {(fileno, addr): (generation or None, descriptor, keys of the scales)}:
+_coords_cache: "OrderedDict[Tuple, Tuple[Optional[int], CoordDescriptor, frozenset]]" = OrderedDict()
+_generation = 0
+
+
+def _object_key(oid) -> Tuple[int, int]:
+    # the address changes, if the dataset is deleted and another one is moved to its name:
+    return oid.fileno, h5py.h5o.get_info(oid).addr
+
+
+def invalidate(*objs) -> None:
+    """Invalidate cached coordinates. If objects (or their identifiers) are given, the entries
+    of these objects and of all datasets using them as dimension scale are removed. Otherwise,
+    all cached coordinates of datasets of writable files are invalidated."""
+    global _generation
+    if not objs:
+        _generation += 1
+        return
+    if not _coords_cache:
+        return
+    keys = {_object_key(obj.id if isinstance(obj, h5py.HLObject) else obj) for obj in objs}
+    for key in [k for k, (_, _, scale_keys) in _coords_cache.items()
+                if k in keys or not keys.isdisjoint(scale_keys)]:
+        del _coords_cache[key]
+
+
+class ScaleDescriptor:
+    """Decoded data and attributes of a dimension scale"""
+    __slots__ = ('name', 'dim_name', 'raw', 'data', 'attrs')
+
+    def __init__(self, name: str, dim_name: str, raw, data, attrs: Dict):
+        self.name = name
+        self.dim_name = dim_name
+        self.raw = raw
+        self.data = data
+        self.attrs = attrs
+
+    def coord(self, arg) -> xr.DataArray:
+        """Return the coordinate for the slice `arg` of the dimension"""
+        if self.data.ndim == 0:
+            data = self.data
+        else:
+            data = self.data[arg]
+            if isinstance(data, np.ndarray):
+                data = data.copy()  # do not hand out views of the cached array
+            elif not isinstance(data, np.generic):
+                data = np.asarray(data, dtype=object)  # single decoded time
+        if data.ndim == 0:
+            if isinstance(arg, int):
+                return xr.DataArray(name=self.name, dims=(), data=data, attrs=dict(self.attrs))
+            return xr.DataArray(name=self.name, dims=self.name, data=[self.raw, ], attrs=dict(self.attrs))
+        if isinstance(data, np.ndarray):
+            return xr.DataArray(name=self.name, dims=self.dim_name, data=data, attrs=dict(self.attrs))
+        return xr.DataArray(name=self.name, dims=(), data=data, attrs=dict(self.attrs))
+
+
+class CoordDescriptor:
+    """The dimension names and the dimension scales of all axes of a dataset"""
+    __slots__ = ('dims_names', 'scales')
+
+    def __init__(self, dims_names: List[str], scales: List[List[ScaleDescriptor]]):
+        self.dims_names = dims_names
+        self.scales = scales
+
+    def coords(self, args) -> Dict[str, xr.DataArray]:
+        """Return the coordinates for the slices `args` (one per axis)"""
+        coords = {}
+        for axis_scales, arg in zip(self.scales, args):
+            for scale in axis_scales:
+                coords[scale.name] = scale.coord(arg)
+        return coords
+
+
+def _key_and_stamp(dataset: h5py.Dataset) -> Tuple[Tuple, Optional[int]]:
+    key = _object_key(dataset.id)
+    if h5py.h5i.get_file_id(dataset.id).get_intent() == h5py.h5f.ACC_RDONLY:
+        return key, None
+    return key, _generation
+
+
+def lookup(dataset: h5py.Dataset) -> Optional[CoordDescriptor]:
+    """Return the cached coordinates of the dataset or None"""
+    key, stamp = _key_and_stamp(dataset)
+    entry = _coords_cache.get(key, None)
+    if entry is None or entry[0] != stamp:
+        return None
+    _coords_cache.move_to_end(key)
+    return entry[1]
+
+
+def store(dataset: h5py.Dataset, descriptor: CoordDescriptor, scales: Iterable[h5py.Dataset] = ()) -> None:
+    """Cache the coordinates of the dataset, which are read from the dimension scales `scales`"""
+    key, stamp = _key_and_stamp(dataset)
+    _coords_cache[key] = (stamp, descriptor, frozenset(_object_key(scale.id) for scale in scales))
+    _coords_cache.move_to_end(key)
+    while len(_coords_cache) > COORDS_CACHE_SIZE:
+        _coords_cache.popitem(last=False)
+
+
+class DimensionProxy(h5dims.DimensionProxy):
+    """Dimension of a dataset. Changes of the scales invalidate the coordinate cache"""
+
+    @h5dims.DimensionProxy.label.setter
+    def label(self, val):
+        h5dims.DimensionProxy.label.fset(self, val)
+        invalidate(self._id)
+
+    def attach_scale(self, dset):
+        super().attach_scale(dset)
+        invalidate(self._id, dset)
+
+    def detach_scale(self, dset):
+        super().detach_scale(dset)
+        invalidate(self._id, dset)
+
+
+class DimensionManager(h5dims.DimensionManager):
+    """Dimensions of a dataset returning `DimensionProxy` objects of this module"""
+
+    def __getitem__(self, index):
+        if index > len(self) - 1:
+            raise IndexError('Index out of range')
+        return DimensionProxy(self._id, index)
@@ -9,7 +9,7 @@ import warnings
 from collections.abc import Iterable
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Dict, Union, Tuple, Optional
+from typing import List, Dict, Union, Tuple, Optional, Generator
 
 import h5py
 import numpy as np
@@ -20,9 +20,10 @@ import rdflib
 import xarray as xr
 from h5py._hl.base import phil, with_phil
 from h5py._objects import ObjectID
+from xarray.core import indexing
 
 # noinspection PyUnresolvedReferences
-from . import xr2hdf
+from . import chunkcache, chunking, chunkwriter, coords as coords_cache, nodes, xr2hdf, xrbackend
 from .ds_decoder import dataset_value_decoder
 from .h5attr import H5_DIM_ATTRS, pop_hdf_attributes, WrapperAttributeManager
 from .h5utils import _is_not_valid_natural_name, get_rootparent
@@ -66,6 +67,19 @@ H5KWARGS = (
     "meta_block_size",
 )
 ISO_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+# time formats, which numpy can parse, and the length of the resulting strings:
+ISO_COMPATIBLE_TIME_FORMATS = {
+    "%Y-%m-%dT%H:%M:%S.%f": 26,
+    "%Y-%m-%dT%H:%M:%S": 19,
+    "%Y-%m-%dT%H:%M": 16,
+    "%Y-%m-%d %H:%M:%S.%f": 26,
+    "%Y-%m-%d %H:%M:%S": 19,
+    "%Y-%m-%d %H:%M": 16,
+    "%Y-%m-%d": 10,
+}
+# units of time datasets stored as integer offsets:
+EPOCH_UNITS = ("s", "ms", "us", "ns")
+EPOCH_ORIGIN = "1970-01-01T00:00:00"
 
 
 def assert_filename_existence(filename: pathlib.Path) -> pathlib.Path:
@@ -94,11 +108,47 @@ def assert_filename_existence(filename: pathlib.Path) -> pathlib.Path:
 
 
 def convert_strings_to_datetimes(array, time_format="%Y-%m-%dT%H:%M:%S.%f"):
+    """Convert an array of time strings into datetimes. Arrays in an ISO 8601 compatible
+    format (see `ISO_COMPATIBLE_TIME_FORMATS`) are parsed at once by numpy and returned as
+    `datetime64[us]` array. Other formats are parsed element by element with `strptime`."""
     assert np.issubdtype(array.dtype, np.str_), "Unexpected array type"
     time_format = _normalize_time_format(time_format)
+    width = ISO_COMPATIBLE_TIME_FORMATS.get(time_format, None)
+    if width is not None and np.all(np.char.str_len(array) == width):
+        try:
+            return array.astype("datetime64[us]")
+        except ValueError:
+            pass  # let strptime raise the error
     return np.array(
         [datetime.strptime(date_str, time_format) for date_str in array.flat]
     ).reshape(array.shape)
+
+
+def _decode_epoch(arr, attrs: Dict) -> np.ndarray:
+    """Convert integer offsets (unit `attrs["units"]`) since `attrs["time_origin"]` into datetime64"""
+    unit = str(attrs["units"])
+    return np.datetime64(attrs["time_origin"], unit) + np.asarray(arr).astype(
+        f"timedelta64[{unit}]"
+    )
+
+
+def _is_epoch_dataset(attrs) -> bool:
+    """Return True if the attributes describe integer time offsets (see `create_time_dataset`)"""
+    return "time_origin" in attrs and str(attrs.get("units", None)) in EPOCH_UNITS
+
+
+def _get_time_axis(group, attach_scales) -> Optional[int]:
+    """Return the axis, to which a time dataset (see `create_time_dataset`) is attached as scale"""
+    for axis, scales in enumerate(attach_scales or ()):
+        if not isinstance(scales, (tuple, list)):
+            scales = (scales,)
+        for scale in scales:
+            if not scale:
+                continue
+            attrs = (scale if isinstance(scale, h5py.Dataset) else group[scale]).attrs
+            if "time_format" in attrs or _is_epoch_dataset(attrs):
+                return axis
+    return None
     # else:
     #     return np.array([convert_strings_to_datetimes(subarray) for subarray in array])
 
@@ -452,12 +502,31 @@ class Group(h5py.Group):
             return self.create_dataset(name=name, **obj)
         super().__setitem__(name, obj)
 
+    def __delitem__(self, name):
+        super().__delitem__(name)
+        coords_cache.invalidate()
+        rdf.invalidate()
+
+    def move(self, source, dest):
+        """Move a link to a new location in the file"""
+        super().move(source, dest)
+        coords_cache.invalidate()
+        rdf.invalidate()
+
+    def copy(self, source, dest, name=None, **kwargs):
+        """Copy an object or group (see `h5py.Group.copy`)"""
+        super().copy(source, dest, name=name, **kwargs)
+        rdf.invalidate()
+
     def __getitem__(self, name):
         if isinstance(name, Lower):
             for k in self.keys():
                 if name == k.lower():
                     name = k
                     break
+        dsid = chunkcache.apply_override(self, name)
+        if dsid is not None:
+            return self._h5ds(dsid)
         ret = super().__getitem__(name)
         if isinstance(ret, h5py.Dataset):
             return self._h5ds(ret.id)
@@ -475,12 +544,28 @@ class Group(h5py.Group):
             yield key, self[key]
 
     def visititems(self, func):
-        """Visit wrapped objects to keep wrapper APIs available in callbacks."""
+        """Visit wrapped objects to keep wrapper APIs available in callbacks.
+        The objects are opened relative to this group instead of resolving the
+        name with `__getitem__`."""
         def _visitor(name):
-            return func(name, self[name])
+            return func(name, nodes.wrap(self, nodes.open_object(self, name)))
 
         return super().visit(_visitor)
 
+    def visit_nodes(self, func):
+        """Call `func` for every object below this group with a lightweight
+        `nodes.Node` descriptor (path, kind, number of attributes and on demand shape,
+        dtype and attribute names). The wrapper object is only built if `Node.obj`
+        is accessed. Returning None continues the traversal, returning anything
+        else stops it and immediately returns that value.
+
+        Examples
+        --------
+        >>> datasets = []
+        >>> h5.visit_nodes(lambda node: datasets.append(node.path) if node.kind == 'dataset' else None)
+        """
+        return nodes.visit_nodes(self, func)
+
     def __getattr__(self, item: str):
         standard_attributes: Dict = self.standard_attributes
         if standard_attributes:  # are there standard attributes registered?
@@ -499,20 +584,20 @@ class Group(h5py.Group):
                 # raise an error if natural naming is NOT enabled
                 raise AttributeError(e)
 
-        # if item in self.__dict__:
-        #     return super().__getattribute__(item)
-        try:
-            _item = item.replace("_", " ")
-            # item is a Group name?
-            if item in [k for k, v in self.items() if isinstance(v, h5py.Group)]:
-                return self._h5grp(self[item].id)
-            # item is a Dataset name?
-            elif item in [k for k, v in self.items() if isinstance(v, h5py.Dataset)]:
-                return self._h5ds(self[item].id)
-            raise AttributeError(item)
-            # return super().__getattribute__(item)
-        except AttributeError:
-            raise AttributeError(item)
+        # look up the member directly instead of wrapping all members of the group:
+        if "/" not in item and item != ".":
+            try:
+                cls = h5py.Group.get(self, item, getclass=True)
+            except (KeyError, RuntimeError):  # e.g. dangling links
+                cls = None
+            if cls is not None and issubclass(cls, h5py.Group):
+                return self._h5grp(h5py.Group.__getitem__(self, item).id)
+            if cls is not None and issubclass(cls, h5py.Dataset):
+                dsid = chunkcache.apply_override(self, item)
+                if dsid is None:
+                    dsid = h5py.Group.__getitem__(self, item).id
+                return self._h5ds(dsid)
+        raise AttributeError(item)
 
     def __setattr__(self, key, value):
         _convention = self.__dict__.get("_convention")
@@ -694,10 +779,13 @@ class Group(h5py.Group):
         assign_rdf: bool = True,
         overwrite: bool = False,
         attrs: Dict = None,
+        epoch_unit: Optional[str] = None,
         **kwargs,
     ):
         """Special creation function to create a time vector. Data is stored as a string dataset
-        where each datetime is converted to a string using the provided time_format
+        where each datetime is converted to a string using the provided time_format. If
+        `epoch_unit` is given, the data is stored as int64 offsets since 1970-01-01 instead,
+        which are read without parsing any strings.
 
         Parameter
         ---------
@@ -716,6 +804,10 @@ class Group(h5py.Group):
             If the dataset already exists, it is overwritten if True. If False, the dataset is not created
         attrs : Dict, default=None
             Attributes of the dataset
+        epoch_unit : Optional[str], default=None
+            One of 's', 'ms', 'us', 'ns'. If given, the times are stored as int64 offsets
+            (in this unit) since `EPOCH_ORIGIN`. The unit is written to the attribute "units"
+            and the origin to the attribute "time_origin". The time_format is kept as attribute.
         **kwargs : dict
             Additional keyword arguments passed to the h5py create_dataset method
         """
@@ -725,7 +817,38 @@ class Group(h5py.Group):
 
         attrs.update({"time_format": time_format})
 
-        if isinstance(data, np.ndarray):
+        if epoch_unit is not None:
+            if epoch_unit not in EPOCH_UNITS:
+                raise ValueError(
+                    f'Invalid epoch unit "{epoch_unit}". Expected one of {EPOCH_UNITS}'
+                )
+            offsets = (
+                np.asarray(data, dtype=f"datetime64[{epoch_unit}]")
+                - np.datetime64(EPOCH_ORIGIN, epoch_unit)
+            ).astype(np.int64)
+            attrs.update({"units": epoch_unit, "time_origin": EPOCH_ORIGIN})
+            ds = self.create_dataset(
+                name,
+                data=offsets,
+                overwrite=overwrite,
+                attrs=attrs,
+                **kwargs,
+            )
+        elif (
+            isinstance(data, np.ndarray)
+            and data.dtype.kind == "M"
+            and time_format == ISO_TIME_FORMAT
+        ):
+            ds = self.create_string_dataset(
+                name,
+                data=np.datetime_as_string(
+                    data.astype("datetime64[us]"), unit="us"
+                ).tolist(),
+                overwrite=overwrite,
+                attrs=attrs,
+                **kwargs,
+            )
+        elif isinstance(data, np.ndarray):
             ds = self.create_string_dataset(
                 name,
                 data=[t.astype(datetime).strftime(time_format) for t in data],
@@ -856,7 +979,12 @@ class Group(h5py.Group):
             - ... overwrite is True, then dataset is deleted and rewritten according to method parameters
             - ... overwrite is False, then dataset creation has no effect. Existing dataset is returned.
         chunks : bool or according to h5py.File.create_dataset documentation
-            Needs to be True if later resizing is planned
+            Needs to be True if later resizing is planned. The strategies "auto",
+            "auto-timeseries" and "auto-slice" derive the chunk shape from the
+            access pattern (see `h5rdmtoolbox.wrapper.chunking`). The dominant
+            access axis can be passed with the keyword `access_axis`. By default,
+            it is the axis of an attached time dataset. The expected final shape of
+            resizable datasets can be passed with the keyword `expected_shape`.
         make_scale: bool, default=False
             Makes this dataset scale. The parameter attach_scale must be uses, thus be None.
         attach_data_scale: Union[None, h5py.Dataset], default=None
@@ -933,6 +1061,9 @@ class Group(h5py.Group):
         attrs, skwargs, kwargs = process_attributes(
             Group, "create_dataset", attrs, kwargs, name=name
         )
+        write_workers = kwargs.pop("write_workers", get_config("hdf_write_workers"))
+        access_axis = kwargs.pop("access_axis", None)
+        expected_shape = kwargs.pop("expected_shape", None)
 
         if isinstance(data, xr.DataArray):
             data.attrs.update(attrs)
@@ -1024,6 +1155,22 @@ class Group(h5py.Group):
 
         _maxshape = kwargs.get("maxshape", shape)
 
+        if isinstance(chunks, str):
+            # derive the chunk shape from the access pattern:
+            strategy = chunks
+            if access_axis is None:
+                access_axis = _get_time_axis(self, attach_scales)
+                if strategy == "auto" and access_axis is not None:
+                    strategy = "auto-slice"
+            chunks = chunking.advise(
+                _data.shape if _data is not None else shape,
+                dtype or (_data.dtype if _data is not None else "f4"),
+                strategy=strategy,
+                access_axis=access_axis or 0,
+                maxshape=kwargs.get("maxshape", None),
+                expected_shape=expected_shape,
+            ).chunks
+
         logger.debug(
             f'Creating dataset "{name}" in "{self.name}" with maxshape "{_maxshape}" '
             f'and using compression "{compression}" with opt "{compression_opts}"'
@@ -1036,6 +1183,24 @@ class Group(h5py.Group):
                 _ds = super().create_dataset(
                     name, shape=shape, dtype=dtype, data=_data, **kwargs
                 )
+            elif (
+                write_workers > 1
+                and compression is not None
+                and _data.dtype.kind in "biufc"
+                and (shape is None or tuple(shape) == _data.shape)
+            ):
+                # compress the chunks in parallel and write them directly:
+                _ds = super().create_dataset(
+                    name,
+                    shape=_data.shape,
+                    dtype=dtype or _data.dtype,
+                    chunks=chunks,
+                    compression=compression,
+                    compression_opts=compression_opts,
+                    **kwargs,
+                )
+                if not chunkwriter.write_chunks(_ds, _data, workers=write_workers):
+                    _ds[()] = _data
             else:
                 # create ND dataset with shape, data is assigned later
                 _ds = super().create_dataset(
@@ -1151,7 +1316,10 @@ class Group(h5py.Group):
         objfilter: Union[str, h5py.Dataset, h5py.Group, None] = None,
         recursive: bool = True,
         ignore_attribute_error: bool = False,
-    ) -> List[protocols.LazyObject]:
+        limit: Optional[int] = None,
+        skip: int = 0,
+        as_generator: bool = False,
+    ) -> Union[List[protocols.LazyObject], Generator[protocols.LazyObject, None, None]]:
         """
         Examples for filter parameters:
         filter = {'long_name': 'any objects long name'} --> searches in attributes only
@@ -1169,10 +1337,16 @@ class Group(h5py.Group):
         ignore_attribute_error: bool, optional=False
             If True, the KeyError normally raised when accessing hdf5 object attributes is ignored.
             Otherwise, the KeyError is raised.
+        limit: int, optional
+            Maximum number of results. The search stops once the limit is reached.
+        skip: int, optional
+            Number of results to skip. Default is 0
+        as_generator: bool, optional
+            If True, the results are yielded one at a time during the search. Default is False
 
         Returns
         -------
-        h5obj: List[LazyObject]
+        h5obj: List[LazyObject] or Generator[LazyObject]
         """
         from h5rdmtoolbox.database import ObjDB
 
@@ -1181,6 +1355,9 @@ class Group(h5py.Group):
             objfilter,
             recursive=recursive,
             ignore_attribute_error=ignore_attribute_error,
+            limit=limit,
+            skip=skip,
+            as_generator=as_generator,
         )
 
     def create_dataset_from_csv(
@@ -1608,12 +1785,14 @@ class Group(h5py.Group):
         all below"""
         _names = []
 
-        def _get_obj_name(name, node):
-            if isinstance(node, obj_type):
-                _names.append(name)
+        kind = "group" if issubclass(obj_type, h5py.Group) else "dataset"
+
+        def _get_obj_name(node):
+            if node.kind == kind:
+                _names.append(node.name)
 
         if recursive:
-            self.visititems(_get_obj_name)
+            self.visit_nodes(_get_obj_name)
             return _names
         return [g for g in self.keys() if isinstance(self[g], obj_type)]
 
@@ -1813,6 +1992,13 @@ class Dataset(h5py.Dataset):
         with phil:
             return WrapperAttributeManager(self)
 
+    @property
+    def dims(self) -> coords_cache.DimensionManager:
+        """Access dimension scales attached to this dataset. Attaching or
+        detaching scales invalidates the cached coordinates."""
+        with phil:
+            return coords_cache.DimensionManager(self)
+
     @property
     def parent(self) -> protocols.H5TbxGroup:
         """Return the parent group of this dataset
@@ -2166,12 +2352,153 @@ class Dataset(h5py.Dataset):
                     return _convention.properties[self.__class__][key].set(self, value)
         return super().__setattr__(key, value)
 
+    def _coord_descriptor(self) -> coords_cache.CoordDescriptor:
+        """Return the (cached) dimension names and decoded dimension scales"""
+        descriptor = coords_cache.lookup(self)
+        if descriptor is not None:
+            return descriptor
+
+        dims = h5py.Dataset.dims.fget(self)
+        # remember the first dimension name for all axis:
+        dims_names = [
+            d[0].name.rsplit("/")[-1] if len(d) > 0 else f"dim_{ii}"
+            for ii, d in enumerate(dims)
+        ]
+        scales, scale_datasets = [], []
+        for dim, dim_name in zip(dims, dims_names):
+            axis_scales = []
+            for iax in range(len(dim)):
+                dim_ds = dim[iax]
+                scale_datasets.append(dim_ds)
+                raw = dim_ds[()]
+                data = raw
+                dim_ds_attrs = pop_hdf_attributes(dim_ds.attrs)
+                if raw.dtype.kind == "S" and dim_ds_attrs.get("time_format", False):
+                    # decode time strings
+                    _time_format = _normalize_time_format(dim_ds_attrs["time_format"])
+                    if raw.ndim == 0:
+                        data = np.array(
+                            datetime.strptime(raw.astype(str), _time_format)
+                        ).astype(datetime)
+                    else:
+                        data = convert_strings_to_datetimes(
+                            raw.astype(str), time_format=_time_format
+                        )
+                elif raw.dtype.kind in "iu" and _is_epoch_dataset(dim_ds_attrs):
+                    data = _decode_epoch(raw, dim_ds_attrs)
+                    dim_ds_attrs.pop("units")
+                axis_scales.append(
+                    coords_cache.ScaleDescriptor(
+                        name=dim_ds.name.rsplit("/")[-1],
+                        dim_name=dim_name,
+                        raw=raw,
+                        data=data,
+                        attrs=dim_ds_attrs,
+                    )
+                )
+            scales.append(axis_scales)
+        descriptor = coords_cache.CoordDescriptor(dims_names, scales)
+        coords_cache.store(self, descriptor, scale_datasets)
+        return descriptor
+
+    def _scalar_coords(self, ds_attrs) -> Dict[str, xr.DataArray]:
+        """Return the (scalar) coordinates listed in the attribute COORDINATES"""
+        coords = {}
+        coordinates: Optional[Union[str, List[str]]] = ds_attrs.get(
+            protected_attributes.COORDINATES, None
+        )
+        if coordinates is None:
+            return coords
+        if isinstance(coordinates, str):
+            coordinates = [
+                coordinates,
+            ]
+        else:
+            coordinates = list(coordinates)
+
+        for c in coordinates:
+            if c[0] == "/":
+                _data = self.rootparent[c]
+            else:
+                _data = self.parent[c]
+            _name = Path(c).stem
+            coords[_name] = xr.DataArray(
+                name=_name,
+                dims=(),
+                data=_data,
+                attrs=pop_hdf_attributes(self.parent[c].attrs),
+            )
+        return coords
+
+    @property
+    def chunk_cache(self) -> Dict:
+        """Return the chunk cache settings (nslots, nbytes, w0) of this handle. The hit rate of
+        the metadata cache is included if available (HDF5 does not count chunk cache hits)."""
+        return chunkcache.info(self)
+
+    def to_lazy_xarray(
+        self, chunks: Optional[Union[bool, str, Dict, Tuple]] = None
+    ) -> xr.DataArray:
+        """Return the dataset as `xr.DataArray`, which reads the data only when needed.
+        Coordinates and attributes are resolved like in `__getitem__`. Slicing the returned
+        array does not read any data. Only numeric datasets are supported.
+
+        Parameters
+        ----------
+        chunks : Optional[Union[bool, str, Dict, Tuple]]
+            Chunks of the dask array. By default, the HDF5 chunks are used if dask is
+            installed. Pass False to not use dask even if it is installed. Without dask,
+            the data is lazily indexed but computations load the selection into memory.
+
+        Returns
+        -------
+        xr.DataArray
+            The lazy data array
+
+        Examples
+        --------
+        >>> with h5tbx.File('my_file.hdf') as h5:
+        ...     mean = h5['u'].to_lazy_xarray().mean('time').compute()
+        """
+        if self.dtype.kind not in "biufc":
+            raise TypeError(
+                f'Lazy arrays are only supported for numeric datasets, not for dtype "{self.dtype}"'
+            )
+        ds_attrs = self.attrs.decode_all()
+        for k, v in ds_attrs.copy().items():
+            if isinstance(v, (h5py.Group, h5py.Dataset)):
+                ds_attrs[k] = v.name
+        attrs = pop_hdf_attributes(ds_attrs)
+        if _is_epoch_dataset(attrs):
+            raise TypeError("Lazy arrays are not supported for time datasets")
+
+        if "DIMENSION_LIST" in ds_attrs:
+            descriptor = self._coord_descriptor()
+            dims = tuple(descriptor.dims_names)
+            coords = descriptor.coords([slice(None)] * self.ndim)
+        else:
+            dims = tuple(f"dim_{i}" for i in range(self.ndim))
+            coords = {}
+        coords.update(self._scalar_coords(ds_attrs))
+
+        data = indexing.LazilyIndexedArray(xrbackend.H5BackendArray(self))
+        da = xr.DataArray(
+            xr.Variable(dims, data, attrs=attrs),
+            name=Path(self.name).stem,
+            coords=coords,
+        )
+        dask_chunks = xrbackend.get_dask_chunks(self, dims, chunks)
+        if dask_chunks is not None:
+            da = da.chunk(dask_chunks)
+        return da
+
     def __setitem__(self, key, value):
         if isinstance(value, xr.DataArray):
             self.attrs.update(value.attrs)
             super().__setitem__(key, value.data)
         else:
             super().__setitem__(key, value)
+        coords_cache.invalidate(self)
 
     @dataset_value_decoder
     def __getitem__(
@@ -2194,6 +2521,14 @@ class Dataset(h5py.Dataset):
         if not get_config("return_xarray") or nparray:
             return super().__getitem__(args, new_dtype=new_dtype)
 
+        if (
+            get_config("lazy_xarray")
+            and new_dtype is None
+            and self.dtype.kind in "biufc"
+            and not _is_epoch_dataset(self.attrs)
+        ):
+            return self.to_lazy_xarray()[args]
+
         # check if any entry in args is of type Ellipsis:
         if any(arg is Ellipsis for arg in args):
             # substitute Ellipsis with as many slices as needed:
@@ -2208,7 +2543,7 @@ class Dataset(h5py.Dataset):
         arr = super().__getitem__(args, new_dtype=new_dtype)
 
         if links_as_strings:
-            attrs = dict(self.attrs)
+            attrs = self.attrs.decode_all()
             for k, v in attrs.copy().items():
                 if isinstance(v, (h5py.Group, h5py.Dataset)):
                     attrs[k] = v.name
@@ -2217,6 +2552,9 @@ class Dataset(h5py.Dataset):
             ds_attrs = self.attrs
 
         attrs = pop_hdf_attributes(ds_attrs)
+        if self.dtype.kind in "iu" and _is_epoch_dataset(attrs):
+            arr = _decode_epoch(arr, attrs)
+            attrs.pop("units")
 
         if "DIMENSION_LIST" in ds_attrs:
             # there are coordinates to attach...
@@ -2225,76 +2563,9 @@ class Dataset(h5py.Dataset):
             for ia, a in enumerate(args):
                 myargs[ia] = a
 
-            # remember the first dimension name for all axis:
-            dims_names = [
-                d[0].name.rsplit("/")[-1] if len(d) > 0 else f"dim_{ii}"
-                for ii, d in enumerate(self.dims)
-            ]
-
-            coords = {}
-
-            for dim, dim_name, arg in zip(self.dims, dims_names, myargs):
-                for iax, _ in enumerate(dim):
-                    dim_ds = dim[iax]
-                    coord_name = dim[iax].name.rsplit("/")[-1]
-                    if dim_ds.ndim == 0:
-                        dim_ds_data = dim_ds[()]
-                    else:
-                        dim_ds_data = dim_ds[arg]
-                    dim_ds_attrs = pop_hdf_attributes(dim_ds.attrs)
-                    if dim_ds_data.dtype.kind == "S":
-                        # decode string array
-                        if dim_ds_attrs.get("time_format", False):
-                            _time_format = _normalize_time_format(
-                                dim_ds_attrs["time_format"]
-                            )
-                            if dim_ds_data.ndim == 0:
-                                dim_ds_data = np.array(
-                                    datetime.strptime(
-                                        dim_ds_data.astype(str),
-                                        _time_format,
-                                    )
-                                ).astype(datetime)
-                            else:
-                                dim_ds_data = convert_strings_to_datetimes(
-                                    dim_ds_data.astype(str),
-                                    time_format=_time_format,
-                                )
-                                # dim_ds_data = np.array(
-                                #     [datetime.fromisoformat(t) for t in dim_ds_data.astype(str)]).astype(
-                                #     datetime)
-                    if dim_ds_data.ndim == 0:
-                        if isinstance(arg, int):
-                            coords[coord_name] = xr.DataArray(
-                                name=coord_name,
-                                dims=(),
-                                data=dim_ds_data,
-                                attrs=dim_ds_attrs,
-                            )
-                        else:
-                            coords[coord_name] = xr.DataArray(
-                                name=coord_name,
-                                dims=coord_name,
-                                data=[
-                                    dim_ds[()],
-                                ],
-                                attrs=dim_ds_attrs,
-                            )
-                    else:
-                        if isinstance(dim_ds_data, np.ndarray):
-                            coords[coord_name] = xr.DataArray(
-                                name=coord_name,
-                                dims=dim_name,
-                                data=dim_ds_data,
-                                attrs=dim_ds_attrs,
-                            )
-                        else:
-                            coords[coord_name] = xr.DataArray(
-                                name=coord_name,
-                                dims=(),
-                                data=dim_ds_data,
-                                attrs=dim_ds_attrs,
-                            )
+            descriptor = self._coord_descriptor()
+            dims_names = descriptor.dims_names
+            coords = descriptor.coords(myargs)
 
             used_dims = [
                 dim_name
@@ -2302,33 +2573,7 @@ class Dataset(h5py.Dataset):
                 if isinstance(arg, (slice, np.ndarray, list))
             ]
 
-            coordinates: Optional[Union[str, List[str]]] = ds_attrs.get(
-                protected_attributes.COORDINATES
-            )
-            if coordinates is not None:
-                if isinstance(coordinates, str):
-                    coordinates = [
-                        coordinates,
-                    ]
-                else:
-                    coordinates = list(coordinates)
-
-                for c in coordinates:
-                    if c[0] == "/":
-                        _data = self.rootparent[c]
-                    else:
-                        _data = self.parent[c]
-                    _name = Path(c).stem
-                    coords.update(
-                        {
-                            _name: xr.DataArray(
-                                name=_name,
-                                dims=(),
-                                data=_data,
-                                attrs=pop_hdf_attributes(self.parent[c].attrs),
-                            )
-                        }
-                    )
+            coords.update(self._scalar_coords(ds_attrs))
             return xr.DataArray(
                 name=Path(self.name).stem,
                 data=arr,
@@ -2351,48 +2596,16 @@ class Dataset(h5py.Dataset):
                 time_format = _normalize_time_format(time_format)
                 if _arr.ndim == 0:
                     _arr = np.asarray(datetime.strptime(_arr, time_format))
-                elif _arr.ndim == 1:
-                    _arr = [datetime.strptime(str(t), time_format) for t in _arr]
-                else:  # _arr.ndim > 1:
-                    orig_shape = _arr.shape
-                    _flat_arr = np.asarray(
-                        [datetime.strptime(t, time_format) for t in _arr.flatten()]
-                    )
-                    _arr = _flat_arr.reshape(orig_shape)
+                else:
+                    _arr = convert_strings_to_datetimes(_arr, time_format=time_format)
                 return xr.DataArray(_arr, attrs=attrs)
 
             if isinstance(_arr, np.ndarray):
                 return xr.DataArray(_arr, attrs=attrs)
             return _arr
 
-        coords = {}
-        coordinates: Optional[Union[str, List[str]]] = ds_attrs.get(
-            protected_attributes.COORDINATES, None
-        )
-        if coordinates is not None:
-            if isinstance(coordinates, str):
-                coordinates = [
-                    coordinates,
-                ]
-            else:
-                coordinates = list(coordinates)
-
-            for c in coordinates:
-                if c[0] == "/":
-                    _data = self.rootparent[c]
-                else:
-                    _data = self.parent[c]
-                _name = Path(c).stem
-                coords.update(
-                    {
-                        _name: xr.DataArray(
-                            name=_name,
-                            dims=(),
-                            data=_data,
-                            attrs=pop_hdf_attributes(self.parent[c].attrs),
-                        )
-                    }
-                )
+        coords = self._scalar_coords(ds_attrs)
+        if coords:
             da = xr.DataArray(name=Path(self.name).stem, data=arr, attrs=attrs)
             for k, v in coords.items():
                 da = da.assign_coords({k: v})
@@ -2503,7 +2716,9 @@ class File(h5py.File, Group):
     mode : {'r', 'r+', 'w', 'w-', 'x', 'a'}, optional
         The mode in which to open the file. The default is 'r'.
     **kwargs : Dict
-        Additional keyword arguments are passed to h5py.File.
+        Additional keyword arguments are passed to h5py.File. The chunk cache parameters
+        (rdcc_nbytes, rdcc_nslots, rdcc_w0) default to the configuration parameters
+        "hdf_chunk_cache_mb", "hdf_chunk_cache_nslots" and "hdf_chunk_cache_w0".
 
 
     Notes
@@ -2603,7 +2818,7 @@ class File(h5py.File, Group):
             self._hdf_filename = Path(self.filename)
             return
         elif hasattr(name, "read") and hasattr(name, "seek"):
-            super(File, self).__init__(name, mode, **kwargs)
+            super(File, self).__init__(name, mode, **chunkcache.file_kwargs(kwargs))
             self._hdf_filename = Path(self.filename)
             is_fileobj_init = True
 
@@ -2621,6 +2836,11 @@ class File(h5py.File, Group):
                 logger.debug("A filename is given to initialize the File class")
                 fname = pathlib.Path(name)
                 # a filename is given.
+                if mode not in (None, "r"):
+                    # read-only handles of lazy objects would prevent opening the file for writing:
+                    from ..database import handles
+
+                    handles.release(fname)
 
                 if mode is None:  # mode not given:
                     # file does exist and mode not given --> read only!
@@ -2714,6 +2934,7 @@ class File(h5py.File, Group):
             logger.debug(
                 f"Initializing h5py.File with name={name}, mode={mode} and kwargs={kwargs}"
             )
+            kwargs = chunkcache.file_kwargs(kwargs)
             try:
                 super().__init__(name=name, mode=mode, **kwargs)
             except OSError as e:
@@ -1,12 +1,15 @@
 """Attribute module"""
 
 import ast
+import copy
 import json
 import logging
 import warnings
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, Union, Tuple, Optional, Any
+from typing import Dict, Union, Tuple, Optional, Any, List
 
+import h5py
 import numpy as np
 import pint
 import pydantic
@@ -16,15 +19,105 @@ from h5py._hl.base import with_phil
 from h5py._objects import ObjectID, phil
 from pydantic import HttpUrl
 
+from . import coords
 from .. import errors
 from .. import get_config, convention, utils
 from .. import get_ureg
 from .. import protected_attributes
 from ..convention import consts
+from ..ld import rdf
 
 logger = logging.getLogger("h5rdmtoolbox")
 H5_DIM_ATTRS = protected_attributes.h5rdmtoolbox
 
+# maximum number of decoded attribute values kept in memory:
+DECODED_ATTR_CACHE_SIZE = 4096
+
+# kinds of decoded attribute values. Mutable values are copied when they are taken from the cache:
+_VALUE = 0  # immutable value (AttributeString, number, ...), returned as is
+_JSON = 1  # dictionary, the JSON string is kept and parsed on every access
+_LITERAL = 2  # list or tuple (evaluated literal)
+_ARRAY = 3  # numpy array
+
+# (file number, object address, attribute name) -> (raw value, kind, payload):
+_decoded_cache: "OrderedDict[Tuple, Tuple[Any, int, Any]]" = OrderedDict()
+
+
+def _object_key(_id: ObjectID) -> Tuple[int, int, bool]:
+    """Return the file number and the address of the object and whether the file is
+    opened read-only. Unlike the name, the address changes, if an object is deleted
+    and another object is moved to its name."""
+    read_only = h5py.h5i.get_file_id(_id).get_intent() == h5py.h5f.ACC_RDONLY
+    return _id.fileno, h5py.h5o.get_info(_id).addr, read_only
+
+
+def _same_raw_value(a, b) -> bool:
+    """Return whether two raw attribute values are equal (including their type)"""
+    if type(a) is not type(b):
+        return False
+    try:
+        if isinstance(a, np.ndarray):
+            return a.dtype == b.dtype and a.shape == b.shape and bool(np.array_equal(a, b))
+        return bool(a == b)
+    except Exception:  # e.g. object references
+        return False
+
+
+def decode_attribute_value(ret) -> Tuple[int, Any]:
+    """Decode a raw attribute value as read by h5py.
+
+    Returns
+    -------
+    Tuple[int, Any]
+        The kind of the value (_VALUE, _JSON, _LITERAL or _ARRAY) and the payload,
+        which is turned into the attribute value by `_materialize()`
+    """
+    if isinstance(ret, str):
+        if ret == "":
+            return _VALUE, ret
+        first = ret[0]
+        if first == "{":
+            return _JSON, ret
+        if first == "(":
+            if ret[-1] == ")":
+                # might be a tuple object
+                try:
+                    return _LITERAL, ast.literal_eval(ret)
+                except (ValueError, SyntaxError, NameError, AttributeError):
+                    return _VALUE, ret
+            return _VALUE, ret
+        if first == "[":
+            if ret[-1] == "]":
+                # might be a list object
+                try:
+                    return _LITERAL, ast.literal_eval(ret)
+                except (ValueError, SyntaxError, NameError, AttributeError):
+                    return _VALUE, ret
+            return _VALUE, ret
+        return _VALUE, AttributeString(ret)
+    if isinstance(ret, np.ndarray):
+        if ret.dtype.name != "object":
+            return _ARRAY, ret
+        values = ret.tolist()
+        if ret.ndim and all(isinstance(v, str) for v in ret.flat):
+            # a list of strings. Evaluating its string representation would return the same list
+            return _LITERAL, values
+        vstr = str(values)
+        if "<HDF5 object reference>" in vstr:
+            return _VALUE, ret
+        return decode_attribute_value(vstr)
+    return _VALUE, ret
+
+
+def _materialize(kind: int, payload):
+    if kind == _VALUE:
+        return payload
+    if kind == _JSON:
+        return json.loads(payload)
+    if kind == _LITERAL:
+        return copy.deepcopy(payload)
+    return payload.copy()
+
 
 class AttrDescriptionError(Exception):
     """Generic attribute description error"""
@@ -153,74 +246,81 @@ class WrapperAttributeManager(AttributeManager):
 
     @staticmethod
     def _parse_return_value(_id, ret):
-        if isinstance(ret, str):
-            if ret == "":
-                return ret
-            if ret[0] == "{":
-                dictionary = json.loads(ret)
-                for k, v in dictionary.items():
-                    if isinstance(v, str):
-                        if not v:
-                            dictionary[k] = ""
-                        # else:
-                        #     if v[0] == '/':
-                        #         if isinstance(_id, h5py.h5g.GroupID):
-                        #             rootgrp = get_rootparent(h5py.Group(_id))
-                        #             dictionary[k] = rootgrp.get(v)
-                        #         elif isinstance(_id, h5py.h5d.DatasetID):
-                        #             rootgrp = get_rootparent(h5py.Dataset(_id).parent)
-                        #             dictionary[k] = rootgrp.get(v)
-                return dictionary
-            # if ret[0] == '/':
-            #     # it may be group or dataset path or actually just a filepath stored by the user
-            #     if isinstance(_id, h5py.h5g.GroupID):
-            #         # call like this, otherwise recursive call!
-            #         from .core import Group
-            #         rootgrp = get_rootparent(Group(_id))
-            #         if rootgrp.get(ret) is None:
-            #             # not a dataset or group, maybe just a filename that has been stored
-            #             return ret
-            #         return rootgrp.get(ret)
-            #     else:
-            #         from .core import Dataset
-            #         rootgrp = get_rootparent(Dataset(_id).parent)
-            #         return rootgrp.get(ret)
-            if ret[0] == "(":
-                if ret[-1] == ")":
-                    # might be a tuple object
-                    return ast.literal_eval(ret)
-                return ret
-            if ret[0] == "[":
-                if ret[-1] == "]":
-                    # might be a list object
-                    try:
-                        return ast.literal_eval(ret)
-                        # return ast.literal_eval(ret.replace(' ', ', '))
-                    except (ValueError, NameError, AttributeError):
-                        return ret
-                return ret
-            return AttributeString(ret)
-        if isinstance(ret, np.ndarray) and ret.dtype.name == "object":
-            vstr = str(ret.tolist())
-            if "<HDF5 object reference>" in vstr:
-                return ret
-            return WrapperAttributeManager._parse_return_value(_id, vstr)
-        return ret
+        return _materialize(*decode_attribute_value(ret))
+
+    def _decoded(self, name: str, key: Tuple[int, int, bool]) -> Tuple[int, Any]:
+        """Return the kind and payload of the attribute `name`, read from the cache if possible.
+
+        Objects of files opened read-only cannot change, their cached values are used as is.
+        Otherwise, the raw value is read and the cached value is only used, if the raw value
+        did not change (also if the attribute was written with h5py directly)."""
+        fileno, addr, read_only = key
+        cache_key = (fileno, addr, name)
+        entry = _decoded_cache.get(cache_key, None)
+        if entry is not None and read_only:
+            _decoded_cache.move_to_end(cache_key)
+            return entry[1], entry[2]
+        raw = AttributeManager.__getitem__(self, name)
+        if entry is not None and _same_raw_value(entry[0], raw):
+            _decoded_cache.move_to_end(cache_key)
+            return entry[1], entry[2]
+        kind, payload = decode_attribute_value(raw)
+        _decoded_cache[cache_key] = (raw, kind, payload)
+        _decoded_cache.move_to_end(cache_key)
+        while len(_decoded_cache) > DECODED_ATTR_CACHE_SIZE:
+            _decoded_cache.popitem(last=False)
+        return kind, payload
+
+    def _standard_attributes(self) -> Dict:
+        if not get_config("expose_user_prop_to_attrs"):
+            return {}
+        parent = self._parent
+        return parent._convention.properties.get(parent.__class__, {})
 
     @with_phil
     def __getitem__(self, name: str):
-        ret = super(WrapperAttributeManager, self).__getitem__(name)
+        sattr = self._standard_attributes().get(name, None)
+        if sattr is not None:
+            AttributeManager.__getitem__(self, name)  # raises KeyError if the attribute does not exist
+            return sattr.get(self._parent)
+        kind, payload = self._decoded(name, _object_key(self._id))
+        return _materialize(kind, payload)
+
+    @with_phil
+    def raw_items(self) -> List[Tuple[str, Any]]:
+        """Return the names and the raw (not decoded) values of all attributes"""
+        raw = AttributeManager(self._parent)
+        return [(name, raw[name]) for name in raw]
+
+    @with_phil
+    def decode_all(self) -> Dict:
+        """Return all attributes as dictionary. Equal to `dict(attrs)`, but the object is
+        resolved once for all attributes and decoded values are taken from the cache."""
         parent = self._parent
-        cv_props = parent._convention.properties
+        key = _object_key(self._id)
+        sattrs = self._standard_attributes()
+        decoded = {}
+        for name in AttributeManager.__iter__(self):
+            sattr = sattrs.get(name, None)
+            if sattr is not None:
+                decoded[name] = sattr.get(parent)
+            else:
+                decoded[name] = _materialize(*self._decoded(name, key))
+        return decoded
 
-        if get_config("expose_user_prop_to_attrs") and parent.__class__ in cv_props:
-            if name in cv_props[parent.__class__]:
-                return cv_props[parent.__class__][name].get(parent)
-        return WrapperAttributeManager._parse_return_value(self._id, ret)
+    def items(self):
+        """Return the names and decoded values of all attributes"""
+        return self.decode_all().items()
+
+    def values(self):
+        """Return the decoded values of all attributes"""
+        return self.decode_all().values()
 
     @with_phil
     def __delitem__(self, name):
         super().__delitem__(name)
+        coords.invalidate(self._id)
+        rdf.invalidate()
         self._parent.rdf.delete(name)
 
     def create(
@@ -265,6 +365,8 @@ class WrapperAttributeManager(AttributeManager):
         r = super().create(
             name, utils.parse_object_for_attribute_setting(data), shape, dtype
         )
+        coords.invalidate(self._id)
+        rdf.invalidate()
         _predicate = kwargs.get("predicate", None)
         if _predicate is not None:
             rdf_predicate = _predicate
@@ -421,6 +523,12 @@ class WrapperAttributeManager(AttributeManager):
 
         utils.create_special_attribute(self, name, value)
 
+    def modify(self, name, value):
+        """Change the value of an attribute while preserving its type and shape"""
+        super().modify(name, value)
+        coords.invalidate(self._id)
+        rdf.invalidate()
+
     def __repr__(self):
         return super().__repr__()
 
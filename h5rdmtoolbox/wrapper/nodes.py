@@ -0,0 +1,118 @@
+"""Lightweight node descriptors for fast traversals of HDF5 groups.
+
+`Group.visit_nodes()` walks the tree with the low-level object visitor of HDF5 (H5Ovisit), which
+already provides the type and the number of attributes of every object. The objects are only
+opened if further information (shape, dtype, attribute names) is requested and the (rather
+expensive) wrapper objects are only built if `Node.obj` is accessed.
+"""
+from typing import Callable, List, Optional, Tuple
+
+import h5py
+from h5py import h5a, h5o
+
+from . import chunkcache
+
+_KINDS = {h5o.TYPE_GROUP: 'group',
+          h5o.TYPE_DATASET: 'dataset',
+          h5o.TYPE_NAMED_DATATYPE: 'datatype'}
+
+
+class Node:
+    """Descriptor of an HDF5 object visited during a traversal.
+
+    Parameters
+    ----------
+    root : h5py.Group
+        The group, from which the traversal started.
+    name : str
+        The name of the object relative to `root`.
+    info : h5py.h5o.ObjInfo
+        The object info provided by the visitor.
+    """
+    __slots__ = ('_root', 'name', 'kind', 'num_attrs', '_id')
+
+    def __init__(self, root: h5py.Group, name: str, info: h5o.ObjInfo):
+        self._root = root
+        self.name = name
+        self.kind: str = _KINDS.get(info.type, 'unknown')
+        self.num_attrs: int = info.num_attrs
+        self._id = None
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} {self.kind} "{self.path}">'
+
+    @property
+    def path(self) -> str:
+        """The absolute path of the object"""
+        return f'{self._root.name.rstrip("/")}/{self.name}'
+
+    @property
+    def basename(self) -> str:
+        """The basename of the object"""
+        return self.name.rsplit('/', 1)[-1]
+
+    @property
+    def id(self):
+        """The low-level object identifier. The object is opened on first access"""
+        if self._id is None:
+            self._id = open_object(self._root, self.name)
+        return self._id
+
+    @property
+    def shape(self) -> Optional[Tuple[int, ...]]:
+        """The shape of a dataset. None for other objects"""
+        if self.kind != 'dataset':
+            return None
+        return self.id.shape
+
+    @property
+    def dtype(self):
+        """The dtype of a dataset. None for other objects"""
+        if self.kind != 'dataset':
+            return None
+        return self.id.dtype
+
+    @property
+    def attr_names(self) -> List[str]:
+        """The names of the attributes of the object"""
+        if self.num_attrs == 0:
+            return []
+        names = []
+        h5a.iterate(self.id, lambda name: names.append(name.decode('utf-8')))
+        return names
+
+    @property
+    def obj(self):
+        """The wrapped object (`Group` or `Dataset` of the toolbox)"""
+        return wrap(self._root, self.id)
+
+
+def open_object(root: h5py.Group, name: str):
+    """Open the object `name` relative to `root`. Datasets with an entry in
+    "hdf_dataset_chunk_cache_mb" are opened with the configured chunk cache"""
+    dsid = chunkcache.apply_override(root, name)
+    if dsid is not None:
+        return dsid
+    return h5o.open(root.id, root._e(name))
+
+
+def wrap(root: h5py.Group, oid):
+    """Return the wrapper object of an object identifier using the wrapper classes of `root`"""
+    if isinstance(oid, h5py.h5d.DatasetID):
+        return root._h5ds(oid)
+    if isinstance(oid, h5py.h5g.GroupID):
+        return root._h5grp(oid)
+    return h5py.Datatype(oid)
+
+
+def visit_nodes(root: h5py.Group, func: Callable[[Node], Optional[object]]):
+    """Call `func` for every object below `root` (each object once, in lexicographic order).
+    Returning None continues the traversal, returning anything else stops it and
+    immediately returns that value."""
+
+    def _visitor(name: bytes, info: h5o.ObjInfo):
+        if name == b'.':
+            return None
+        return func(Node(root, root._d(name), info))
+
+    return h5o.visit(root.id, _visitor, info=True)
@@ -0,0 +1,149 @@
+"""Lazily indexed xarray data backed by HDF5 datasets.
+
+`H5BackendArray` implements the backend array protocol of xarray. Indexing a `xr.DataArray`
+built on it only records the selection. Data is read from the HDF5 file when the values are
+requested. If dask is installed, the array can be chunked along the HDF5 chunks, so that
+reductions are computed chunk by chunk (out-of-core).
+
+The array keeps a reference to the open dataset. If the file has been closed in the meantime,
+it is reopened read-only (see `h5rdmtoolbox.database.handles`).
+
+`H5TbxBackendEntrypoint` is the xarray backend "h5tbx", which opens all datasets of a group
+as `xr.Dataset` (numeric variables lazily), also with `xr.open_mfdataset`:
+
+>>> import xarray as xr
+>>> ds = xr.open_dataset('my_file.hdf', engine='h5tbx', group='/piv', chunks={})
+"""
+import os
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+import h5py
+import numpy as np
+import xarray as xr
+from xarray.backends import BackendArray, BackendEntrypoint
+from xarray.core import indexing
+
+# attributes of datasets, which are decoded by dataset decoders (see `ds_decoder`):
+DECODER_ATTRIBUTES = ('DATA_SCALE', 'DATA_OFFSET')
+
+
+def has_dask() -> bool:
+    """Return True if dask is installed"""
+    try:
+        import dask.array  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class H5BackendArray(BackendArray):
+    """Lazily indexed array reading the data of an HDF5 dataset on demand"""
+
+    def __init__(self, dataset: h5py.Dataset):
+        self.filename = dataset.file.filename
+        self.name = dataset.name
+        self.shape = dataset.shape
+        self.dtype = dataset.dtype
+        self._id = dataset.id
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_id'] = None  # identifiers cannot be pickled (e.g. for dask workers)
+        return state
+
+    def __getitem__(self, key: indexing.ExplicitIndexer) -> np.ndarray:
+        return indexing.explicit_indexing_adapter(
+            key, self.shape, indexing.IndexingSupport.OUTER_1VECTOR, self._raw_indexing_method
+        )
+
+    def _raw_indexing_method(self, key: Tuple) -> np.ndarray:
+        if self._id is not None and self._id.valid:
+            return np.asarray(h5py.Dataset(self._id)[key])
+        from ..database import handles
+        with handles.checkout(self.filename) as h5:
+            return np.asarray(h5[self.name][key])
+
+
+def get_dask_chunks(dataset: h5py.Dataset, dims: Tuple[str, ...],
+                    chunks: Optional[Union[str, Dict, Tuple]]) -> Optional[Union[str, Dict, Tuple]]:
+    """Return the dask chunks of the lazy array of the dataset. None means, that dask is not
+    used. By default (`chunks=None`), the HDF5 chunks are used if dask is installed."""
+    if chunks is False or (chunks is None and not has_dask()):
+        return None
+    if chunks is None:
+        if dataset.chunks is None:
+            return 'auto'
+        return dict(zip(dims, dataset.chunks))
+    return chunks
+
+
+def _can_be_lazy(dataset) -> bool:
+    """Return True if the variable can be read lazily. Strings, time datasets and datasets,
+    which are modified by dataset decoders, are read at once."""
+    from .core import _is_epoch_dataset
+    if dataset.dtype.kind not in 'biufc':
+        return False
+    return not _is_epoch_dataset(dataset.attrs) and not any(a in dataset.attrs for a in DECODER_ATTRIBUTES)
+
+
+def open_group(group, drop_variables: Optional[Iterable[str]] = None) -> xr.Dataset:
+    """Return the datasets of an (opened) group as `xr.Dataset`. Numeric variables are lazily
+    indexed (see `Dataset.to_lazy_xarray`), all others are read and decoded like in
+    `Dataset.__getitem__`. Dimension scales become coordinates."""
+    drop_variables = set(drop_variables or ())
+    data_vars, scales = {}, {}
+    for name, dataset in group.items():
+        if not isinstance(dataset, h5py.Dataset) or name in drop_variables:
+            continue
+        if dataset.is_scale:
+            scales[name] = dataset
+            continue
+        if _can_be_lazy(dataset):
+            variable = dataset.to_lazy_xarray(chunks=False)
+            if dataset.chunks is not None:
+                variable.encoding['preferred_chunks'] = dict(zip(variable.dims, dataset.chunks))
+                variable.encoding['chunksizes'] = dataset.chunks
+        else:
+            variable = dataset[()]
+            if not isinstance(variable, xr.DataArray):
+                variable = xr.DataArray(variable, name=name)  # e.g. a scalar string
+        data_vars[name] = variable
+    xrds = xr.Dataset(data_vars)
+    # scales, which are not attached to any of the variables:
+    for name, dataset in scales.items():
+        if name not in xrds.coords:
+            coord = dataset[()]
+            xrds = xrds.assign_coords({name: (name if coord.ndim == 1 else coord.dims, coord.values, coord.attrs)})
+    xrds.attrs = {k: v for k, v in group.attrs.items() if k not in ('CLASS', 'NAME')}
+    return xrds
+
+
+class H5TbxBackendEntrypoint(BackendEntrypoint):
+    """xarray backend "h5tbx" opening the datasets of a group of an HDF5 file.
+
+    Parameters of `xr.open_dataset`:
+
+    group : str
+        The group to open (default: root group)
+    """
+    description = 'Open HDF5 files (groups) with the h5rdmtoolbox'
+    url = 'https://h5rdmtoolbox.readthedocs.io/en/latest/'
+    open_dataset_parameters = ('filename_or_obj', 'drop_variables', 'group')
+
+    def open_dataset(self, filename_or_obj, *, drop_variables=None, group: str = '/') -> xr.Dataset:
+        from .core import File
+        h5 = File(filename_or_obj, mode='r')
+        try:
+            xrds = open_group(h5[group], drop_variables=drop_variables)
+        except Exception:
+            h5.close()
+            raise
+        xrds.set_close(h5.close)
+        return xrds
+
+    def guess_can_open(self, filename_or_obj) -> bool:
+        try:
+            _, ext = os.path.splitext(filename_or_obj)
+        except TypeError:
+            return False
+        return ext in ('.hdf', '.hdf5', '.h5')
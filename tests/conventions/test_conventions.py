@@ -5,6 +5,7 @@ import sys
 import unittest
 import warnings
 from datetime import datetime
+from typing import List
 
 import h5py
 import pint
@@ -97,6 +98,60 @@ class TestConventions(unittest.TestCase):
             self.assertEqual(h5.attrs["publication_type"], "book")
         h5tbx.use(None)
 
+    def test_standard_attribute_validation_cache(self):
+        from pydantic import BaseModel, ValidationInfo, field_validator
+
+        n_calls = {"n": 0}
+
+        class UpperValidator(BaseModel):
+            value: str
+
+            @field_validator("value")
+            @classmethod
+            def _upper(cls, value):
+                n_calls["n"] += 1
+                return value.upper()
+
+        class ParentValidator(BaseModel):
+            value: str
+
+            @field_validator("value")
+            @classmethod
+            def _with_parent(cls, value, info: ValidationInfo):
+                n_calls["n"] += 1
+                return f'{info.context["parent"]}{value}'
+
+        sattr = h5tbx.convention.standard_attributes.StandardAttribute(
+            name="upper", validator=UpperValidator, target_method="__init__",
+            description="upper case", default_value="$none"
+        )
+        model = sattr._validation_model()[0]
+        self.assertEqual(sattr.encode(None, "a"), "A")
+        self.assertEqual(sattr.encode(None, "a"), "A")
+        self.assertEqual(n_calls["n"], 1)
+        self.assertIs(model, sattr._validation_model()[0])
+        self.assertTrue(sattr.validate("b"))
+
+        n_calls["n"] = 0
+        sattr = h5tbx.convention.standard_attributes.StandardAttribute(
+            name="with_parent", validator=ParentValidator, target_method="__init__",
+            description="depends on parent", default_value="$none"
+        )
+        self.assertEqual(sattr.encode("x", "a"), "xa")
+        self.assertEqual(sattr.encode("y", "a"), "ya")
+        self.assertEqual(n_calls["n"], 2)
+
+        # mutating a returned value does not change the cache:
+        sattr = h5tbx.convention.standard_attributes.StandardAttribute(
+            name="names", validator=List[str], target_method="__init__",
+            description="list of names", default_value="$none"
+        )
+        names = sattr.decode(None, ("a", "b"))
+        names.append("c")
+        self.assertEqual(sattr.decode(None, ("a", "b")), ["a", "b"])
+        sattr.decode(None, ("a", "b")).clear()
+        self.assertEqual(sattr.decode(None, ("a", "b")), ["a", "b"])
+
     def test_convention_thread_safety(self):
         """Test that convention state is isolated per thread using ContextVar."""
         import threading
@@ -812,6 +867,72 @@ def validate_f1(a, b, c=3, d=2):
 
         cv.validate(h5py_filename)
 
+    def test_validate_many(self):
+        cv = h5tbx.convention.Convention.from_yaml(__this_dir__ / "simple_cv.yaml")
+        cv.register()
+        h5tbx.use(cv)
+        with h5tbx.File() as h5:
+            h5.create_string_dataset("ds_str", data="a string")
+            h5.create_dataset("ds_int", data=123, units="m/s")
+        h5tbx.use(None)
+
+        h5py_filename = h5tbx.utils.generate_temporary_filename(suffix=".hdf")
+        with h5py.File(h5py_filename, "w") as h52:
+            h52.create_dataset("missing_units", data=1)
+            for i in range(3):
+                ds = h52.create_dataset(f"ds_float{i}", data=123.1)
+                ds.attrs["units"] = "invalid"
+                ds.attrs["comment"] = "lower case comment"
+
+        report = cv.validate_many([h5.hdf_filename, h5py_filename])
+        self.assertEqual(
+            list(report.columns), list(h5tbx.convention.core.VALIDATION_REPORT_COLUMNS)
+        )
+        self.assertEqual(len(report[report.filename == str(h5.hdf_filename)]), 0)
+        missing = report[report.reason == "missing"]
+        self.assertEqual(list(missing.name), ["/missing_units"])
+        invalid = report[report.reason == "invalid"]
+        self.assertEqual(len(invalid[invalid.attribute == "units"]), 3)
+        self.assertTrue(all(invalid[invalid.attribute == "units"].required))
+        self.assertEqual(len(invalid[invalid.attribute == "comment"]), 3)
+        self.assertFalse(any(invalid[invalid.attribute == "comment"].required))
+
+        report_parallel = cv.validate_many([h5.hdf_filename, h5py_filename], workers=2)
+        self.assertEqual(len(report_parallel), len(report))
+
+        # a convention built in memory (not in the convention directory):
+        from pydantic import BaseModel
+
+        class LocalValidator(BaseModel):
+            """cannot be pickled"""
+
+            value: str
+
+        mem_cv = h5tbx.convention.Convention(name="in_memory_cv", contact="John Doe")
+        mem_cv.add_standard_attribute(
+            h5tbx.convention.standard_attributes.StandardAttribute(
+                name="units",
+                validator=convention.get_list_of_validators()["units"],
+                target_method="create_dataset",
+                description="units",
+            )
+        )
+        filenames = [h5.hdf_filename, h5py_filename]
+        expected = mem_cv.validate_many(filenames)
+        self.assertEqual(len(expected), 4)
+        self.assertEqual(len(mem_cv.validate_many(filenames, workers=2)), 4)
+
+        mem_cv.add_standard_attribute(
+            h5tbx.convention.standard_attributes.StandardAttribute(
+                name="comment",
+                validator=LocalValidator,
+                target_method="create_dataset",
+                description="comment",
+            )
+        )
+        report_serial = mem_cv.validate_many(filenames, workers=2)
+        self.assertEqual(len(report_serial), len(mem_cv.validate_many(filenames)))
+
     def test_InvalidAttribute(self):
         ia = InvalidAttribute("/vel", "units", "invalid", "Oups, wrong!")
         self.assertEqual(
@@ -1,6 +1,8 @@
 """Test the mongoDB interface"""
 
+import json
 import unittest
+import unittest.mock
 from typing import List
 
 import h5py
@@ -184,6 +186,118 @@ class TestHDFDB(unittest.TestCase):
             res = gdb.find_one({"$eq": np.array([1, 2, 3])}, recursive=True)
             self.assertEqual(res.name, ds_random.name)
 
+    def test_value_find_reducers(self):
+        data = np.arange(100, dtype="f8").reshape(20, 5)
+        data[3, 2] = np.nan
+        with h5tbx.File(mode="w") as h5:
+            h5.create_dataset("chunked", data=data, chunks=(3, 5))
+            h5.create_dataset("zeros", data=np.zeros(10))
+            h5.create_dataset("string", data="hello")
+            filename = h5.hdf_filename
+
+        query = hdfdb.query
+        with h5py.File(filename, mode="r") as h5:
+            ds = h5["chunked"]
+            with unittest.mock.patch.object(query, "BLOCK_SIZE", 3 * 5 * 8):
+                self.assertEqual(len(list(query.iter_slices(ds))), 7)
+                stats = query.get_stats(ds)
+            self.assertTrue(np.isnan(stats["$mean"]))
+            self.assertAlmostEqual(stats["$nanmean"], np.nanmean(data))
+            self.assertTrue(np.isnan(stats["$min"]))  # like np.min
+            self.assertEqual(stats["$count_nonzero"], np.count_nonzero(data))
+            self.assertAlmostEqual(query.get_stats(h5["zeros"])["$std"], 0.0)
+            self.assertIsNone(query.get_stats(h5["string"]))
+            # statistics of read-only files are cached:
+            with unittest.mock.patch.object(query, "_compute_stats") as compute:
+                self.assertIs(query.get_stats(ds), stats)
+                compute.assert_not_called()
+
+            gdb = hdfdb.ObjDB(h5)
+            self.assertEqual(gdb.find_one({"$eq": {"$max": 0.0}}).name, "/zeros")
+            self.assertEqual(gdb.find_one({"$gt": {"$nanmean": 40}}).name, "/chunked")
+            self.assertEqual(gdb.find_one({"$eq": {"$count_nonzero": 0}}).name, "/zeros")
+            self.assertEqual(len(gdb.find({"$lt": {"$std": 1}})), 1)
+            self.assertEqual(gdb.find_one({"$eq": np.zeros(10)}).name, "/zeros")
+            self.assertIsNone(gdb.find_one({"$eq": np.zeros(11)}))
+
+    def test_build_stats(self):
+        filenames = []
+        for i in range(2):
+            with h5tbx.File(mode="w") as h5:
+                h5.create_dataset("u", data=np.arange(10) + i, chunks=(4,))
+                h5.create_dataset("name", data="run")
+                filenames.append(h5.hdf_filename)
+        sidecars = database.build_stats(filenames, workers=2)
+        self.assertEqual(sidecars, [hdfdb.stats.sidecar_filename(fn) for fn in filenames])
+        self.assertTrue(all(sc.exists() for sc in sidecars))
+        stats = hdfdb.stats.load_stats(filenames[1])
+        self.assertListEqual(list(stats), ["/u"])
+        self.assertEqual(stats["/u"]["$max"], 10.0)
+
+        hdfdb.query._stats_cache.clear()
+        with unittest.mock.patch.object(hdfdb.query, "_compute_stats") as compute:
+            res = list(hdfdb.FilesDB(filenames).find({"$gt": {"$mean": 5}}))
+            self.assertEqual(len(res), 1)
+            self.assertEqual(res[0].filename, filenames[1])
+            self.assertEqual(res[0].stats["$min"], 1.0)
+            with h5tbx.File(filenames[0]) as h5:
+                self.assertIn("mean=4.5", h5.hdfrepr.html_repr(h5))
+            compute.assert_not_called()
+
+        # the sidecar is read once per representation, not per dataset:
+        with h5tbx.File(mode="w") as h5:
+            for i in range(3):
+                h5.create_dataset(f"ds{i}", data=np.arange(4) + 10 * i)
+            multi_filename = h5.hdf_filename
+        database.build_stats(multi_filename)
+        with h5tbx.File(multi_filename) as h5:
+            with unittest.mock.patch.object(
+                hdfdb.stats, "load_stats", wraps=hdfdb.stats.load_stats
+            ) as load:
+                html = h5.hdfrepr.html_repr(h5)
+                self.assertEqual(load.call_count, 1)
+            for mean in ("mean=1.5", "mean=11.5", "mean=21.5"):
+                self.assertIn(mean, html)
+
+        # changed files invalidate the statistics:
+        with h5tbx.File(filenames[0], mode="r+") as h5:
+            h5["u"][0] = 100
+        self.assertIsNone(hdfdb.stats.load_stats(filenames[0]))
+        self.assertEqual(database.find_one(filenames[0], {"$eq": {"$max": 100.0}}).name, "/u")
+
+    def test_scan(self):
+        with h5tbx.File(mode="w") as h5:
+            h5.attrs["title"] = "scan test"
+            grp = h5.create_group("grp")
+            grp.attrs["comment"] = "a group"
+            grp.create_dataset("u", data=np.arange(10), attrs={"units": "m/s"})
+            h5.create_dataset("name", data="run")
+            filename = h5.hdf_filename
+
+        names = []
+        snapshot = database.scan(filename, visitors=[lambda rec: names.append(rec.name)])
+        self.assertEqual(names, list(snapshot.records))
+        self.assertEqual(names[0], "/")
+        self.assertIn("/grp/u", snapshot)
+        self.assertEqual(len(snapshot), len(names))
+        self.assertEqual(snapshot["/"].attrs["title"], "scan test")
+        self.assertEqual([rec.name for rec in snapshot.datasets()], ["/grp/u", "/name"])
+        self.assertEqual(snapshot["/grp/u"].shape, (10,))
+        self.assertEqual(snapshot["/grp/u"].ndim, 1)
+        self.assertEqual(snapshot["/grp/u"].attrs["units"], "m/s")
+        self.assertIsNone(snapshot["/grp"].ndim)
+
+        # unchanged files are not traversed again:
+        with unittest.mock.patch.object(h5py.Group, "visititems") as visititems:
+            cached = database.scan(filename)
+            visititems.assert_not_called()
+        self.assertIs(cached, snapshot)
+
+        with h5tbx.File(filename, mode="r+") as h5:
+            h5["grp/u"].attrs["units"] = "km/s"
+            self.assertEqual(database.scan(h5["grp"])["/grp/u"].attrs["units"], "km/s")
+        self.assertEqual(database.scan(filename)["/grp/u"].attrs["units"], "km/s")
+
     def test_find_shape(self):
         with h5tbx.File(mode="w") as h5:
             ds_random = h5.create_dataset("random", data=np.array([1, 2, 3]))
@@ -604,6 +718,205 @@ class TestHDFDB(unittest.TestCase):
         self.assertEqual(len(fdb.filenames), 2)
         self.assertListEqual(sorted(fdb.filenames), sorted([filename3, filename6]))
 
+    def test_logical_operators(self):
+        with h5tbx.File() as h5:
+            h5.create_dataset("u", data=[1, 2], attrs={"units": "m/s", "standard_name": "x_velocity"})
+            h5.create_dataset("v", data=[1, 2], attrs={"units": "km/s", "standard_name": "y_velocity"})
+            h5.create_dataset("T", data=[1, 2], attrs={"units": "K", "standard_name": "temperature"})
+            res = h5.find({"$or": [{"units": "m/s"}, {"units": "km/s"}]})
+            self.assertListEqual(sorted(r.name for r in res), ["/u", "/v"])
+            res = h5.find(
+                {"$or": [{"units": "m/s"}, {"units": "K"}], "standard_name": {"$regex": "velocity"}}
+            )
+            self.assertListEqual([r.name for r in res], ["/u"])
+            res = h5.find({"$and": [{"units": {"$regex": "s$"}}, {"$basename": "v"}]})
+            self.assertListEqual([r.name for r in res], ["/v"])
+            # multiple operators of one key are combined by AND:
+            res = h5.find({"units": {"$regex": "s$", "$in": ["km/s", "K"]}})
+            self.assertListEqual([r.name for r in res], ["/v"])
+            with self.assertRaises(TypeError):
+                h5.find({"$or": {"units": "m/s"}})
+
+    def test_explain(self):
+        with h5tbx.File() as h5:
+            for i in range(5):
+                h5.create_dataset(f"ds{i}", data=[i], attrs={"units": "m/s"})
+            h5.create_group("grp")
+            report = hdfdb.ObjDB(h5).explain({"$basename": "ds3", "units": "m/s"})
+        # a single traversal over the root group, five datasets and one group:
+        self.assertEqual(report["nodes_visited"], 7)
+        self.assertEqual(report["nodes_matched"], 1)
+        conditions = report["conditions"]["conditions"]
+        # the cheap name condition runs first and short-circuits the attribute comparison:
+        self.assertEqual(conditions[0]["condition"], "$name $basename 'ds3'")
+        self.assertEqual(conditions[0]["evaluated"], 7)
+        self.assertEqual(conditions[1]["condition"], "units $eq 'm/s'")
+        self.assertEqual(conditions[1]["evaluated"], 1)
+
+    def test_find_generator_limit_skip(self):
+        import types
+
+        with h5tbx.File() as h5:
+            for i in range(20):
+                h5.create_dataset(f"grp/ds{i:02d}", data=[i], attrs={"units": "m/s"})
+            res = h5.find({"units": "m/s"}, as_generator=True)
+            self.assertIsInstance(res, types.GeneratorType)
+            first = next(res)
+            self.assertIsInstance(first, database.lazy.LDataset)
+            self.assertEqual(first.name, "/grp/ds00")
+
+            res = h5.find({"units": "m/s"}, limit=5)
+            self.assertListEqual([r.name for r in res], [f"/grp/ds{i:02d}" for i in range(5)])
+            res = h5.find({"units": "m/s"}, limit=5, skip=18)
+            self.assertListEqual([r.name for r in res], ["/grp/ds18", "/grp/ds19"])
+            self.assertListEqual(h5.find({"units": "m/s"}, limit=0), [])
+
+            # the traversal stops after the limit is reached:
+            report_all = hdfdb.ObjDB(h5).explain({"units": "m/s"})
+            self.assertEqual(report_all["nodes_visited"], 22)
+            compiled = hdfdb.objdb.compile_filter({"units": "m/s"})
+            self.assertEqual(len(compiled.run(h5, limit=3)), 3)
+            self.assertEqual(compiled.visited, 5)  # root, grp and three datasets
+
+        res = hdfdb.FileDB(h5.hdf_filename).find({"units": "m/s"}, limit=2, skip=1, as_generator=True)
+        self.assertIsInstance(res, types.GeneratorType)
+        self.assertListEqual([r.name for r in res], ["/grp/ds01", "/grp/ds02"])
+
+        with h5tbx.File() as h52:
+            h52.create_dataset("ds", data=[1], attrs={"units": "m/s"})
+        fdb = hdfdb.FilesDB([h5.hdf_filename, h52.hdf_filename])
+        self.assertEqual(len(list(fdb.find({"units": "m/s"}))), 21)
+        self.assertEqual(len(list(fdb.find({"units": "m/s"}, limit=4))), 4)
+        self.assertEqual(len(list(fdb.find({"units": "m/s"}, skip=19))), 2)
+
+    def test_filesDB_index(self):
+        folder = h5tbx.utils.generate_temporary_directory()
+        for i in range(3):
+            with h5py.File(folder / f"f{i}.hdf", "w") as h5:
+                h5.attrs["run"] = i
+                grp = h5.create_group("grp")
+                grp.attrs["b"] = json.dumps({"c": i})
+                grp.attrs["bytes"] = np.bytes_(b"xyz")
+                grp.attrs["meta"] = json.dumps({"a": 1})
+                grp.attrs["arr"] = np.array([1, 2, 3])
+                ds = grp.create_dataset("u", data=np.arange(i + 1, dtype="f4"))
+                ds.attrs["standard_name"] = "x_velocity"
+                ds.attrs["units"] = "m/s"
+                h5.create_dataset("T1", data=300.0 + i)
+
+        fdb_noindex = hdfdb.FilesDB.from_folder(folder)
+        fdb = hdfdb.FilesDB.from_folder(folder, index=True)
+        self.assertTrue((folder / hdfdb.index.INDEX_FILENAME).exists())
+
+        queries = (
+            {"standard_name": "x_velocity"},
+            {"run": {"$gt": 0}},
+            {"run": {"$lte": 1}},
+            {"run": {"$in": [0, 2]}},
+            {"units": {"$regex": "^m/"}},
+            {"units": {"$exists": False}},
+            {"b.c": 1},
+            {"$basename": "T1"},
+            {"$shape": (2,)},
+            {"$ndim": 0, "$dtype": np.dtype("<f8")},
+            {"standard_name": "x_velocity", "$ndim": 1},
+            {"$name": "/grp/u"},
+            {"units": {"$eq": "m/s", "$exists": True}, "run": {"$exists": False}},
+        )
+        for flt in queries:
+            self.assertIsNotNone(fdb._index_find(flt))
+            expected = sorted((r.filename, r.name) for r in fdb_noindex.find(flt))
+            found = sorted((r.filename, r.name) for r in fdb.find(flt))
+            self.assertListEqual(found, expected, msg=str(flt))
+
+        res = list(fdb.find({"units": "m/s"}, objfilter="group"))
+        self.assertEqual(len(res), 0)
+        res = list(fdb.find({"units": "m/s"}, objfilter="dataset"))
+        self.assertEqual(len(res), 3)
+        self.assertIsInstance(res[0], database.lazy.LDataset)
+        res = fdb.find_one({"run": 2})
+        self.assertIsInstance(res, database.lazy.LGroup)
+        self.assertEqual(res.filename.name, "f2.hdf")
+
+        res = list(fdb.find({"standard_name": "x_velocity"}, objfilter="dataset"))
+        self.assertEqual(len(res), 3)
+        fdb_f0 = hdfdb.FilesDB([folder / "f0.hdf"], index=fdb.index)
+        self.assertEqual(
+            fdb_f0._index_find({"units": "m/s"}), {str((folder / "f0.hdf").resolve()): ["/grp/u"]}
+        )
+
+        # non-supported queries fall back to scanning the files:
+        self.assertIsNone(fdb._index_find({"$eq": 300.0}))
+        self.assertIsNone(fdb._index_find({"units": "m/s"}, unknown_argument=True))
+        res = list(fdb.find({"$eq": 300.0}))
+        self.assertEqual(len(res), 1)
+
+        # queries, which the index cannot answer like the file-based search, are not
+        # answered by the index:
+        for flt in ({"bytes": "xyz"},
+                    {"meta.a": {"$exists": True}},
+                    {"arr": [1, 2, 3]},
+                    {"arr": {"$gt": 0}},
+                    {"run": [0, 1]},
+                    {"run": {"$eq": b"0"}}):
+            self.assertIsNone(fdb._index_find(flt), msg=str(flt))
+            try:
+                expected = sorted((r.filename, r.name) for r in fdb_noindex.find(flt))
+            except ValueError:
+                with self.assertRaises(ValueError):
+                    list(fdb.find(flt))
+            else:
+                found = sorted((r.filename, r.name) for r in fdb.find(flt))
+                self.assertListEqual(found, expected, msg=str(flt))
+        self.assertEqual(len(list(fdb.find({"bytes": "xyz"}))), 0)
+        self.assertEqual(len(list(fdb.find({"meta.a": {"$exists": True}}))), 0)
+        with self.assertRaises(ValueError):
+            list(fdb.find({"arr": [1, 2, 3]}))
+        self.assertIsNotNone(fdb._index_find({"meta.a": 1}))
+
+        # changed files are re-indexed:
+        self.assertTrue(fdb.index.is_valid(folder / "f0.hdf"))
+        with h5py.File(folder / "f0.hdf", "r+") as h5:
+            h5["grp/u"].attrs["units"] = "km/s"
+        self.assertFalse(fdb.index.is_valid(folder / "f0.hdf"))
+        res = list(fdb.find({"units": "km/s"}))
+        self.assertEqual(len(res), 1)
+        self.assertEqual(res[0].filename.name, "f0.hdf")
+        fdb.index.close()
+
+    def test_filesDB_parallel(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        filenames = []
+        for i in range(4):
+            filename = h5tbx.utils.generate_temporary_filename(suffix=".hdf")
+            with h5tbx.File(filename, "w") as h5:
+                h5.attrs["run"] = i
+                h5.create_dataset("x", data=[1, 2, 3], make_scale=True)
+                h5.create_dataset("u", data=[4, 5, 6], attrs={"units": "m/s"}, attach_scale="x")
+            filenames.append(filename)
+
+        serial = hdfdb.FilesDB(filenames)
+        parallel = hdfdb.FilesDB(filenames, workers=2)
+        expected = sorted((r.filename, r.name) for r in serial.find({"units": "m/s"}))
+        res = list(parallel.find({"units": "m/s"}))
+        self.assertIsInstance(res[0], database.lazy.LDataset)
+        self.assertListEqual(sorted((r.filename, r.name) for r in res), expected)
+        self.assertEqual(len(expected), 4)
+
+        res = parallel.find_one({"run": {"$gt": 1}})
+        self.assertIsInstance(res, database.lazy.LGroup)
+        self.assertTrue(res.attrs["run"] > 1)
+        self.assertIsNone(parallel.find_one({"run": 10}))
+
+        # lambda functions cannot be sent to other processes. Falls back to serial search:
+        res = list(parallel.find({"run": lambda x: x == 3}))
+        self.assertEqual(len(res), 1)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            res = list(hdfdb.FilesDB(filenames, executor=executor).find({"run": {"$lt": 2}}))
+        self.assertEqual(len(res), 2)
+
     def test_find_rdf(self):
         from rdflib import FOAF
 
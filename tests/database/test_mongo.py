@@ -3,6 +3,7 @@
 import pathlib
 import types
 import unittest
+import unittest.mock
 from datetime import datetime
 
 import h5py
@@ -166,6 +167,81 @@ class TestH5Mongo(unittest.TestCase):
 
         self.assertEqual(2, mongoDBInterface.collection.count_documents({}))
 
+    def test_insert_in_batches(self):
+        mongoDBInterface = MongoDB(collection=self.collection)
+        filename = h5tbx.utils.generate_temporary_filename(suffix=".hdf")
+        with h5py.File(filename, "w") as h5:
+            h5.create_dataset("time", data=np.arange(25) * 0.5)
+            h5["time"].make_scale()
+            ds = h5.create_dataset("dataset", data=np.random.random((25, 3)))
+            ds.dims[0].attach_scale(h5["time"])
+            ds.attrs["units"] = "m"
+
+            bulk_write = self.collection.bulk_write
+            with unittest.mock.patch.object(
+                self.collection, "bulk_write", side_effect=bulk_write
+            ) as mock_bulk_write:
+                mongoDBInterface.insert_dataset(ds, axis=0, batch_size=10)
+                self.assertEqual(mock_bulk_write.call_count, 3)
+            self.assertEqual(25, self.collection.count_documents({}))
+            doc = self.collection.find_one({"time": 2.0})
+            self.assertEqual(doc["slice"], [[4, 5, 1], [0, None, 1]])
+            self.assertEqual(doc["units"], "m")
+
+            # upserting again does not create new documents:
+            mongoDBInterface.insert_group(h5, recursive=True, batch_size=2)
+            n_docs = self.collection.count_documents({})
+            mongoDBInterface.insert_group(h5, recursive=True, batch_size=2)
+            mongoDBInterface.insert_dataset(ds, axis=0)
+            self.assertEqual(n_docs, self.collection.count_documents({}))
+
+        with self.assertRaises(ValueError):
+            mongoDBInterface.insert_dataset(ds, axis=0, batch_size=0)
+
+    def test_sync(self):
+        mongoDBInterface = MongoDB(collection=self.collection)
+        mongoDBInterface.fingerprints.drop()
+        filename = h5tbx.utils.generate_temporary_filename(suffix=".hdf")
+        with h5py.File(filename, "w") as h5:
+            h5.create_dataset("grp/u", data=np.arange(5), dtype="f4").attrs["units"] = "m/s"
+            h5.create_dataset("grp/v", data=np.arange(5), dtype="f4").attrs["units"] = "m/s"
+            h5.create_dataset("x", data=4.0)
+
+        report = mongoDBInterface.sync(filename)
+        self.assertEqual(report, {"skipped": 0, "synced": 1, "inserted": 5, "deleted": 0})
+        self.assertEqual(5, self.collection.count_documents({}))
+        self.assertEqual(mongoDBInterface.sync([filename])["skipped"], 1)
+
+        with h5py.File(filename, "r+") as h5:
+            h5["grp/u"].attrs["units"] = "km/s"
+            del h5["grp/v"]
+        inserted = []
+        with unittest.mock.patch(
+            "h5rdmtoolbox.database.mongo._insert_dataset",
+            side_effect=lambda ds, *args, **kwargs: inserted.append(ds.name),
+        ):
+            mongoDBInterface.sync(filename)
+        self.assertEqual(inserted, ["/grp/u"])
+        self.assertIsNone(self.collection.find_one({"name": "/grp/v"}))
+        self.assertIsNone(self.collection.find_one({"name": "/grp/u"}))  # patched insert
+        report = mongoDBInterface.sync(filename)
+        self.assertEqual(report["skipped"], 1)  # the fingerprint was stored
+        self.assertEqual(3, self.collection.count_documents({}))
+
+        with h5py.File(filename, "r+") as h5:
+            h5["grp/u"].attrs["long_name"] = "velocity"
+        report = mongoDBInterface.sync(filename, axis=0, content_hash=True)
+        self.assertEqual((report["inserted"], report["deleted"]), (1, 0))
+        self.assertEqual(5, self.collection.count_documents({"name": "/grp/u"}))
+        pathlib.Path(filename).touch()
+        self.assertEqual(mongoDBInterface.sync(filename, content_hash=True)["skipped"], 1)
+
+        pathlib.Path(filename).unlink()
+        report = mongoDBInterface.sync(filename)
+        self.assertEqual(report["deleted"], 4)
+        self.assertEqual(0, self.collection.count_documents({}))
+        self.assertEqual(0, mongoDBInterface.fingerprints.count_documents({}))
+
     def test_find_one(self):
         mongoDBInterface = MongoDB(collection=self.collection)
         self.assertEqual(0, mongoDBInterface.collection.count_documents({}))
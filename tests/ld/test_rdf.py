@@ -813,6 +813,58 @@ local:SubjectNode a local:BNodeType1,
 
             h5.dumps()
 
+    def test_rdf_batch(self):
+        with h5tbx.File() as h5:
+            for i in range(5):
+                h5.attrs[f"a{i}"] = i
+            with h5.rdf.batch():
+                for i in range(5):
+                    h5.rdf.predicate[f"a{i}"] = f"https://example.org/p{i}"
+                    h5.rdf[f"a{i}"].definition = f"Attribute {i}"
+                # reads inside the batch see the buffered changes:
+                self.assertEqual(h5.rdf.predicate["a3"], "https://example.org/p3")
+                # nothing is written yet:
+                self.assertNotIn(RDF_PREDICATE_ATTR_NAME, h5.attrs.raw)
+            self.assertEqual(
+                json.loads(h5.attrs.raw[RDF_PREDICATE_ATTR_NAME]),
+                {f"a{i}": f"https://example.org/p{i}" for i in range(5)},
+            )
+            self.assertEqual(h5.rdf["a4"].definition, "Attribute 4")
+
+            h5.rdf.update(
+                {
+                    "a0": {"object": "https://example.org/o0"},
+                    "a1": {
+                        "predicate": "https://example.org/q1",
+                        "object": "https://example.org/o1",
+                    },
+                }
+            )
+            self.assertEqual(h5.rdf.object["a0"], "https://example.org/o0")
+            self.assertEqual(h5.rdf.predicate["a1"], "https://example.org/q1")
+            self.assertEqual(h5.rdf.predicate["a2"], "https://example.org/p2")
+            with self.assertRaises(KeyError):
+                h5.rdf.update({"not_existing": {"predicate": "https://example.org/p"}})
+            with self.assertRaises(ValueError):
+                h5.rdf.update({"a0": {"subject": "https://example.org/p"}})
+
+    def test_rdf_cached_literal(self):
+        import h5py
+        from h5rdmtoolbox.ld import rdf
+
+        with h5tbx.File() as h5:
+            h5.attrs["x"] = "hallo"
+            h5.rdf.object["x"] = rdflib.Literal("hallo", lang="de")
+            for _ in range(2):  # second read is taken from the cache
+                self.assertEqual(h5.rdf.object["x"], rdflib.Literal("hallo", lang="de"))
+                self.assertEqual(
+                    rdf.RDF_OBJECT(h5py.AttributeManager(h5))["x"],
+                    rdflib.Literal("hallo", lang="de"),
+                )
+            objects = rdf.read_json_attr(h5.attrs, rdf.RDF_OBJECT_ATTR_NAME)
+            objects["x"]["lang"] = "en"
+            self.assertEqual(h5.rdf.object["x"], rdflib.Literal("hallo", lang="de"))
+
     def test_rm_attr_with_rdf(self):
         with h5tbx.File() as h5:
             h5.attrs["test", "https://example.org/test"] = "test"
@@ -45,3 +45,47 @@ class TestXrExport(unittest.TestCase):
         da2 = xr.open_dataarray(nc_fname)
         self.assertIsInstance(da2, xr.DataArray)
         self.assertEqual(da2[()], da[()])
+
+    def test_backend_entrypoint(self):
+        import numpy as np
+        from h5rdmtoolbox.wrapper.xrbackend import H5TbxBackendEntrypoint
+
+        filenames, expected = [], []
+        for i in range(2):
+            with h5tbx.File(attrs={'title': 'run'}) as h5:
+                h5.create_dataset('t', data=np.arange(4.) + 4 * i, make_scale=True, attrs={'units': 's'})
+                h5.create_dataset('x', data=np.arange(3), make_scale=True, attrs={'units': 'm'})
+                h5.create_dataset('u', data=np.arange(12.).reshape(4, 3) + i, chunks=(2, 3),
+                                  attach_scales=('t', 'x'), attrs={'units': 'm/s'})
+                h5.create_dataset('name', data='run')
+                h5.create_dataset('other', data=np.arange(2), make_scale=True)
+                grp = h5.create_group('grp')
+                grp.create_dataset('v', data=np.arange(5))
+                expected.append(h5['u'][()])
+            filenames.append(h5.hdf_filename)
+
+        self.assertTrue(H5TbxBackendEntrypoint().guess_can_open(str(filenames[0])))
+        self.assertFalse(H5TbxBackendEntrypoint().guess_can_open('data.nc'))
+
+        ds = xr.open_dataset(filenames[0], engine=H5TbxBackendEntrypoint)
+        self.assertEqual(set(ds.data_vars), {'u', 'name'})
+        self.assertEqual(set(ds.coords), {'t', 'x', 'other'})
+        self.assertEqual(ds.attrs['title'], 'run')
+        self.assertEqual(ds.u.attrs['units'], 'm/s')
+        self.assertEqual(ds.u.encoding['preferred_chunks'], {'t': 2, 'x': 3})
+        xr.testing.assert_identical(ds.u.load(), expected[0])
+        self.assertEqual(str(ds.name.values), 'run')
+        ds.close()
+
+        ds = xr.open_dataset(filenames[0], engine=H5TbxBackendEntrypoint, group='grp',
+                             drop_variables=['missing'])
+        self.assertEqual(list(ds.v.dims), ['dim_0'])
+        ds.close()
+
+        datasets = [xr.open_dataset(fn, engine=H5TbxBackendEntrypoint, drop_variables=['name', 'other'])
+                    for fn in filenames]
+        combined = xr.concat(datasets, dim='t')
+        self.assertEqual(combined.u.shape, (8, 3))
+        self.assertEqual(float(combined.u.isel(t=4, x=0)), 1.0)
+        for ds in datasets:
+            ds.close()
@@ -2,6 +2,7 @@ import datetime
 import json
 import pathlib
 import unittest
+import unittest.mock
 from copy import deepcopy
 from datetime import datetime, timedelta
 
@@ -162,6 +163,244 @@ class TestCore(unittest.TestCase):
             with h5tbx.set_config(natural_naming=False):
                 del h5.ds
 
+    def test_natural_naming(self):
+        with h5tbx.File() as h5:
+            for i in range(100):
+                h5.create_group(f"g{i}")
+            h5.create_dataset("velocity", data=np.arange(3), attrs={"units": "m/s", "long_name": "v"})
+            h5["link"] = h5py.SoftLink("/g1")
+            h5["dangling"] = h5py.SoftLink("/invalid")
+            with unittest.mock.patch.object(h5tbx.Group, "items") as items:
+                self.assertIsInstance(h5.g99, h5tbx.Group)
+                self.assertIsInstance(h5.velocity, h5tbx.Dataset)
+                self.assertEqual(h5.link.name, "/link")
+                items.assert_not_called()
+            for invalid in ("g100", "dangling", "g1/g2"):
+                with self.assertRaises(AttributeError):
+                    getattr(h5, invalid)
+            with h5tbx.set_config(natural_naming=False):
+                with self.assertRaises(AttributeError):
+                    h5.g1
+
+    def test_visit_nodes(self):
+        with h5tbx.File() as h5:
+            grp = h5.create_group("grp")
+            grp.create_dataset("u", data=np.arange(6).reshape(2, 3), attrs={"units": "m/s", "long_name": "u"})
+            grp.create_group("sub")
+            grp.create_group("sub/subsub")
+
+            nodes = []
+            with unittest.mock.patch.object(h5tbx.Group, "__getitem__") as getitem:
+                grp.visit_nodes(nodes.append)
+                getitem.assert_not_called()
+            self.assertListEqual([n.path for n in nodes], ["/grp/sub", "/grp/sub/subsub", "/grp/u"])
+            self.assertListEqual([n.kind for n in nodes], ["group", "group", "dataset"])
+            node_u = nodes[-1]
+            self.assertEqual(node_u.shape, (2, 3))
+            self.assertEqual(node_u.dtype, np.dtype(int))
+            self.assertListEqual(sorted(node_u.attr_names), ["long_name", "units"])
+            self.assertIsNone(nodes[0].shape)
+            self.assertIsInstance(node_u.obj, h5tbx.Dataset)
+            self.assertEqual(node_u.obj.attrs["units"], "m/s")
+
+            self.assertEqual(h5.visit_nodes(lambda n: n.path if n.kind == "dataset" else None), "/grp/u")
+
+            visited = []
+            grp.visititems(lambda name, obj: visited.append((name, type(obj))))
+            self.assertListEqual(visited, [("sub", h5tbx.Group), ("sub/subsub", h5tbx.Group),
+                                           ("u", h5tbx.Dataset)])
+            self.assertListEqual(grp.get_dataset_names(), ["u"])
+            self.assertListEqual(grp.get_group_names(), ["sub", "sub/subsub"])
+
+    def test_cached_coordinates(self):
+        times = [datetime(2020, 1, 1) + timedelta(seconds=i) for i in range(5)]
+        with h5tbx.File() as h5:
+            h5.create_time_dataset("t", data=times, make_scale=True, time_format="iso")
+            h5.create_dataset("x", data=np.arange(3), make_scale=True, attrs={"units": "m"})
+            h5.create_dataset("u", data=np.arange(15).reshape(5, 3), attach_scales=("t", "x"))
+            filename = h5.hdf_filename
+
+            self.assertEqual(h5["u"][1].x.attrs["units"], "m")
+            h5["x"].attrs["units"] = "mm"
+            self.assertEqual(h5["u"][1].x.attrs["units"], "mm")
+            h5["x"][:] = [10, 20, 30]
+            np.testing.assert_array_equal(h5["u"][1].x.values, [10, 20, 30])
+            h5.create_dataset("y", data=np.arange(3) * 2, make_scale=True)
+            h5["u"].dims[1].attach_scale(h5["y"])
+            self.assertIn("y", h5["u"][:, 0:2].coords)
+
+            # only writes to the dataset and its scales invalidate its entry:
+            from h5rdmtoolbox.wrapper import coords as coords_cache
+            h5.create_dataset("other", data=np.arange(3))
+            h5["u"][0]
+            self.assertIsNotNone(coords_cache.lookup(h5["u"]))
+            h5["other"][:] = [1, 2, 3]
+            h5["other"].attrs["units"] = "m"
+            h5.attrs["comment"] = "unrelated"
+            self.assertIsNotNone(coords_cache.lookup(h5["u"]))
+            h5["y"][:] = [1, 2, 3]
+            self.assertIsNone(coords_cache.lookup(h5["u"]))
+            np.testing.assert_array_equal(h5["u"][0].y.values, [1, 2, 3])
+            h5["t"].attrs["long_name"] = "time"
+            self.assertIsNone(coords_cache.lookup(h5["u"]))
+            self.assertEqual(h5["u"][0].t.attrs["long_name"], "time")
+
+        with h5tbx.File(filename) as h5:
+            ds = h5["u"]
+            first = ds[0]
+            with unittest.mock.patch("h5rdmtoolbox.wrapper.core.convert_strings_to_datetimes") as convert:
+                for i in range(5):
+                    arr = ds[i, 1:]
+                convert.assert_not_called()
+            self.assertEqual(arr.t.values, np.datetime64(times[-1]))
+            np.testing.assert_array_equal(arr.x.values, [20, 30])
+            self.assertEqual(first.t.values, np.datetime64(times[0]))
+            self.assertEqual(ds[1:3].t.dims, ("t",))
+            self.assertEqual(len(ds[1:3].t), 2)
+
+        # another dataset moved to the name of a deleted dataset:
+        with h5tbx.File() as h5:
+            h5.create_dataset("t1", data=np.arange(3), make_scale=True)
+            h5.create_dataset("t2", data=np.arange(3) * 10, make_scale=True)
+            h5.create_dataset("u", data=np.zeros(3), attach_scales=("t1",))
+            h5.create_dataset("w", data=np.ones(3), attach_scales=("t2",))
+            self.assertIn("t1", h5["u"][()].coords)
+            self.assertIn("t2", h5["w"][()].coords)
+            del h5["u"]
+            h5.move("w", "u")
+            u = h5["u"][()]
+            np.testing.assert_array_equal(u.values, [1, 1, 1])
+            self.assertNotIn("t1", u.coords)
+            np.testing.assert_array_equal(u.t2.values, [0, 10, 20])
+
+    def test_lazy_xarray(self):
+        with h5tbx.File() as h5:
+            h5.create_dataset("t", data=np.arange(20.0), make_scale=True, attrs={"units": "s"})
+            h5.create_dataset("x", data=np.arange(4), make_scale=True, attrs={"units": "m"})
+            h5.create_dataset("u", data=np.arange(80.0).reshape(20, 4), chunks=(5, 4),
+                              attach_scales=("t", "x"), attrs={"units": "m/s"})
+            h5.create_dataset("name", data="run")
+            expected = h5["u"][2:8, 1]
+
+            backend = h5tbx.wrapper.xrbackend.H5BackendArray
+            with unittest.mock.patch.object(backend, "_raw_indexing_method",
+                                            wraps=backend(h5["u"])._raw_indexing_method) as read:
+                lazy = h5["u"].to_lazy_xarray(chunks=False)
+                sel = lazy[2:8, 1]
+                read.assert_not_called()
+            self.assertTrue(expected.identical(sel.load()))
+
+            with h5tbx.set_config(lazy_xarray=True):
+                self.assertTrue(expected.identical(h5["u"][2:8, 1].load()))
+                self.assertEqual(h5["name"][()], "run")
+            with self.assertRaises(TypeError):
+                h5["name"].to_lazy_xarray()
+
+        # the file is reopened when the data is requested after closing it:
+        self.assertEqual(float(lazy.sum()), float(np.arange(80.0).sum()))
+        self.assertEqual(float(lazy.sel(t=3.0, x=2)), 14.0)
+
+    def test_parallel_chunk_writer(self):
+        data = np.arange(70, dtype="i2").reshape(10, 7)
+        chunkwriter = h5tbx.wrapper.chunkwriter
+        with h5tbx.set_config(hdf_compression="gzip", hdf_compression_opts=6, hdf_write_workers=3):
+            with h5tbx.File() as h5:
+                with unittest.mock.patch.object(chunkwriter, "write_chunks",
+                                                wraps=chunkwriter.write_chunks) as write_chunks:
+                    ds_gzip = h5.create_dataset("gzip", data=data, chunks=(4, 3))
+                    ds_shuffle = h5.create_dataset("shuffle", data=data.astype("f8"), chunks=(4, 3),
+                                                   shuffle=True, dtype="f4")
+                    ds_fletcher = h5.create_dataset("fletcher", data=data, chunks=(4, 3), fletcher32=True)
+                    self.assertEqual(write_chunks.call_count, 3)
+                self.assertEqual(ds_gzip.compression_opts, 6)
+                self.assertEqual(ds_shuffle.dtype, np.float32)
+                self.assertIsNone(chunkwriter.get_filter_pipeline(ds_fletcher))
+                self.assertEqual(len(list(chunkwriter.iter_chunk_slices((10, 7), (4, 3)))), 9)
+                filename = h5.hdf_filename
+        with h5py.File(filename) as h5:
+            for name in ("gzip", "shuffle", "fletcher"):
+                np.testing.assert_array_equal(h5[name][()], data)
+
+    def test_chunk_advisor(self):
+        chunking = h5tbx.wrapper.chunking
+        advice = chunking.advise((1000, 64, 64), "f4", "auto-slice", access_axis=0, target_nbytes=64 * 64 * 4 * 2)
+        self.assertEqual(advice.chunks, (2, 64, 64))
+        self.assertEqual(advice.cache_nbytes, 2 * 64 * 64 * 4)
+        advice = chunking.advise((1000, 64, 64), "f4", "auto-timeseries", access_axis=0, target_nbytes=4000 * 4)
+        self.assertEqual(advice.chunks, (1000, 1, 4))
+        self.assertEqual(chunking.advise((), "f4", "auto").chunks, None)
+        # unlimited axes: the chunk is limited in bytes, the cache by the current or expected shape
+        advice = chunking.advise((10, 1000), "f8", maxshape=(None, 1000), strategy="auto-timeseries")
+        self.assertEqual(advice.chunks, (chunking.TARGET_CHUNK_BYTES // 8, 1))
+        self.assertEqual(advice.cache_nbytes, chunking.TARGET_CHUNK_BYTES)
+        advice = chunking.advise((10, 1000), "f8", maxshape=(None, 1000), strategy="auto-timeseries",
+                                 expected_shape=(500, 1000))
+        self.assertEqual(advice.chunks, (500, 16))
+        self.assertEqual(advice.cache_nbytes, 500 * 16 * 8)
+        advice = chunking.advise((0, 1000), "f8", maxshape=(None, 1000), strategy="auto-slice")
+        self.assertEqual(advice.chunks, (8, 1000))
+        self.assertEqual(advice.cache_nbytes, 8 * 1000 * 8)
+        with self.assertRaises(ValueError):
+            chunking.advise((10, 1000), "f8", expected_shape=(10,))
+        with self.assertRaises(ValueError):
+            chunking.advise((10,), "f4", "auto-random")
+
+        with h5tbx.File() as h5:
+            h5.create_time_dataset("time", data=[datetime.now()] * 20, time_format="iso", make_scale=True)
+            self.assertEqual(h5.create_dataset("x", data=np.arange(300), chunks="auto").chunks, (300,))
+            ds = h5.create_dataset("u", data=np.zeros((20, 30, 40)), chunks="auto", attach_scales=("time",))
+            self.assertEqual(ds.chunks, (6, 30, 40))  # slices extended to MIN_CHUNK_BYTES
+            ds = h5.create_dataset("v", shape=(200, 300, 400), chunks="auto-timeseries", access_axis=0)
+            self.assertEqual(ds.chunks, (200, 1, 81))  # float32
+            ds = h5.create_dataset("w", shape=(0, 30), maxshape=(None, 30), chunks="auto-timeseries")
+            self.assertEqual(ds.chunks[1], 1)
+            ds = h5.create_dataset("w2", shape=(0, 30), maxshape=(None, 30), chunks="auto-timeseries",
+                                   expected_shape=(100, 30))
+            self.assertEqual(ds.chunks, (100, 30))
+
+        results = chunking.benchmark((16, 32, 32), pattern="timeseries", n_reads=3)
+        self.assertEqual({r["name"] for r in results}, {*chunking.CHUNK_STRATEGIES, "contiguous"})
+        self.assertTrue(all(r["read_MBps"] > 0 for r in results))
+
+    def test_chunk_cache(self):
+        with h5tbx.File() as h5:
+            h5.create_dataset("grp/u", data=np.zeros((50, 50)), chunks=(10, 10))
+            h5.create_dataset("v", data=np.zeros((50, 50)), chunks=(10, 10))
+            filename = h5.hdf_filename
+        with h5tbx.set_config(hdf_chunk_cache_mb=8, hdf_dataset_chunk_cache_mb={"/grp/u": 32}):
+            with h5tbx.File(filename) as h5:
+                self.assertEqual(h5.id.get_access_plist().get_cache()[2], 8 * 1024 ** 2)
+                self.assertEqual(h5["v"].chunk_cache["nbytes"], 8 * 1024 ** 2)
+                self.assertEqual(h5.grp["u"].chunk_cache["nbytes"], 32 * 1024 ** 2)
+                self.assertEqual(h5["grp/u"].chunk_cache["nslots"], h5tbx.wrapper.chunkcache.get_nslots(32 * 1024 ** 2))
+                np.testing.assert_array_equal(h5["grp/u"][0:2, 0].values, [0, 0])
+            with h5tbx.set_config(file_handle_pool_size=2):
+                from h5rdmtoolbox.database import handles, lazy
+                with h5tbx.File(filename) as h5:
+                    lds = lazy.lazy(h5["grp/u"])
+                with lds as ds:
+                    self.assertEqual(ds.chunk_cache["nbytes"], 32 * 1024 ** 2)
+                with handles.checkout(filename) as h5:
+                    self.assertEqual(h5.id.get_access_plist().get_cache()[2], 8 * 1024 ** 2)
+                handles.clear()
+        with self.assertRaises(ValueError):
+            h5tbx.set_config(hdf_chunk_cache_w0=2)
+
+        # the override applies to all ways of accessing the dataset:
+        def _visited(h5):
+            found = {}
+            h5.visititems(lambda name, obj: found.update({name: obj}) if name == "grp/u" else None)
+            return found["grp/u"]
+
+        for access in (lambda h5: h5["grp/u"],
+                       lambda h5: h5.grp.u,
+                       _visited,
+                       lambda h5: h5.visit_nodes(lambda node: node.obj if node.path == "/grp/u" else None)):
+            with h5tbx.set_config(hdf_chunk_cache_mb=8, hdf_dataset_chunk_cache_mb={"/grp/u": 32}):
+                with h5tbx.File(filename) as h5:
+                    self.assertEqual(access(h5).chunk_cache["nbytes"], 32 * 1024 ** 2)
+                    self.assertEqual(h5.v.chunk_cache["nbytes"], 8 * 1024 ** 2)
+
     def test_setattr(self):
         with h5tbx.File() as h5:
             with self.assertRaises(AttributeError):
@@ -645,6 +884,149 @@ class TestCore(unittest.TestCase):
             self.assertEqual(h5.filesize.units, h5tbx.get_ureg().byte)
             self.assertIsInstance(h5.hdf_filename, pathlib.Path)
 
+    def test_decode_all_attributes(self):
+        with h5tbx.File() as h5:
+            h5.attrs["a_dict"] = {"k": "v"}
+            h5.attrs["a_list"] = [1, 2, "awd"]
+            h5.attrs["a_str"] = "a_string"
+            h5.attrs["array_str"] = np.arange(3)  # written as string "[0 1 2]"
+            h5.attrs.raw["an_array"] = np.arange(3)
+            h5.attrs.raw["str_array"] = np.array(["a", "b"], dtype=object)
+
+            decoded = h5.attrs.decode_all()
+            self.assertEqual(decoded.keys(), dict(h5.attrs).keys())
+            self.assertEqual(decoded["array_str"], "[0 1 2]")
+            self.assertEqual(decoded["str_array"], ["a", "b"])
+            self.assertEqual(dict(h5.attrs.raw_items())["a_list"], "[1, 2, 'awd']")
+
+            # decoded values are copies, modifying them does not change the cache:
+            decoded["a_dict"]["k"] = "w"
+            h5.attrs["a_list"].append(3)
+            h5.attrs["an_array"][0] = 10
+            self.assertEqual(h5.attrs["a_dict"], {"k": "v"})
+            self.assertEqual(h5.attrs["a_list"], [1, 2, "awd"])
+            self.assertEqual(h5.attrs["an_array"][0], 0)
+
+            h5.attrs.modify("a_str", "another_string")
+            self.assertEqual(h5.attrs["a_str"], "another_string")
+            filename = h5.hdf_filename
+
+            # attributes written with h5py directly are not taken from the cache:
+            h5py.AttributeManager(h5)["a_str"] = "written by h5py"
+            self.assertEqual(h5.attrs["a_str"], "written by h5py")
+
+        with h5tbx.File(filename, mode="r") as h5:
+            self.assertEqual(h5.attrs.decode_all()["a_str"], "written by h5py")
+            self.assertEqual(h5.attrs["a_dict"], {"k": "v"})
+
+        # another object moved to the name of a deleted object:
+        with h5tbx.File() as h5:
+            h5.create_dataset("a", data=1, attrs={"comment": "A"})
+            h5.create_dataset("b", data=2, attrs={"comment": "B"})
+            self.assertEqual(h5["a"].attrs["comment"], "A")
+            self.assertEqual(h5["b"].attrs["comment"], "B")
+            del h5["a"]
+            h5.move("b", "a")
+            self.assertEqual(h5["a"].attrs.raw["comment"], "B")
+            self.assertEqual(h5["a"].attrs["comment"], "B")
+            self.assertEqual(dict(h5["a"].attrs)["comment"], "B")
+
+    def test_bulk_set_attrs(self):
+        with h5tbx.use("h5tbx"):
+            with h5tbx.File() as h5:
+                for name in ("u", "v", "w"):
+                    h5.create_dataset(name, data=np.arange(3), units="")
+                ref = h5.create_dataset("reference", data=np.arange(3), units="m/s")
+                failures = h5tbx.bulk_set_attrs(
+                    ["u", "v", h5["w"], "not_existing"],
+                    {
+                        "units": "m/s",
+                        ("comment", "https://example.org/hasComment"): "velocity",
+                        "a_dict": {"k": "v"},
+                    },
+                    parent=h5,
+                )
+                self.assertEqual(list(failures), ["not_existing"])
+                self.assertIsInstance(failures["not_existing"], KeyError)
+                for name in ("u", "v", "w"):
+                    self.assertEqual(h5[name].attrs.raw["units"], ref.attrs.raw["units"])
+                    self.assertEqual(h5[name].attrs["comment"], "velocity")
+                    self.assertEqual(h5[name].attrs["a_dict"], {"k": "v"})
+                    self.assertEqual(
+                        h5[name].rdf.predicate["comment"], "https://example.org/hasComment"
+                    )
+
+                # an invalid unit does not change the object:
+                failures = h5tbx.bulk_set_attrs(
+                    [h5["u"]], {"units": "invalid unit", "comment": "changed"}
+                )
+                self.assertIsInstance(failures["/u"], h5tbx.errors.StandardAttributeError)
+                self.assertEqual(h5["u"].attrs["comment"], "velocity")
+
+                # RDF objects and file RDF:
+                h5.create_group("g1")
+                h5.create_group("g2")
+                failures = h5tbx.bulk_set_attrs(
+                    ["/", "g1", "g2"],
+                    {
+                        "creator": h5tbx.Attribute(
+                            "John Doe",
+                            rdf_predicate="https://schema.org/creator",
+                            rdf_object="https://orcid.org/0000-0001-8729-0482",
+                        ),
+                        "numbers": (1, 2, 3),
+                        "skipped": None,
+                    },
+                    parent=h5,
+                )
+                self.assertEqual(failures, {})
+                for name in ("/", "g1", "g2"):
+                    obj = h5[name]
+                    self.assertEqual(obj.attrs["creator"], "John Doe")
+                    np.testing.assert_array_equal(obj.attrs["numbers"], [1, 2, 3])
+                    self.assertNotIn("skipped", obj.attrs)
+                    self.assertEqual(obj.rdf.predicate["creator"], "https://schema.org/creator")
+                    self.assertEqual(
+                        obj.rdf.object["creator"], "https://orcid.org/0000-0001-8729-0482"
+                    )
+                failures = h5tbx.bulk_set_attrs(
+                    ["g1"],
+                    {"version": h5tbx.Attribute("1.0", frdf_predicate="https://schema.org/version")},
+                    parent=h5,
+                )
+                self.assertIsInstance(failures["/g1"], ValueError)
+                self.assertNotIn("version", h5["g1"].attrs)
+                failures = h5tbx.bulk_set_attrs(
+                    [h5],
+                    {"version": h5tbx.Attribute("1.0", frdf_predicate="https://schema.org/version")},
+                )
+                self.assertEqual(failures, {})
+                self.assertEqual(h5.frdf.predicate["version"], "https://schema.org/version")
+
+                # writing is not atomic: attributes written before a failing write are kept
+                from h5rdmtoolbox.wrapper import bulkattrs
+
+                real_write = bulkattrs._write
+
+                def _failing_write(oid, name, prepared):
+                    if name == b"second":
+                        raise RuntimeError("write failed")
+                    real_write(oid, name, prepared)
+
+                with unittest.mock.patch.object(bulkattrs, "_write", _failing_write):
+                    failures = h5tbx.bulk_set_attrs(["g1"], {"first": 1, "second": 2}, parent=h5)
+                self.assertIsInstance(failures["/g1"], RuntimeError)
+                self.assertEqual(h5["g1"].attrs["first"], 1)
+                self.assertNotIn("second", h5["g1"].attrs)
+
+            # the cached coordinates of datasets using a changed scale are invalidated:
+            with h5tbx.File() as h5:
+                h5.create_dataset("x", data=np.arange(3), make_scale=True, attrs={"units": "m"})
+                h5.create_dataset("p", data=np.arange(3), attach_scales=("x",), units="Pa")
+                self.assertEqual(h5["p"][0].x.attrs["units"], "m")
+                self.assertEqual(h5tbx.bulk_set_attrs([h5["x"]], {"units": "mm"}), {})
+                self.assertEqual(h5["p"][0].x.attrs["units"], "mm")
+
     def test_special_attribute_types(self):
         with h5tbx.File() as h5:
             ds = h5.create_dataset("test", data=np.random.random((10, 10)))
@@ -1173,6 +1555,36 @@ class TestCore(unittest.TestCase):
                 timestamps[0].strftime(fmt),
             )
 
+    def test_vectorized_time_decoding(self):
+        strings = np.array(["2020-01-01T00:00:00.500000", "2020-01-02T12:30:00.000001"])
+        res = h5tbx.wrapper.core.convert_strings_to_datetimes(strings, "iso")
+        self.assertEqual(res.dtype, np.dtype("datetime64[us]"))
+        np.testing.assert_array_equal(res, strings.astype("datetime64[us]"))
+        # exotic formats are parsed with strptime:
+        res = h5tbx.wrapper.core.convert_strings_to_datetimes(np.array(["01.02.2020"]), "%d.%m.%Y")
+        self.assertEqual(res[0], datetime(2020, 2, 1))
+        with self.assertRaises(ValueError):
+            h5tbx.wrapper.core.convert_strings_to_datetimes(np.array(["2020-01-01"]), "iso")
+
+        times = np.datetime64("2020-01-01T00:00:00", "us") + np.arange(6).reshape(2, 3).astype("timedelta64[ms]")
+        with h5tbx.File() as h5:
+            h5.create_time_dataset("t", data=times, time_format="iso")
+            with unittest.mock.patch("h5rdmtoolbox.wrapper.core.datetime") as dt:
+                tds = h5["t"][()]
+                dt.strptime.assert_not_called()
+            np.testing.assert_array_equal(tds.values, times)
+
+            ds = h5.create_time_dataset("epoch", data=times[0], time_format="iso", epoch_unit="ms",
+                                        make_scale=True)
+            self.assertEqual(ds.dtype, np.int64)
+            self.assertEqual(ds.attrs["units"], "ms")
+            np.testing.assert_array_equal(ds[()].values, times[0])
+            self.assertNotIn("units", ds[()].attrs)
+            h5.create_dataset("vel", data=[1, 2, -3], attach_scale="epoch")
+            np.testing.assert_array_equal(h5.vel[1:].epoch.values, times[0, 1:])
+            with self.assertRaises(ValueError):
+                h5.create_time_dataset("invalid", data=times, time_format="iso", epoch_unit="h")
+
     def test_time_as_coord(self):
         with h5tbx.File() as h5:
             h5.create_time_dataset(
@@ -60,3 +60,81 @@ class TestLazy(unittest.TestCase):
         self.assertEqual(l_dataset.sel(x=-1), 1)
         self.assertEqual(l_dataset.sel(x=0), 2)
         self.assertEqual(l_dataset.sel(x=1), 3)
+
+    def test_lazy_group_is_shallow(self):
+        import pickle
+
+        with h5tbx.File() as h5:
+            h5.attrs['name'] = 'root'
+            h5.create_dataset('grp/sub/ds', data=[1, 2, 3], attrs={'units': 'm'})
+            h5.create_group('a group')
+            lroot = h5tbx.lazy(h5)
+        self.assertListEqual(sorted(lroot.keys()), ['a group', 'grp'])
+        # members are only built on access:
+        self.assertEqual(lroot._children, {})
+        self.assertIs(lroot.grp, lroot['grp'])
+        self.assertListEqual(list(lroot._children), ['grp'])
+        self.assertEqual(lroot.grp.sub.ds.attrs['units'], 'm')
+        self.assertFalse(hasattr(lroot, 'a group'))
+        with self.assertRaises(AttributeError):
+            lroot.invalid
+        with self.assertRaises(KeyError):
+            lroot['invalid']
+        self.assertFalse(hasattr(lroot, '__dict__'))
+
+        lroot_copy = pickle.loads(pickle.dumps(lroot))
+        self.assertEqual(lroot_copy.attrs['name'], 'root')
+        self.assertEqual(lroot_copy.grp.sub.ds.name, '/grp/sub/ds')
+
+        # cached read-only handles do not prevent writing to the file:
+        with h5tbx.File(h5.hdf_filename, mode='r+') as h5:
+            h5.attrs['name'] = 'new root'
+        with h5tbx.File(h5.hdf_filename) as h5:
+            self.assertEqual(h5tbx.lazy(h5).attrs['name'], 'new root')
+
+    def test_handle_pool(self):
+        from h5rdmtoolbox.database import handles
+        handles.clear()
+        filenames = []
+        for i in range(3):
+            with h5tbx.File() as h5:
+                h5.create_dataset('ds', data=[1, 2, 3], attrs={'units': 'm', 'long_name': 'ds'})
+                filenames.append(h5.hdf_filename)
+        lds = [h5tbx.database.FileDB(fn).find_one({'$name': '/ds'}) for fn in filenames]
+
+        pool = handles.FileHandlePool(maxsize=2)
+        with pool.checkout(filenames[0]) as h5a:
+            with pool.checkout(filenames[0]) as h5b:
+                self.assertIs(h5a, h5b)
+            with pool.checkout(filenames[1]), pool.checkout(filenames[2]):
+                pass
+            # the least recently used handle is in use and thus not closed yet:
+            self.assertTrue(h5a.id.valid)
+        self.assertFalse(h5a.id.valid)
+        self.assertEqual(len(pool), 2)
+        self.assertEqual((pool.hits, pool.misses), (1, 3))
+        pool.clear()
+        self.assertEqual(len(pool), 0)
+
+        # lazy datasets share the handles of the process-wide pool:
+        with h5tbx.set_config(file_handle_pool_size=16):
+            n_misses = handles.pool.misses
+            for _ in range(3):
+                self.assertEqual(int(lds[0][1]), 2)
+                self.assertEqual(int(lds[0][0]), 1)
+            self.assertEqual(handles.pool.misses, n_misses + 1)
+            self.assertEqual(len(handles.pool), 1)
+            with lds[0] as ds:
+                self.assertIsInstance(ds, h5tbx.Dataset)
+
+            # a modified file is opened again:
+            with h5tbx.File(filenames[0], mode='r+') as h5:
+                h5['ds'][0] = 10
+            self.assertEqual(int(lds[0][0]), 10)
+        handles.clear()
+
+        # by default, files are closed after each access:
+        self.assertEqual(int(lds[1][0]), 1)
+        self.assertEqual(len(handles.pool), 0)
+        with self.assertRaises(ValueError):
+            h5tbx.set_config(file_handle_pool_size=-1)